@@ -3,14 +3,23 @@
 
 
 
+import importlib.util
 import json
+import os
+from typing import Dict
 from aws_cdk import Stack
 from aws_cdk import CfnOutput
+from aws_cdk import aws_lambda
 from constructs import Construct
 
 from resources.cloudfront import CloudFront
 from resources.cognito import Cognito, CreateUser
+from resources.dynamodb import CacheTable
+from resources.events import ReportWarmUpSchedule
+from resources.layers import CommonLayer
 from resources.lambdas import (
+    BackendRole,
+    BackendLambda,
     GetApplicationsRole,
     GetApplicationsLambda,
     GenerateReportRole,
@@ -22,10 +31,28 @@ import constants
 
 
 
+def validate_custom_personas(personas: Dict[str, str]) -> None:
+    """
+    Compiles the custom persona templates with the GenerateReport function's own
+    template compiler, so an invalid template fails the synth rather than every
+    report request of the deployed function.
+
+    Raises:
+        InvalidTemplateError: If a template is not a string with exactly one $report placeholder.
+    """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resources', 'lambda_function_code', 'generate_report', 'prompts.py')
+    spec = importlib.util.spec_from_file_location('generate_report_prompts', path)
+    prompts = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(prompts)
+    prompts.PromptRegistry({**prompts.BUILT_IN_PERSONAS, **personas})
+
+
+
 class AppStack(Stack):
     def __init__(self, scope: Construct, construct_id: str, description: str = constants.STACK_DESCRIPTION, **kwargs) -> None:
         super().__init__(scope, construct_id, **kwargs)
 
+        validate_custom_personas(constants.CUSTOM_PERSONAS)
 
         cloudfront = CloudFront(
             self, 
@@ -37,45 +64,93 @@ class AppStack(Stack):
             'Authentication'
         )
 
-        get_applications_role = GetApplicationsRole(
+        common_layer = CommonLayer(
             self,
-            'GetApplicationsRole'
+            'CommonLayer'
         )
 
-        get_applications_lambda = GetApplicationsLambda(
+        params_and_secrets = None
+        if constants.CONFIG_SOURCE == 'extension':
+            params_and_secrets = aws_lambda.ParamsAndSecretsLayerVersion.from_version(
+                aws_lambda.ParamsAndSecretsVersions.V1_0_103
+            )
+
+        if constants.DEPLOYMENT_MODE == 'unified':
+            # One function, and one pool of warm containers, serves every route.
+            backend_role = BackendRole(
+                self,
+                'BackendRole'
+            )
+
+            backend_lambda = BackendLambda(
+                self,
+                'BackendLambda',
+                backend_role.role,
+                layers=[common_layer.layer],
+                params_and_secrets=params_and_secrets
+            )
+
+            get_applications_role = generate_report_role = backend_role
+            get_applications_lambda = generate_report_lambda = backend_lambda
+        else:
+            get_applications_role = GetApplicationsRole(
+                self,
+                'GetApplicationsRole'
+            )
+
+            get_applications_lambda = GetApplicationsLambda(
+                self,
+                'GetApplicationsLambda',
+                get_applications_role.role,
+                layers=[common_layer.layer],
+                params_and_secrets=params_and_secrets
+            )
+
+            generate_report_role = GenerateReportRole(
+                self,
+                'GenerateReportRole'
+
+            )
+
+            generate_report_lambda = GenerateReportLambda(
+                self,
+                'GenerateReportLambda',
+                generate_report_role.role,
+                layers=[common_layer.layer],
+                params_and_secrets=params_and_secrets
+            )
+
+
+        report_jobs_table = CacheTable(
             self,
-            'GetApplicationsLambda',
-            get_applications_role.role
+            'ReportJobsTable'
         )
 
-        generate_report_role = GenerateReportRole(
-            self,
-            'GenerateReportRole'
-
-        )
-
-        generate_report_lambda = GenerateReportLambda(
-            self,
-            'GenerateReportLambda',
-            generate_report_role.role
+        report_jobs_table.table.grant_read_write_data(generate_report_role.role)
+        generate_report_lambda.function.add_environment(
+            key='jobs_table',
+            value=report_jobs_table.table.table_name
         )
 
+        website_origin = f'https://{cloudfront.distribution.domain_name}'
 
         api_gateway = ApiGateway(
             self,
             'ResilienceHubReportApi',
-            get_applications_function=get_applications_lambda.function,
-            generate_report_function = generate_report_lambda.function,
-            user_pool=cognito.user_pool
+            get_applications_function=get_applications_lambda.handler,
+            generate_report_function = generate_report_lambda.handler,
+            user_pool=cognito.user_pool,
+            allowed_origins=[website_origin, *constants.ADDITIONAL_ALLOWED_ORIGINS]
         )
 
-        allowed_origins = f'https://{api_gateway.api.url}, https://{cloudfront.distribution.domain_name}'
+        allowed_origins = ', '.join([f'https://{api_gateway.api.url}', website_origin, *constants.ADDITIONAL_ALLOWED_ORIGINS])
 
         parameter_name = constants.SSM_PARAMETER
         parameter_value = json.dumps({
             'allowed_origins': allowed_origins,
             'user_pool_id': cognito.user_pool.user_pool_id,
-            'user_email': constants.EMAIL
+            'user_email': constants.EMAIL,
+            'personas': constants.CUSTOM_PERSONAS
         })
 
         parameters = Parameter(
@@ -95,6 +170,50 @@ class AppStack(Stack):
             value=parameter_name
         )
 
+        if constants.CONFIG_SOURCE == 'environment':
+            # Only the web site origins, the API URL would make the functions depend on their own API.
+            website_origins = ', '.join([website_origin, *constants.ADDITIONAL_ALLOWED_ORIGINS])
+            get_applications_lambda.function.add_environment(
+                key='allowed_origins',
+                value=website_origins
+            )
+
+            generate_report_lambda.function.add_environment(
+                key='allowed_origins',
+                value=website_origins
+            )
+
+            generate_report_lambda.function.add_environment(
+                key='personas',
+                value=json.dumps(constants.CUSTOM_PERSONAS)
+            )
+
+        if constants.CACHE_TABLE_ENABLED or constants.WARM_UP_ENABLED:
+            cache_table = CacheTable(
+                self,
+                'CacheTable'
+            )
+
+            cache_table.table.grant_read_write_data(get_applications_role.role)
+            get_applications_lambda.function.add_environment(
+                key='cache_table',
+                value=cache_table.table.table_name
+            )
+
+            cache_table.table.grant_read_write_data(generate_report_role.role)
+            generate_report_lambda.function.add_environment(
+                key='cache_table',
+                value=cache_table.table.table_name
+            )
+
+        if constants.WARM_UP_ENABLED:
+            ReportWarmUpSchedule(
+                self,
+                'ReportWarmUp',
+                generate_report_function=generate_report_lambda.function,
+                interval_minutes=constants.WARM_UP_INTERVAL_MINUTES
+            )
+
         create_user = CreateUser(self, 'create-user', cognito.user_pool)
 
         create_user.function.add_environment(
@@ -151,6 +270,18 @@ class AppStack(Stack):
             value=api_gateway.paths['generate-report']
         )
 
+        CfnOutput(
+            self,
+            'API_GATEWAY_GENERATE_REPORT_JOBS_PATH',
+            value=api_gateway.paths['generate-report-jobs']
+        )
+
+        CfnOutput(
+            self,
+            'API_GATEWAY_GENERATE_REPORT_BATCH_PATH',
+            value=api_gateway.paths['generate-report-batch']
+        )
+
         CfnOutput(
             self,
             'SIGNON_EMAIL',
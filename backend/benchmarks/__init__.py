@@ -0,0 +1,14 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Offline benchmarks for the Lambda functions.
+
+Run each benchmark from the backend directory, for example:
+
+    python -m benchmarks.get_applications_fanout
+
+benchmarks.suite runs every handler end to end and compares the results with
+the stored baseline.json.
+"""
@@ -0,0 +1,90 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Measure build_prompts() on synthetic applications with the component-to-resource index.
+
+    python -m benchmarks.build_prompts_index --resources 10000 --components 1000
+"""
+
+import argparse
+import time
+from datetime import datetime
+from typing import Dict
+
+from benchmarks.loader import load_lambda
+
+
+def synthetic_app(resource_count: int, component_count: int) -> Dict:
+    resources = [
+        {
+            "physicalResourceId": {"identifier": f"resource-{index}"},
+            "resourceType": "AWS::EC2::Instance",
+            "appComponents": [{"id": f"component-{index % component_count}"}],
+        }
+        for index in range(resource_count)
+    ]
+    recommendations = [
+        {
+            "appComponentName": f"component-{index}",
+            "recommendationStatus": "BreachedCanMeet",
+            "configRecommendations": [{"suggestedChanges": ["Deploy across Availability Zones"]}],
+        }
+        for index in range(component_count)
+    ]
+    return {
+        "name": "synthetic",
+        "complianceStatus": "PolicyBreached",
+        "lastAppComplianceEvaluationTime": datetime(2024, 6, 1),
+        "resiliencyScore": 0.42,
+        "resources": resources,
+        "recommendations": recommendations,
+    }
+
+
+def scan_friendly_string(app_component: str, app: Dict) -> str:
+    """
+    The previous lookup, scanning every resource for each recommendation.
+    """
+    resources = []
+    for resource in app["resources"]:
+        if resource["appComponents"][0]["id"] == app_component:
+            resources.append(f"{resource['physicalResourceId']['identifier']} a {resource['resourceType']}")
+    if not resources:
+        return app_component
+    return f"{app_component} ({', '.join(resources)})"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--resources", type=int, default=10000, help="Physical resources in the application.")
+    parser.add_argument("--components", type=int, default=1000, help="Application components with a recommendation.")
+    args = parser.parse_args()
+
+    generate_report = load_lambda("generate_report")
+
+    app = synthetic_app(args.resources, args.components)
+    indexed_function = generate_report.app_component_to_friendly_string
+    generate_report.app_component_to_friendly_string = scan_friendly_string
+    start = time.perf_counter()
+    scanned_prompt = generate_report.build_prompts(app)
+    scan_seconds = time.perf_counter() - start
+    generate_report.app_component_to_friendly_string = indexed_function
+
+    app = synthetic_app(args.resources, args.components)
+    start = time.perf_counter()
+    app["resourcesByComponent"] = generate_report.build_resource_index(app["resources"])
+    indexed_prompt = generate_report.build_prompts(app)
+    index_seconds = time.perf_counter() - start
+
+    if scanned_prompt != indexed_prompt:
+        raise AssertionError("Indexed prompt differs from the scanned prompt")
+
+    print(f"resources={args.resources} components={args.components}")
+    print(f"{'scan':>8} {scan_seconds * 1000:>9.1f} ms")
+    print(f"{'index':>8} {index_seconds * 1000:>9.1f} ms  ({scan_seconds / index_seconds:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Compare model invocations against a throttling quota with and without the call execution layer.
+
+First checks that hard quota errors are neither retried nor slow the bucket down,
+and that a throttling event in the middle of a response stream surfaces as a
+ThrottledError:
+
+    python -m benchmarks.call_retries --calls 20 --concurrency 8 --quota 5
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fakes import FakeBedrockClient, FakeClientError
+from benchmarks.loader import load_common, load_lambda
+
+
+calls = load_common("calls")
+
+
+class QuotaExceededBedrockClient(FakeBedrockClient):
+    """
+    Bedrock stand-in rejecting every invocation with a hard quota error.
+    """
+
+    def invoke_model(self, modelId: str, body: str) -> dict:
+        self.calls["invoke_model"] += 1
+        raise FakeClientError("ServiceQuotaExceededException", 400)
+
+
+class MidStreamThrottlingBedrockClient(FakeBedrockClient):
+    """
+    Bedrock stand-in whose response stream fails with a throttlingException event after the first chunk.
+    """
+
+    def invoke_model_with_response_stream(self, modelId: str, body: str) -> dict:
+        events = super().invoke_model_with_response_stream(modelId, body)["body"]
+
+        def throttled_events():
+            yield next(events)
+            # botocore raises the exception events of a stream as an EventStreamError, named in lower camel case.
+            raise FakeClientError("throttlingException", 400)
+
+        return {"body": throttled_events()}
+
+
+def check_errors() -> None:
+    failures = []
+    os.environ["rate_limits"] = json.dumps({"bedrock-runtime": {"rate": 10}})
+    calls.reset()
+    fake = QuotaExceededBedrockClient()
+    client = calls.ResilientClient(fake, "bedrock-runtime", max_retries=5)
+    try:
+        client.invoke_model(modelId="model", body="{}")
+        failures.append("quota exceeded: no error raised")
+    except calls.CallError as exc:
+        if type(exc) is not calls.RequestError:
+            failures.append(f"quota exceeded: raised {type(exc).__name__}, expected RequestError")
+    if fake.calls["invoke_model"] != 1:
+        failures.append(f"quota exceeded: {fake.calls['invoke_model']} attempts, expected 1")
+    if calls.bucket_for("bedrock-runtime", "invoke_model").rate != 10:
+        failures.append("quota exceeded: the token bucket was slowed down")
+
+    generate_report = load_lambda("generate_report")
+    chunks = generate_report.stream_jamba_message(MidStreamThrottlingBedrockClient(), "model", "prompt")
+    try:
+        generate_report.collect_stream(chunks)
+        failures.append("mid-stream throttling: no error raised")
+    except calls.CallError as exc:
+        if type(exc) is not calls.ThrottledError:
+            failures.append(f"mid-stream throttling: raised {type(exc).__name__}, expected ThrottledError")
+    except Exception as exc:
+        failures.append(f"mid-stream throttling: raised {type(exc).__name__}, expected ThrottledError")
+    if calls.bucket_for("bedrock-runtime", "invoke_model_with_response_stream").rate >= 10:
+        failures.append("mid-stream throttling: the token bucket was not slowed down")
+
+    for failure in failures:
+        print(f"FAILED {failure}")
+    if failures:
+        raise SystemExit(1)
+    print("quota and mid-stream throttling errors checked")
+
+
+def run(args, max_retries: int, rate_limited: bool) -> dict:
+    os.environ["rate_limits"] = json.dumps(
+        {"bedrock-runtime": {"rate": args.quota, "burst": args.quota}} if rate_limited else {}
+    )
+    calls.reset()
+    fake = FakeBedrockClient(latency=args.latency, quota=args.quota)
+    client = calls.ResilientClient(fake, "bedrock-runtime", max_retries=max_retries)
+
+    def invoke(_) -> bool:
+        try:
+            client.invoke_model(modelId="model", body="{}")
+            return True
+        except calls.CallError:
+            return False
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        succeeded = sum(executor.map(invoke, range(args.calls)))
+    metrics = calls.METRICS.stats()["bedrock-runtime.invoke_model"]
+    return {
+        "seconds": time.perf_counter() - start,
+        "succeeded": succeeded,
+        "failed": args.calls - succeeded,
+        "throttles": fake.quota.throttled,
+        "retries": metrics["retries"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=20, help="Number of model invocations.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent callers.")
+    parser.add_argument("--quota", type=float, default=5, help="Calls per second accepted by the fake service.")
+    parser.add_argument("--latency", type=float, default=0.1, help="Injected latency per call in seconds.")
+    args = parser.parse_args()
+
+    check_errors()
+    modes = [
+        ("no retries", 0, False),
+        ("backoff", 8, False),
+        ("rate limited", 8, True),
+    ]
+    print(f"{'mode':>13} {'seconds':>8} {'ok':>4} {'failed':>7} {'throttles':>10} {'retries':>8}")
+    for name, max_retries, rate_limited in modes:
+        result = run(args, max_retries, rate_limited)
+        print(
+            f"{name:>13} {result['seconds']:>8.2f} {result['succeeded']:>4} {result['failed']:>7}"
+            f" {result['throttles']:>10} {result['retries']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
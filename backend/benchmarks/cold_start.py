@@ -0,0 +1,130 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Measure module import and first-invoke latency of each Lambda function in fresh processes.
+
+    python -m benchmarks.cold_start --runs 5 --ssm-latency 0.05
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ORIGIN = "https://localhost:8080"
+
+EVENTS = {
+    "get_applications": {
+        "httpMethod": "GET",
+        "path": "/get-applications-options",
+        "headers": {"origin": ORIGIN},
+    },
+    "generate_report": {
+        "httpMethod": "POST",
+        "path": "/generate-report",
+        "headers": {"origin": ORIGIN},
+        "body": None,
+    },
+    # Unified deployment, importing only the get_applications handler on its first request.
+    "router": {
+        "httpMethod": "GET",
+        "path": "/get-applications-options",
+        "headers": {"origin": ORIGIN},
+    },
+}
+
+
+def measure_child(name: str, ssm_latency: float, api_latency: float) -> dict:
+    """
+    Runs inside a fresh interpreter and returns the timings of one cold start.
+    """
+    start = time.perf_counter()
+    from benchmarks.fakes import FakeBedrockClient, FakeResilienceHubClient, FakeSSMClient
+    from benchmarks.loader import load_lambda
+
+    ssm = FakeSSMClient(allowed_origins=ORIGIN, latency=ssm_latency)
+    resiliencehub = FakeResilienceHubClient(app_count=5, latency=api_latency)
+    bedrock = FakeBedrockClient(latency=api_latency)
+    harness_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    module = load_lambda(name, clients={"ssm": ssm, "resiliencehub": resiliencehub, "bedrock-runtime": bedrock})
+    import_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    module.lambda_handler({"httpMethod": "OPTIONS", "path": EVENTS[name]["path"], "headers": {"origin": ORIGIN}}, None)
+    options_seconds = time.perf_counter() - start
+
+    event = dict(EVENTS[name])
+    if name == "generate_report":
+        app_arn = resiliencehub.apps[0]["appArn"]
+        event["body"] = json.dumps({
+            "persona": "engineer",
+            "app_arn": app_arn,
+            "assessment_arn": resiliencehub.assessments[app_arn][0]["assessmentArn"],
+        })
+    start = time.perf_counter()
+    module.lambda_handler(event, None)
+    invoke_seconds = time.perf_counter() - start
+
+    return {
+        "harness": harness_seconds,
+        "import": import_seconds,
+        "first_options": options_seconds,
+        "first_invoke": invoke_seconds,
+        "ssm_calls": ssm.calls["get_parameter"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh processes per function and configuration source.")
+    parser.add_argument("--ssm-latency", type=float, default=0.05, help="Injected SSM get_parameter latency in seconds.")
+    parser.add_argument("--api-latency", type=float, default=0.0, help="Injected Resilience Hub and Bedrock latency in seconds.")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure_child(args.child, args.ssm_latency, args.api_latency)))
+        return
+
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    print(f"{'function':<18} {'config':<6} {'import':>9} {'OPTIONS':>9} {'invoke':>9} {'ssm':>4}")
+    for name in EVENTS:
+        for source in ("ssm", "env"):
+            env = {key: value for key, value in os.environ.items() if key != "allowed_origins"}
+            if source == "env":
+                env["allowed_origins"] = ORIGIN
+            samples = []
+            for _ in range(args.runs):
+                output = subprocess.run(
+                    [
+                        sys.executable, "-m", "benchmarks.cold_start",
+                        "--child", name,
+                        "--ssm-latency", str(args.ssm_latency),
+                        "--api-latency", str(args.api_latency),
+                    ],
+                    cwd=backend_dir,
+                    env=env,
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                ).stdout
+                samples.append(json.loads(output.strip().splitlines()[-1]))
+
+            def median_ms(key: str) -> float:
+                return statistics.median(sample[key] for sample in samples) * 1000
+
+            print(
+                f"{name:<18} {source:<6} {median_ms('import'):>7.1f}ms {median_ms('first_options'):>7.1f}ms "
+                f"{median_ms('first_invoke'):>7.1f}ms {samples[0]['ssm_calls']:>4}"
+            )
+
+
+if __name__ == "__main__":
+    main()
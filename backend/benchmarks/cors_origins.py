@@ -0,0 +1,110 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Check the origin matching of both Lambda functions, and count the invocations
+that answering preflights in API Gateway saves over a report session.
+
+Partial origins, which the former substring match against the comma-joined
+allowed_origins accepted, must now be rejected:
+
+    python -m benchmarks.cors_origins --polls 10
+"""
+
+import argparse
+import contextlib
+import io
+import json
+
+from benchmarks.fakes import FakeBedrockClient, FakeResilienceHubClient, FakeSSMClient
+from benchmarks.loader import load_lambda
+
+
+ALLOWED_ORIGINS = "https://d111111abcdef8.cloudfront.net, http://localhost:8080"
+
+ACCEPTED = [
+    "https://d111111abcdef8.cloudfront.net",
+    "http://localhost:8080",
+    "HTTPS://D111111ABCDEF8.cloudfront.net",
+]
+
+# Substrings of the allowed_origins string, and look-alikes of the allowed origins.
+REJECTED = [
+    "https://d111111abcdef8",
+    "d111111abcdef8.cloudfront.net",
+    "http://localhost",
+    "localhost:8080",
+    "https://",
+    ", ",
+    "net, http://localhost:8080",
+    "https://d111111abcdef8.cloudfront.net.example.com",
+    "http://localhost:80800",
+    "",
+    None,
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--polls", type=int, default=10, help="Report job polls in a session.")
+    args = parser.parse_args()
+
+    resiliencehub = FakeResilienceHubClient(app_count=2)
+    clients = {
+        "resiliencehub": resiliencehub,
+        "bedrock-runtime": FakeBedrockClient(),
+        "ssm": FakeSSMClient(allowed_origins=ALLOWED_ORIGINS),
+    }
+    functions = {name: load_lambda(name, clients) for name in ("get_applications", "generate_report")}
+
+    app_arn = resiliencehub.apps[0]["appArn"]
+    events = {
+        "get_applications": [
+            {"httpMethod": "OPTIONS", "path": "/get-applications-options"},
+            {"httpMethod": "GET", "path": "/get-applications-options"},
+        ],
+        "generate_report": [
+            {"httpMethod": "OPTIONS", "path": "/generate-report"},
+            {
+                "httpMethod": "POST",
+                "path": "/generate-report",
+                "body": json.dumps({
+                    "persona": "engineer",
+                    "app_arn": app_arn,
+                    "assessment_arn": resiliencehub.assessments[app_arn][0]["assessmentArn"],
+                }),
+            },
+        ],
+    }
+
+    failures = []
+    checks = 0
+    for name, module in functions.items():
+        for event in events[name]:
+            for origin in ACCEPTED + REJECTED:
+                headers = {} if origin is None else {"Origin": origin}
+                with contextlib.redirect_stdout(io.StringIO()):
+                    response = module.lambda_handler({**event, "headers": headers}, None)
+                allowed = origin in ACCEPTED
+                checks += 1
+                if (response["statusCode"] != 403) != allowed:
+                    failures.append(f"{name} {event['httpMethod']} {origin!r}: {response['statusCode']}")
+                elif allowed and response["headers"]["Access-Control-Allow-Origin"] != origin:
+                    failures.append(f"{name} {event['httpMethod']} {origin!r}: echoed {response['headers']['Access-Control-Allow-Origin']!r}")
+
+    for failure in failures:
+        print(f"FAILED {failure}")
+    if failures:
+        raise SystemExit(1)
+    print(f"{checks} origin checks passed, {len(REJECTED)} partial or look-alike origins rejected")
+
+    # Options list, report job submission, then the job polls.
+    requests = 2 + args.polls
+    print(f"{'preflight':>10} {'invocations per session':>24}")
+    print(f"{'lambda':>10} {requests * 2:>24}")
+    print(f"{'gateway':>10} {requests:>24}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Compare cold starts of the split and unified deployment modes under light traffic.
+
+First checks that the router returns the same responses as the split handlers.
+Then it replays synthetic user sessions against simulated pools of Lambda
+containers. A session lists the options, submits a report job, which also invokes
+the function asynchronously, and polls the job until it completes. Idle containers
+are reclaimed after the idle timeout. The timeout is not documented by Lambda, so
+try several values:
+
+    python -m benchmarks.deployment_modes --sessions-per-hour 1 4 12 60 --idle-minutes 10
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import random
+from typing import Dict, List, Tuple
+
+from benchmarks.fakes import FakeBedrockClient, FakeResilienceHubClient
+from benchmarks.loader import load_lambda, register_clients
+
+
+ORIGIN = "https://localhost:8080"
+
+# Seconds each invocation keeps a container busy.
+DURATIONS = {
+    "options": 0.3,
+    "submit": 0.1,
+    "poll": 0.05,
+    "job": 20.0,
+}
+FUNCTIONS = {
+    "options": "get_applications",
+    "submit": "generate_report",
+    "poll": "generate_report",
+    "job": "generate_report",
+}
+POLL_INTERVAL_SECONDS = 3
+
+
+def check_router() -> int:
+    """
+    Invokes every route through the router and the split handlers, and compares the responses.
+
+    Returns:
+        int: Number of routes checked.
+    """
+    resiliencehub = FakeResilienceHubClient(app_count=3)
+    register_clients({"resiliencehub": resiliencehub, "bedrock-runtime": FakeBedrockClient()})
+    router = load_lambda("router")
+    handlers = {name: load_lambda(name) for name in ("get_applications", "generate_report")}
+
+    app_arn = resiliencehub.apps[0]["appArn"]
+    report = json.dumps({
+        "persona": "engineer",
+        "app_arn": app_arn,
+        "assessment_arn": resiliencehub.assessments[app_arn][0]["assessmentArn"],
+    })
+    headers = {"origin": ORIGIN}
+    events = [
+        ("get_applications", {"httpMethod": "GET", "path": "/get-applications-options", "headers": headers}),
+        ("get_applications", {"httpMethod": "OPTIONS", "path": "/get-applications-options", "headers": headers}),
+        ("generate_report", {"httpMethod": "POST", "path": "/generate-report", "headers": headers, "body": report}),
+        ("generate_report", {"httpMethod": "GET", "path": "/generate-report-jobs", "headers": headers, "queryStringParameters": {"job_id": "missing"}}),
+        ("generate_report", {"httpMethod": "GET", "path": "/get-applications-options", "headers": {"origin": "https://localhost"}}),
+    ]
+    for name, event in events:
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected = handlers[name].lambda_handler(event, None)
+            routed = router.lambda_handler(event, None)
+        if routed["statusCode"] != expected["statusCode"] or routed.get("body") != expected.get("body"):
+            raise AssertionError(f"Router response to {event['httpMethod']} {event['path']} differs from {name}")
+    return len(events)
+
+
+def session_invocations(start: float, rng: random.Random) -> List[Tuple[float, str]]:
+    """
+    Returns the (time, kind) invocations of one user session.
+    """
+    invocations = [(start, "options")]
+    submitted = start + rng.uniform(20, 120)
+    invocations.append((submitted, "submit"))
+    # The job is invoked by the submit request, while it is still running.
+    invocations.append((submitted + 0.01, "job"))
+    poll = submitted + POLL_INTERVAL_SECONDS
+    while poll < submitted + DURATIONS["job"] + POLL_INTERVAL_SECONDS:
+        invocations.append((poll, "poll"))
+        poll += POLL_INTERVAL_SECONDS
+    return invocations
+
+
+def simulate(invocations: List[Tuple[float, str]], unified: bool, idle_seconds: float) -> Dict[str, int]:
+    """
+    Replays invocations against per-function container pools.
+
+    An invocation runs on the most recently used idle container that has not been
+    reclaimed, or starts a new container, a cold start.
+
+    Returns:
+        Dict[str, int]: Cold starts of user requests and of report jobs.
+    """
+    pools = {}
+    cold = {"user": 0, "job": 0}
+    for time, kind in sorted(invocations):
+        pool = pools.setdefault("Backend" if unified else FUNCTIONS[kind], [])
+        # A container is [busy until, idle since]. Reclaimed containers are dropped.
+        pool[:] = [container for container in pool if container[0] > time or time - container[1] <= idle_seconds]
+        idle = [container for container in pool if container[0] <= time]
+        if idle:
+            container = max(idle, key=lambda container: container[1])
+        else:
+            container = [time, time]
+            pool.append(container)
+            cold["job" if kind == "job" else "user"] += 1
+        container[0] = container[1] = time + DURATIONS[kind]
+    return cold
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions-per-hour", type=float, nargs="+", default=[1, 4, 12, 60], help="Session arrival rates.")
+    parser.add_argument("--idle-minutes", type=float, default=10, help="Minutes before an idle container is reclaimed.")
+    parser.add_argument("--days", type=float, default=7, help="Simulated days.")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed of the session arrivals.")
+    args = parser.parse_args()
+
+    print(f"router matches the split handlers on {check_router()} requests")
+    print(f"idle timeout: {args.idle_minutes:g} min, {args.days:g} days")
+    print(f"{'sessions/h':>10} {'requests':>9} {'split cold':>11} {'unified cold':>13} {'split %':>8} {'unified %':>10}")
+    for rate in args.sessions_per_hour:
+        rng = random.Random(args.seed)
+        invocations = []
+        time = rng.expovariate(rate / 3600)
+        while time < args.days * 86400:
+            invocations.extend(session_invocations(time, rng))
+            time += rng.expovariate(rate / 3600)
+
+        requests = sum(1 for _, kind in invocations if kind != "job")
+        split = simulate(invocations, unified=False, idle_seconds=args.idle_minutes * 60)
+        unified = simulate(invocations, unified=True, idle_seconds=args.idle_minutes * 60)
+        print(
+            f"{rate:>10g} {requests:>9} {split['user']:>11} {unified['user']:>13}"
+            f" {split['user'] * 100 / requests:>7.1f}% {unified['user'] * 100 / requests:>9.1f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Measure how the discovery stage of get_assessment_options() scales with the number of applications.
+
+Latency is not injected, so the time is the in-process work: the assessment
+selection and the join of applications with their assessments. The join is
+compared with the former nested loop over assessments and applications.
+
+    python -m benchmarks.discovery_scaling --apps 100 1000 10000
+"""
+
+import argparse
+import contextlib
+import io
+import time
+from typing import Callable, Dict, List
+
+from benchmarks.fakes import FakeResilienceHubClient
+from benchmarks.loader import load_lambda
+
+
+def indexed_join(assessments: List[Dict], apps: List[Dict], option: Callable[[Dict, Dict], Dict]) -> List[Dict]:
+    """
+    The indexed build_app_assessment_list, later replaced by list_apps_with_latest_assessment pairing
+    every application with its assessment.
+    """
+    apps_by_arn = {}
+    for app in apps:
+        apps_by_arn.setdefault(app["appArn"], app)
+
+    return [
+        option(apps_by_arn[assessment["appArn"]], assessment)
+        for assessment in assessments
+        if assessment["appArn"] in apps_by_arn
+    ]
+
+
+def nested_loop_join(assessments: List[Dict], apps: List[Dict], option: Callable[[Dict, Dict], Dict]) -> List[Dict]:
+    """
+    The former build_app_assessment_list, matching every assessment against every application.
+    """
+    app_assessment_list = []
+    for assessment in assessments:
+        for app in apps:
+            if assessment["appArn"] == app["appArn"]:
+                app_assessment_list.append(option(app, assessment))
+    return app_assessment_list
+
+
+def timed_ms(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--apps", type=int, nargs="+", default=[100, 1000, 10000], help="Application counts to measure.")
+    parser.add_argument("--assessments", type=int, default=10, help="Assessments per application.")
+    parser.add_argument("--nested-limit", type=int, default=10000, help="Largest application count the nested loop is run for.")
+    args = parser.parse_args()
+
+    get_applications = load_lambda("get_applications")
+
+    print(f"{'apps':>7} {'discovery ms':>13} {'us/app':>8} {'join ms':>9} {'nested ms':>10} {'us/app':>8}")
+    for app_count in args.apps:
+        client = FakeResilienceHubClient(
+            app_count=app_count,
+            assessments_per_app=args.assessments,
+            components_per_app=1,
+            resources_per_component=1,
+            versions_per_app=1,
+        )
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            apps = get_applications.list_active_apps(client=client)
+            pairs, discovery_ms = timed_ms(get_applications.list_apps_with_latest_assessment, client=client, apps=apps)
+            options = [get_applications.app_assessment_option(app, assessment) for app, assessment in pairs]
+            assessments = [assessment for _, assessment in pairs]
+            joined, join_ms = timed_ms(indexed_join, assessments, apps, get_applications.app_assessment_option)
+
+        if joined != options:
+            raise AssertionError(f"Joined options for {app_count} applications differ from the paired ones")
+
+        nested = "-"
+        nested_per_app = "-"
+        if app_count <= args.nested_limit:
+            nested_options, nested_ms = timed_ms(nested_loop_join, assessments, apps, get_applications.app_assessment_option)
+            if nested_options != options:
+                raise AssertionError(f"Nested loop options for {app_count} applications differ")
+            nested = f"{nested_ms:.1f}"
+            nested_per_app = f"{nested_ms * 1000 / app_count:.1f}"
+
+        print(
+            f"{app_count:>7} {discovery_ms:>13.1f} {discovery_ms * 1000 / app_count:>8.1f}"
+            f" {join_ms:>9.2f} {nested:>10} {nested_per_app:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+In-process stand-ins for the AWS clients used by the Lambda functions.
+"""
+
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+
+class FakeClientError(Exception):
+    """
+    Stand-in for botocore ClientError, carrying the same response structure.
+    """
+
+    def __init__(self, code: str, status_code: int = 400):
+        self.response = {"Error": {"Code": code}, "ResponseMetadata": {"HTTPStatusCode": status_code}}
+        super().__init__(code)
+
+
+class FakeQuota:
+    """
+    Server-side request quota raising ThrottlingException above a number of calls per second.
+    """
+
+    def __init__(self, calls_per_second: Optional[float] = None):
+        self.calls_per_second = calls_per_second
+        self.throttled = 0
+        self._calls = []
+        self._lock = threading.Lock()
+
+    def check(self) -> None:
+        if not self.calls_per_second:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._calls = [call for call in self._calls if call > now - 1]
+            if len(self._calls) >= self.calls_per_second:
+                self.throttled += 1
+                raise FakeClientError("ThrottlingException", 429)
+            self._calls.append(now)
+
+
+class FakeSSMClient:
+    """
+    Stand-in for the SSM client that serves the stack configuration parameter.
+    """
+
+    def __init__(self, allowed_origins: str = "https://localhost:8080", latency: float = 0.0):
+        self.latency = latency
+        self.calls = Counter()
+        self.value = json.dumps({
+            "allowed_origins": allowed_origins,
+            "user_pool_id": "local",
+            "user_email": "local@example.com",
+        })
+
+    def get_parameter(self, Name: str) -> Dict:
+        self.calls["get_parameter"] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return {"Parameter": {"Name": Name, "Value": self.value}}
+
+
+COMPLIANCE_STATUSES = ["PolicyMet", "PolicyBreached", "ChangesDetected", "NotAssessed"]
+
+
+class FakeResilienceHubClient:
+    """
+    Stand-in for the Resilience Hub client backed by a synthetic account.
+
+    Every call sleeps for the configured latency to emulate a network round-trip
+    and is counted in the calls counter. Calls above the quota, in calls per second,
+    raise a throttling error. With distinct_changes, every component gets a suggested
+    change of its own, so recommendations do not collapse into a few groups. With
+    random_ids, ARNs end in random UUIDs like real ones, instead of the app index.
+    """
+
+    def __init__(self, app_count: int = 100, assessments_per_app: int = 3, components_per_app: int = 5, resources_per_component: int = 2, latency: float = 0.0, page_size: int = 100, versions_per_app: int = 2, quota: Optional[float] = None, distinct_changes: bool = False, random_ids: bool = False):
+        self.latency = latency
+        self.page_size = page_size
+        self.quota = FakeQuota(quota)
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+        now = datetime(2024, 6, 1)
+        self.apps = []
+        self.versions = {}
+        self.assessments = {}
+        self.resources = {}
+        self.recommendations = {}
+        rng = random.Random(app_count)
+        for index in range(app_count):
+            if random_ids:
+                app_arn = f"arn:aws:resiliencehub:us-east-1:123456789012:app/{uuid.UUID(int=rng.getrandbits(128), version=4)}"
+            else:
+                app_arn = f"arn:aws:resiliencehub:us-east-1:123456789012:app/app-{index:05d}"
+            self.apps.append({
+                "appArn": app_arn,
+                "name": f"app-{index:05d}",
+                "status": "Active",
+                "complianceStatus": COMPLIANCE_STATUSES[index % len(COMPLIANCE_STATUSES)],
+                "resiliencyScore": float(index * 37 % 101),
+                "lastAppComplianceEvaluationTime": now,
+            })
+            self.versions[app_arn] = [{"appVersion": "draft"}] + [
+                {"appVersion": "release" if number == versions_per_app - 2 else f"v{number + 1}"}
+                for number in range(versions_per_app - 1)
+            ]
+            self.assessments[app_arn] = [
+                {
+                    "appArn": app_arn,
+                    "assessmentArn": (
+                        f"arn:aws:resiliencehub:us-east-1:123456789012:app-assessment/{uuid.UUID(int=rng.getrandbits(128), version=4)}"
+                        if random_ids else f"{app_arn}/assessment-{number}"
+                    ),
+                    "assessmentStatus": "Success",
+                    "startTime": now + timedelta(days=number),
+                    "endTime": now + timedelta(days=number, hours=1),
+                }
+                for number in range(assessments_per_app)
+            ]
+            self.resources[app_arn] = [
+                {
+                    "physicalResourceId": {"identifier": f"{app_arn}/resource-{component}-{number}"},
+                    "resourceType": "AWS::DynamoDB::Table",
+                    "appComponents": [{"id": f"component-{component}", "name": f"component-{component}"}],
+                }
+                for component in range(components_per_app)
+                for number in range(resources_per_component)
+            ]
+            for assessment in self.assessments[app_arn]:
+                self.recommendations[assessment["assessmentArn"]] = [
+                    {
+                        "appComponentName": f"component-{component}",
+                        "recommendationStatus": "BreachedCanMeet" if component % 2 else "MetCanImprove",
+                        "configRecommendations": [
+                            {
+                                "suggestedChanges": [
+                                    "Enable point-in-time recovery",
+                                    "Add a global table replica in a second Region",
+                                ] + ([f"Raise the capacity of table component-{component}"] if distinct_changes else [])
+                            }
+                        ],
+                    }
+                    for component in range(components_per_app)
+                ]
+
+    def _call(self, operation: str) -> None:
+        with self._lock:
+            self.calls[operation] += 1
+        self.quota.check()
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _page(self, operation: str, items: List, response_key: str, nextToken: Optional[str] = None) -> Dict:
+        self._call(operation)
+        start = int(nextToken) if nextToken else 0
+        end = start + self.page_size
+        response = {response_key: items[start:end]}
+        if end < len(items):
+            response["nextToken"] = str(end)
+        return response
+
+    def list_apps(self, nextToken: Optional[str] = None) -> Dict:
+        return self._page("list_apps", self.apps, "appSummaries", nextToken)
+
+    def list_app_versions(self, appArn: str, nextToken: Optional[str] = None) -> Dict:
+        return self._page("list_app_versions", self.versions[appArn], "appVersions", nextToken)
+
+    def list_app_assessments(self, appArn: str, nextToken: Optional[str] = None) -> Dict:
+        return self._page("list_app_assessments", self.assessments[appArn], "assessmentSummaries", nextToken)
+
+    def describe_app(self, appArn: str) -> Dict:
+        self._call("describe_app")
+        app = next((app for app in self.apps if app["appArn"] == appArn), None)
+        if app is None:
+            raise FakeClientError("ResourceNotFoundException", 404)
+        return {"app": dict(app)}
+
+    def describe_app_assessment(self, assessmentArn: str) -> Dict:
+        self._call("describe_app_assessment")
+        assessment = next(
+            assessment
+            for assessments in self.assessments.values()
+            for assessment in assessments
+            if assessment["assessmentArn"] == assessmentArn
+        )
+        return {"assessment": dict(assessment)}
+
+    def list_app_version_resources(self, appArn: str, appVersion: str, nextToken: Optional[str] = None) -> Dict:
+        return self._page("list_app_version_resources", self.resources[appArn], "physicalResources", nextToken)
+
+    def list_app_component_recommendations(self, assessmentArn: str, nextToken: Optional[str] = None) -> Dict:
+        return self._page(
+            "list_app_component_recommendations",
+            self.recommendations[assessmentArn],
+            "componentRecommendations",
+            nextToken,
+        )
+
+
+class FakeStreamingBody:
+    """
+    Stand-in for the botocore StreamingBody returned by invoke_model.
+    """
+
+    def __init__(self, payload: bytes):
+        self.payload = payload
+
+    def read(self) -> bytes:
+        return self.payload
+
+
+class FakeBedrockClient:
+    """
+    Stand-in for the Bedrock runtime client returning a fixed HTML report.
+    """
+
+    def __init__(self, latency: float = 0.0, report: str = "<HTML><body>Report</body></HTML>", chunk_size: int = 16, chunk_latency: float = 0.0, quota: Optional[float] = None, latency_per_1k_tokens: float = 0.0):
+        self.latency = latency
+        self.latency_per_1k_tokens = latency_per_1k_tokens
+        self.quota = FakeQuota(quota)
+        self.report = report
+        self.chunk_size = chunk_size
+        self.chunk_latency = chunk_latency
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    def _input_latency(self, body: str) -> float:
+        # About four characters per token, as estimated by the compaction stage.
+        return self.latency_per_1k_tokens * len(body) / 4000
+
+    def invoke_model(self, modelId: str, body: str) -> Dict:
+        with self._lock:
+            self.calls["invoke_model"] += 1
+        self.quota.check()
+        time.sleep(self.latency + self._input_latency(body))
+        payload = json.dumps({"choices": [{"message": {"content": self.report}}]})
+        return {"body": FakeStreamingBody(payload.encode("utf-8"))}
+
+    def invoke_model_with_response_stream(self, modelId: str, body: str) -> Dict:
+        with self._lock:
+            self.calls["invoke_model_with_response_stream"] += 1
+        self.quota.check()
+
+        def events():
+            time.sleep(self.latency + self._input_latency(body))
+            for start in range(0, len(self.report), self.chunk_size):
+                if start and self.chunk_latency:
+                    time.sleep(self.chunk_latency)
+                payload = {"choices": [{"index": 0, "delta": {"content": self.report[start:start + self.chunk_size]}}]}
+                yield {"chunk": {"bytes": json.dumps(payload).encode("utf-8")}}
+
+        return {"body": events()}
+
+
+class FakeDynamoDBClient:
+    """
+    Stand-in for the low-level DynamoDB client, keeping items in a dictionary.
+
+    Items above the 400 KB DynamoDB item size limit are rejected with a ValidationException.
+    Condition expressions support OR-ed attribute_not_exists, = and < comparisons, and
+    update expressions ADD to a string set and SET attributes, as the cache backend uses them.
+    """
+
+    MAX_ITEM_BYTES = 400 * 1024
+
+    def __init__(self):
+        self.tables = {}
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    def get_item(self, TableName: str, Key: Dict) -> Dict:
+        self.calls["get_item"] += 1
+        item = self.tables.get(TableName, {}).get(Key["pk"]["S"])
+        return {"Item": item} if item is not None else {}
+
+    def put_item(self, TableName: str, Item: Dict, ReturnValues: str = "NONE", ConditionExpression: Optional[str] = None, ExpressionAttributeNames: Optional[Dict] = None, ExpressionAttributeValues: Optional[Dict] = None) -> Dict:
+        self.calls["put_item"] += 1
+        if self.item_size(Item) > self.MAX_ITEM_BYTES:
+            raise FakeClientError("ValidationException")
+        with self._lock:
+            table = self.tables.setdefault(TableName, {})
+            old = table.get(Item["pk"]["S"])
+            self._check(old, ConditionExpression, ExpressionAttributeNames, ExpressionAttributeValues)
+            table[Item["pk"]["S"]] = Item
+        return {"Attributes": old} if ReturnValues == "ALL_OLD" and old is not None else {}
+
+    def update_item(self, TableName: str, Key: Dict, UpdateExpression: str, ConditionExpression: Optional[str] = None, ExpressionAttributeNames: Optional[Dict] = None, ExpressionAttributeValues: Optional[Dict] = None) -> Dict:
+        self.calls["update_item"] += 1
+        names = ExpressionAttributeNames or {}
+        values = ExpressionAttributeValues or {}
+        with self._lock:
+            table = self.tables.setdefault(TableName, {})
+            old = table.get(Key["pk"]["S"])
+            self._check(old, ConditionExpression, names, values)
+            item = dict(old or Key)
+            for action, name, value in re.findall(r"(ADD|SET)?\s*(#?\w+)\s*=?\s*(:\w+)", UpdateExpression):
+                attribute = names.get(name, name)
+                if "SS" in values[value]:
+                    members = item.get(attribute, {"SS": []})["SS"]
+                    item[attribute] = {"SS": members + [member for member in values[value]["SS"] if member not in members]}
+                else:
+                    item[attribute] = values[value]
+            table[Key["pk"]["S"]] = item
+        return {}
+
+    def delete_item(self, TableName: str, Key: Dict, ReturnValues: str = "NONE") -> Dict:
+        self.calls["delete_item"] += 1
+        with self._lock:
+            old = self.tables.get(TableName, {}).pop(Key["pk"]["S"], None)
+        return {"Attributes": old} if ReturnValues == "ALL_OLD" and old is not None else {}
+
+    @staticmethod
+    def _check(item: Optional[Dict], expression: Optional[str], names: Optional[Dict], values: Optional[Dict]) -> None:
+        if not expression:
+            return
+        names = names or {}
+        values = values or {}
+        for clause in expression.split(" OR "):
+            missing = re.fullmatch(r"attribute_not_exists\((#?\w+)\)", clause.strip())
+            if missing:
+                if item is None or names.get(missing.group(1), missing.group(1)) not in item:
+                    return
+                continue
+            name, operator, value = re.fullmatch(r"(#?\w+) (=|<) (:\w+)", clause.strip()).groups()
+            stored = (item or {}).get(names.get(name, name))
+            if stored is None:
+                continue
+            (kind, data), = stored.items()
+            expected = values[value][kind] if kind in values[value] else None
+            if expected is None:
+                continue
+            if kind == "N":
+                data, expected = float(data), float(expected)
+            if (operator == "=" and data == expected) or (operator == "<" and data < expected):
+                return
+        raise FakeClientError("ConditionalCheckFailedException")
+
+    @staticmethod
+    def item_size(item: Dict) -> int:
+        """
+        Returns the size of an item as DynamoDB counts it: attribute names plus values.
+        """
+        size = 0
+        for name, value in item.items():
+            (kind, data), = value.items()
+            if kind == "B":
+                size += len(name.encode("utf-8")) + len(data)
+            elif kind == "SS":
+                size += len(name.encode("utf-8")) + sum(len(member.encode("utf-8")) for member in data)
+            else:
+                size += len(name.encode("utf-8")) + len(str(data).encode("utf-8"))
+        return size
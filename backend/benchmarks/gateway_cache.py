@@ -0,0 +1,140 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Check the caching headers of the applications options responses, and count the
+GetApplications invocations the API Gateway cache saves.
+
+First checks the Cache-Control and Vary headers, and that the x-cache-bypass
+header refreshes the options within their TTL. Then it replays page loads of
+users, each with an ID token renewed hourly, against a simulated gateway cache
+keyed on the cache key parameters of apigateway.py:
+
+    python -m benchmarks.gateway_cache --users 20 --loads-per-hour 6 --ttl 300
+"""
+
+import argparse
+import contextlib
+import io
+import random
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks.fakes import FakeResilienceHubClient
+from benchmarks.loader import load_lambda, register_clients
+
+
+ORIGIN = "https://localhost:8080"
+TOKEN_LIFETIME_SECONDS = 3600
+
+# OPTIONS_CACHE_KEY_PARAMETERS of resources/apigateway.py, which imports aws_cdk.
+CACHE_KEY_HEADERS = ("authorization", "x-cache-bypass", "origin", "accept-encoding")
+CACHE_KEY_QUERY = ("q", "prefix", "compliance_status", "min_score", "max_score", "cursor", "limit")
+
+
+def cache_key(event: Dict) -> Tuple:
+    """
+    Returns the API Gateway cache key of an event, from the cache key parameters.
+    """
+    headers = {name.lower(): value for name, value in (event.get("headers") or {}).items()}
+    params = event.get("queryStringParameters") or {}
+    return tuple(headers.get(name) for name in CACHE_KEY_HEADERS) + tuple(params.get(name) for name in CACHE_KEY_QUERY)
+
+
+def invoke(module, headers: Dict, params: Optional[Dict] = None) -> Dict:
+    event = {
+        "httpMethod": "GET",
+        "path": "/get-applications-options",
+        "headers": {"origin": ORIGIN, **headers},
+        "queryStringParameters": params,
+    }
+    with contextlib.redirect_stdout(io.StringIO()):
+        return module.lambda_handler(event, None)
+
+
+def check_headers(module, resiliencehub: FakeResilienceHubClient) -> List[str]:
+    """
+    Checks the caching headers and the cache bypass.
+
+    Returns:
+        List[str]: Failed checks.
+    """
+    failures = []
+    response = invoke(module, {"Authorization": "Bearer a"})
+    vary = [name.strip().lower() for name in response["headers"]["Vary"].split(",")]
+    if not response["headers"]["Cache-Control"].startswith("private, max-age="):
+        failures.append(f"options Cache-Control: {response['headers']['Cache-Control']}")
+    for name in ("origin", "authorization", "x-cache-bypass", "accept-encoding"):
+        if name not in vary:
+            failures.append(f"options Vary lacks {name}: {response['headers']['Vary']}")
+
+    response = invoke(module, {"Authorization": "Bearer a"}, {"limit": "0"})
+    if response["statusCode"] != 400 or response["headers"]["Cache-Control"] != "no-store":
+        failures.append(f"invalid query: {response['statusCode']} {response['headers'].get('Cache-Control')}")
+
+    list_apps = resiliencehub.calls["list_apps"]
+    invoke(module, {"Authorization": "Bearer a"})
+    if resiliencehub.calls["list_apps"] != list_apps:
+        failures.append("options refreshed within their TTL")
+    invoke(module, {"Authorization": "Bearer a", "X-Cache-Bypass": "1"})
+    if resiliencehub.calls["list_apps"] == list_apps:
+        failures.append("x-cache-bypass did not refresh the options")
+    return failures
+
+
+def simulate(users: int, loads_per_hour: float, ttl: float, hours: float, seed: int) -> Tuple[int, int]:
+    """
+    Replays page loads through a gateway cache.
+
+    Returns:
+        Tuple[int, int]: Page loads, and the function invocations on cache misses.
+    """
+    rng = random.Random(seed)
+    loads = []
+    for user in range(users):
+        time = rng.expovariate(loads_per_hour / 3600)
+        while time < hours * 3600:
+            loads.append((time, user))
+            time += rng.expovariate(loads_per_hour / 3600)
+
+    cache = {}
+    invocations = 0
+    for time, user in sorted(loads):
+        token = f"Bearer {user}.{int(time // TOKEN_LIFETIME_SECONDS)}"
+        key = cache_key({
+            "headers": {"Authorization": token, "Origin": ORIGIN, "Accept-Encoding": "gzip, br"},
+            "queryStringParameters": {"limit": "50"},
+        })
+        if key not in cache or time - cache[key] >= ttl:
+            cache[key] = time
+            invocations += 1
+    return len(loads), invocations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20, help="Users loading the report page.")
+    parser.add_argument("--loads-per-hour", type=float, nargs="+", default=[2, 6, 30], help="Page loads per user and hour.")
+    parser.add_argument("--ttl", type=float, default=300, help="Seconds a gateway cache entry is served.")
+    parser.add_argument("--hours", type=float, default=24 * 7, help="Simulated hours.")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed of the page loads.")
+    args = parser.parse_args()
+
+    resiliencehub = FakeResilienceHubClient(app_count=20)
+    register_clients({"resiliencehub": resiliencehub})
+    failures = check_headers(load_lambda("get_applications"), resiliencehub)
+    for failure in failures:
+        print(f"FAILED {failure}")
+    if failures:
+        raise SystemExit(1)
+    print("caching headers and cache bypass checked")
+
+    print(f"gateway cache TTL: {args.ttl:g} s, {args.users} users, {args.hours:g} hours")
+    print(f"{'loads/user/h':>12} {'page loads':>11} {'invocations':>12} {'saved':>7}")
+    for rate in args.loads_per_hour:
+        loads, invocations = simulate(args.users, rate, args.ttl, args.hours, args.seed)
+        print(f"{rate:>12g} {loads:>11} {invocations:>12} {1 - invocations / loads:>6.0%}")
+
+
+if __name__ == "__main__":
+    main()
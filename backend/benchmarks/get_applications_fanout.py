@@ -0,0 +1,49 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Measure get_assessment_options() wall time for increasing concurrency caps.
+
+    python -m benchmarks.get_applications_fanout --apps 400 --latency 0.02
+"""
+
+import argparse
+import time
+
+from benchmarks.fakes import FakeResilienceHubClient
+from benchmarks.loader import load_lambda
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--apps", type=int, default=400, help="Number of applications in the fake account.")
+    parser.add_argument("--latency", type=float, default=0.02, help="Injected latency per API call in seconds.")
+    parser.add_argument("--caps", type=int, nargs="+", default=[1, 4, 16, 64], help="Concurrency caps to measure.")
+    args = parser.parse_args()
+
+    get_applications = load_lambda("get_applications")
+    baseline = None
+
+    print(f"{'cap':>5} {'calls':>7} {'seconds':>9} {'speedup':>8}")
+    for cap in args.caps:
+        client = FakeResilienceHubClient(app_count=args.apps, latency=args.latency)
+
+        start = time.perf_counter()
+        active_apps = get_applications.list_active_apps(client=client)
+        release_apps = get_applications.list_release_versions(client=client, apps=active_apps, max_workers=cap)
+        app_assessments = get_applications.list_apps_with_latest_assessment(client=client, apps=release_apps, max_workers=cap)
+        options = [get_applications.app_assessment_option(app, assessment) for app, assessment in app_assessments]
+        elapsed = time.perf_counter() - start
+
+        if baseline is None:
+            baseline = (elapsed, options)
+        elif options != baseline[1]:
+            raise AssertionError(f"Options for cap {cap} differ from the sequential result")
+
+        calls = sum(client.calls.values())
+        print(f"{cap:>5} {calls:>7} {elapsed:>9.2f} {baseline[0] / elapsed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Import the Lambda function modules outside of the Lambda runtime.
+"""
+
+import importlib
+import importlib.util
+import os
+import sys
+from types import ModuleType
+from typing import Dict, Optional
+
+from benchmarks.fakes import FakeSSMClient
+
+
+LAMBDA_CODE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "resources",
+    "lambda_function_code",
+)
+COMMON_LAYER_DIR = os.path.join(LAMBDA_CODE_DIR, "common", "python")
+
+if COMMON_LAYER_DIR not in sys.path:
+    sys.path.insert(0, COMMON_LAYER_DIR)
+
+import config  # noqa: E402
+
+
+def register_clients(clients: Dict[str, object]) -> None:
+    """
+    Makes the Lambda functions use the given clients instead of Boto3 ones.
+
+    Args:
+        clients (Dict[str, object]): Stand-in clients keyed by Boto3 service name.
+    """
+    for service_name, client in clients.items():
+        config.register_client(service_name, client)
+
+
+def load_lambda(name: str, clients: Optional[Dict[str, object]] = None) -> ModuleType:
+    """
+    Load the lambda_function module of a Lambda function by directory name.
+
+    An SSM stand-in serves the stack configuration, so no credentials are needed.
+
+    Args:
+        name (str): Directory name under resources/lambda_function_code.
+        clients (Dict[str, object], optional): Stand-in clients keyed by Boto3 service name.
+
+    Returns:
+        ModuleType: The imported lambda_function module.
+    """
+    function_dir = os.path.join(LAMBDA_CODE_DIR, name)
+    if function_dir not in sys.path:
+        sys.path.insert(0, function_dir)
+    os.environ.setdefault("parameters", "resilience-hub-genai-config")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+    register_clients({"ssm": FakeSSMClient(), **(clients or {})})
+
+    spec = importlib.util.spec_from_file_location(
+        f"{name}_lambda_function", os.path.join(function_dir, "lambda_function.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_common(name: str) -> ModuleType:
+    """
+    Import a module of the common Lambda layer, e.g. "calls".
+
+    Args:
+        name (str): Module name under resources/lambda_function_code/common/python.
+
+    Returns:
+        ModuleType: The imported module.
+    """
+    return importlib.import_module(name)
@@ -0,0 +1,54 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Compare a single truncated prompt with map-reduce generation for an application with many components.
+
+    python -m benchmarks.map_reduce --components 2000 --latency-per-1k-tokens 0.05
+"""
+
+import argparse
+import time
+
+from benchmarks.fakes import FakeBedrockClient, FakeResilienceHubClient
+from benchmarks.loader import load_lambda, register_clients
+from cache import InMemoryBackend
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--components", type=int, default=2000, help="Application components, each with its own recommendation.")
+    parser.add_argument("--latency", type=float, default=0.2, help="Injected latency per model invocation in seconds.")
+    parser.add_argument("--latency-per-1k-tokens", type=float, default=0.05, help="Injected latency per thousand prompt tokens in seconds.")
+    args = parser.parse_args()
+
+    resiliencehub = FakeResilienceHubClient(app_count=1, components_per_app=args.components, distinct_changes=True)
+    bedrock = FakeBedrockClient(latency=args.latency, latency_per_1k_tokens=args.latency_per_1k_tokens)
+    register_clients({"resiliencehub": resiliencehub, "bedrock-runtime": bedrock})
+    generate_report = load_lambda("generate_report")
+
+    app_arn = resiliencehub.apps[0]["appArn"]
+    assessment_arn = resiliencehub.assessments[app_arn][0]["assessmentArn"]
+    app = generate_report.gather_app_data(app_arn, assessment_arn)
+    label = lambda component: generate_report.app_component_to_friendly_string(component, app)
+    full = generate_report.compact_recommendations(app["recommendations"], label)
+    compacted = generate_report.compact_recommendations(app["recommendations"], label, generate_report.PROMPT_TOKEN_BUDGET)
+    print(f"recommendations: {full.estimated_tokens} tokens in {full.groups_included} groups, "
+          f"prompt budget {generate_report.PROMPT_TOKEN_BUDGET}, chunk {generate_report.MAP_CHUNK_TOKENS}")
+
+    print(f"{'mode':>11} {'seconds':>8} {'model calls':>12} {'prompt tokens':>14} {'groups omitted':>15}")
+    for name, enabled in (("single", False), ("map-reduce", True)):
+        generate_report.MAP_REDUCE_ENABLED = enabled
+        generate_report.REPORT_CACHE.backend = InMemoryBackend()
+        bedrock.calls.clear()
+        start = time.perf_counter()
+        report = generate_report.build_report_input(app)
+        generate_report.generate_text(generate_report.set_prompt("engineer", report))
+        seconds = time.perf_counter() - start
+        omitted = compacted.groups_omitted if not enabled else 0
+        print(f"{name:>11} {seconds:>8.2f} {sum(bedrock.calls.values()):>12} {generate_report.estimate_tokens(report):>14} {omitted:>15}")
+
+
+if __name__ == "__main__":
+    main()
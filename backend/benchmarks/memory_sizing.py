@@ -0,0 +1,220 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Recommend the memory size of each Lambda function from measured memory and CPU use.
+
+Every scenario runs in a fresh process against the fakes, with injected service
+latencies. It records the resident memory the handler adds, including its imports,
+the peak Python heap under tracemalloc, and the CPU and wall time of the invocation.
+
+Lambda allocates CPU in proportion to memory, one vCPU at 1769 MB. The duration at
+a memory size is estimated as the waiting time plus the CPU time, scaled up below
+one vCPU. The recommendation is the memory size with the lowest GB-seconds among
+those leaving headroom over the measured need.
+
+    python -m benchmarks.memory_sizing --profile default
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict
+
+# Memory used by the Lambda Python runtime itself, outside of the handler.
+RUNTIME_MIB = 40
+# Headroom over the measured need, for larger accounts and reports than the scenarios.
+HEADROOM = 1.5
+FULL_VCPU_MB = 1769
+CANDIDATE_MB = [128, 256, 384, 512, 768, 1024, 1536, 1769, 2048, 3008]
+
+FUNCTION_SCENARIOS = {
+    "GetApplications": ["options_large_account"],
+    "GenerateReport": ["report", "report_map_reduce"],
+    "Backend": ["options_large_account", "report", "report_map_reduce"],
+}
+
+ORIGIN = "https://localhost:8080"
+
+
+def build_scenario(name: str) -> Callable[[], None]:
+    """
+    Creates the fakes and loads the handler of a scenario.
+
+    Returns:
+        Callable[[], None]: Runs one uncached invocation.
+    """
+    from benchmarks.fakes import FakeBedrockClient, FakeResilienceHubClient
+    from benchmarks.loader import load_lambda, register_clients
+    from cache import InMemoryBackend
+
+    if name == "options_large_account":
+        register_clients({
+            "resiliencehub": FakeResilienceHubClient(
+                app_count=2000, versions_per_app=3, assessments_per_app=10, components_per_app=1, latency=0.02
+            ),
+        })
+        module = load_lambda("get_applications")
+        event = {"httpMethod": "GET", "path": "/get-applications-options", "headers": {"origin": ORIGIN}}
+
+        def invoke() -> None:
+            module.OPTIONS_CACHE.backend = InMemoryBackend()
+            module.lambda_handler(event, None)
+
+        return invoke
+
+    components = {"report": 20, "report_map_reduce": 2000}[name]
+    resiliencehub = FakeResilienceHubClient(
+        app_count=1, components_per_app=components, distinct_changes=name == "report_map_reduce", latency=0.02
+    )
+    register_clients({
+        "resiliencehub": resiliencehub,
+        "bedrock-runtime": FakeBedrockClient(latency=1.0, latency_per_1k_tokens=0.05),
+    })
+    module = load_lambda("generate_report")
+    app_arn = resiliencehub.apps[0]["appArn"]
+    event = {
+        "httpMethod": "POST",
+        "path": "/generate-report",
+        "headers": {"origin": ORIGIN},
+        "body": json.dumps({
+            "persona": "engineer",
+            "app_arn": app_arn,
+            "assessment_arn": resiliencehub.assessments[app_arn][0]["assessmentArn"],
+        }),
+    }
+
+    def invoke() -> None:
+        module.REPORT_CACHE.backend = InMemoryBackend()
+        if name == "report_map_reduce":
+            # POST /generate-report hands reports needing summaries off to a report job, the invocation measured.
+            job = module.REPORT_JOBS.create(json.loads(event["body"]))
+            module.lambda_handler({"reportJob": {"jobId": job["jobId"]}}, None)
+        else:
+            module.lambda_handler(event, None)
+
+    return invoke
+
+
+def max_rss_mib() -> float:
+    # ru_maxrss is in kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure_child(name: str) -> Dict:
+    """
+    Runs inside a fresh interpreter and measures one scenario.
+    """
+    from benchmarks.loader import load_common
+
+    # Puts the common layer on the path and imports its configuration module, with Boto3, before the baseline.
+    load_common("config")
+
+    rss_before = max_rss_mib()
+    with contextlib.redirect_stdout(io.StringIO()):
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        invoke = build_scenario(name)
+        invoke()
+        cpu = time.process_time() - cpu_start
+        wall = time.perf_counter() - wall_start
+    rss_after = max_rss_mib()
+
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        invoke()
+    _, heap_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "rss_mib": rss_after - rss_before,
+        "heap_peak_mib": heap_peak / 1024 / 1024,
+        "cpu_seconds": cpu,
+        "wall_seconds": wall,
+    }
+
+
+def estimated_seconds(sample: Dict, memory_mb: int) -> float:
+    """
+    Estimates the duration of an invocation at a memory size, from its waiting and CPU time.
+    """
+    waiting = max(0.0, sample["wall_seconds"] - sample["cpu_seconds"])
+    return waiting + sample["cpu_seconds"] * max(1.0, FULL_VCPU_MB / memory_mb)
+
+
+def recommend(samples: Dict[str, Dict]) -> Dict:
+    """
+    Recommends a memory size for a function from the samples of its scenarios.
+    """
+    need_mib = RUNTIME_MIB + max(max(sample["rss_mib"], sample["heap_peak_mib"]) for sample in samples.values())
+    minimum_mb = max(128, math.ceil(need_mib * HEADROOM / 64) * 64)
+    costs = {}
+    for memory_mb in CANDIDATE_MB:
+        if memory_mb < minimum_mb:
+            continue
+        seconds = sum(estimated_seconds(sample, memory_mb) for sample in samples.values())
+        costs[memory_mb] = (memory_mb / 1024 * seconds, seconds)
+    recommended = min(costs, key=lambda memory_mb: costs[memory_mb][0])
+    return {"need_mib": need_mib, "minimum_mb": minimum_mb, "recommended_mb": recommended, "costs": costs}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", default=None, help="Performance profile compared with. Defaults to constants.PERFORMANCE_PROFILE.")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure_child(args.child)))
+        return
+
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.insert(0, backend_dir)
+    import constants
+    profile_name = args.profile or constants.PERFORMANCE_PROFILE
+    profile = constants.PERFORMANCE_PROFILES[profile_name]
+
+    scenarios = sorted({scenario for names in FUNCTION_SCENARIOS.values() for scenario in names})
+    samples = {}
+    print(f"{'scenario':>22} {'rss MiB':>8} {'heap MiB':>9} {'cpu s':>7} {'wall s':>7}")
+    for scenario in scenarios:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.memory_sizing", "--child", scenario],
+            cwd=backend_dir,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        samples[scenario] = json.loads(output.strip().splitlines()[-1])
+        sample = samples[scenario]
+        print(
+            f"{scenario:>22} {sample['rss_mib']:>8.1f} {sample['heap_peak_mib']:>9.1f}"
+            f" {sample['cpu_seconds']:>7.2f} {sample['wall_seconds']:>7.2f}"
+        )
+
+    print(f"\nprofile: {profile_name}")
+    print(f"{'function':>16} {'need MiB':>9} {'minimum':>8} {'profile':>8} {'recommended':>12} {'est. s':>7} {'GB-s vs profile':>16}")
+    for function_name, names in FUNCTION_SCENARIOS.items():
+        result = recommend({name: samples[name] for name in names})
+        current_mb = profile.get(function_name, {}).get("memory_size", 512)
+        recommended_mb = result["recommended_mb"]
+        gb_seconds, seconds = result["costs"][recommended_mb]
+        current_gb_seconds = current_mb / 1024 * sum(estimated_seconds(samples[name], current_mb) for name in names)
+        warning = "  below the measured need" if current_mb < result["minimum_mb"] else ""
+        print(
+            f"{function_name:>16} {result['need_mib']:>9.1f} {result['minimum_mb']:>8} {current_mb:>8}"
+            f" {recommended_mb:>12} {seconds:>7.2f} {(gb_seconds / current_gb_seconds - 1):>+15.0%}{warning}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Check the options cache against a DynamoDB stand-in enforcing the 400 KB item limit.
+
+For every account size, the options snapshot, with ARNs ending in random UUIDs
+like real ones, must be stored and read back. It also checks that a failed cache
+write still returns the options, and that the snapshot is kept past the stale
+window, so the next refresh only queries changed applications:
+
+    python -m benchmarks.options_cache_table --apps 400 1000 5000 10000
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import time
+from typing import Dict, List
+
+from benchmarks.fakes import FakeClientError, FakeDynamoDBClient, FakeResilienceHubClient
+from benchmarks.loader import load_lambda, register_clients
+from cache import DynamoDBBackend
+
+
+ORIGIN = "https://localhost:8080"
+TABLE = "cache"
+
+
+class FailingDynamoDBClient(FakeDynamoDBClient):
+    """
+    DynamoDB stand-in rejecting every write.
+    """
+
+    def put_item(self, TableName: str, Item: Dict, ReturnValues: str = "NONE") -> Dict:
+        raise FakeClientError("InternalServerError", 500)
+
+
+def request(module) -> Dict:
+    event = {"httpMethod": "GET", "path": "/get-applications-options", "headers": {"origin": ORIGIN}}
+    with contextlib.redirect_stdout(io.StringIO()):
+        return module.lambda_handler(event, None)
+
+
+def check_sizes(module, app_counts: List[int], failures: List[str]) -> None:
+    print(f"{'apps':>6} {'JSON bytes':>11} {'largest item':>13} {'items':>6}")
+    for app_count in app_counts:
+        register_clients({"resiliencehub": FakeResilienceHubClient(app_count=app_count, components_per_app=1, random_ids=True)})
+        dynamodb = FakeDynamoDBClient()
+        module.OPTIONS_CACHE.backend = DynamoDBBackend(TABLE, client=dynamodb)
+        response = request(module)
+        if response["statusCode"] != 200:
+            failures.append(f"{app_count} apps: status {response['statusCode']}")
+            continue
+
+        stored = module.OPTIONS_CACHE.backend.get(module.OPTIONS_CACHE_KEY)
+        with contextlib.redirect_stdout(io.StringIO()):
+            snapshot = module.get_options_snapshot()
+        if stored is None or stored["value"] != json.loads(json.dumps(snapshot)):
+            failures.append(f"{app_count} apps: snapshot not read back from the table")
+        items = dynamodb.tables[TABLE].values()
+        print(
+            f"{app_count:>6} {len(json.dumps(snapshot)):>11} {max(map(dynamodb.item_size, items)):>13} {len(items):>6}"
+        )
+
+
+def check_failed_write(module, failures: List[str]) -> None:
+    register_clients({"resiliencehub": FakeResilienceHubClient(app_count=20)})
+    module.OPTIONS_CACHE.backend = DynamoDBBackend(TABLE, client=FailingDynamoDBClient())
+    response = request(module)
+    if response["statusCode"] != 200:
+        failures.append(f"failed cache write: status {response['statusCode']}")
+
+
+def check_retention(module, failures: List[str]) -> None:
+    print(f"{'retain s':>9} {'refresh calls after expiry':>27}")
+    for retain_seconds in (0, 3600):
+        resiliencehub = FakeResilienceHubClient(app_count=200)
+        register_clients({"resiliencehub": resiliencehub})
+        module.OPTIONS_CACHE.backend = DynamoDBBackend(TABLE, client=FakeDynamoDBClient())
+        module.OPTIONS_CACHE.ttl_seconds, module.OPTIONS_CACHE.stale_seconds = 1, 0
+        module.OPTIONS_CACHE.retain_seconds = retain_seconds
+        request(module)
+        time.sleep(2.1)
+        calls = dict(resiliencehub.calls)
+        request(module)
+        refresh_calls = {operation: count - calls.get(operation, 0) for operation, count in resiliencehub.calls.items()}
+        print(f"{retain_seconds:>9} {sum(refresh_calls.values()):>27}")
+        # No application changed, so a refresh from the kept snapshot only lists the applications.
+        if retain_seconds and sum(refresh_calls.values()) != refresh_calls["list_apps"]:
+            failures.append(f"refresh after expiry made {refresh_calls}, the snapshot was not kept")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--apps", type=int, nargs="+", default=[400, 1000, 5000, 10000], help="Account sizes.")
+    args = parser.parse_args()
+
+    module = load_lambda("get_applications")
+    failures = []
+    check_sizes(module, args.apps, failures)
+    check_failed_write(module, failures)
+    check_retention(module, failures)
+    for failure in failures:
+        print(f"FAILED {failure}")
+    if failures:
+        raise SystemExit(1)
+    print("options cache table checks passed")
+
+
+if __name__ == "__main__":
+    main()
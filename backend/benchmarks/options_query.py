@@ -0,0 +1,129 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Measure filtered and paginated /get-applications-options requests on a large account.
+
+Every request is served from a warm options cache, so the time is the query and the
+response encoding. The full list, as returned before pagination, is the reference.
+Walking every page is checked to return each option exactly once.
+
+    python -m benchmarks.options_query --apps 10000
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import time
+from typing import Dict, List
+
+from benchmarks.fakes import FakeResilienceHubClient
+from benchmarks.loader import load_lambda, register_clients
+
+
+ORIGIN = "https://localhost:8080"
+QUERIES = {
+    "first page": {},
+    "prefix": {"prefix": "app-091"},
+    "search": {"q": "123"},
+    "compliance": {"compliance_status": "PolicyBreached"},
+    "score range": {"min_score": "40", "max_score": "45"},
+    "combined": {"compliance_status": "PolicyMet,ChangesDetected", "min_score": "90", "q": "7"},
+}
+
+
+def reference_matches(options: List[Dict], params: Dict) -> List[str]:
+    """
+    Returns the ARNs of the options matching a query, filtered one by one.
+    """
+    statuses = {status.lower() for status in params.get("compliance_status", "").split(",") if status}
+    arns = []
+    for option in options:
+        name = option["app_name"].lower()
+        score = option.get("resiliency_score")
+        if params.get("prefix") and not name.startswith(params["prefix"].lower()):
+            continue
+        if params.get("q") and params["q"].lower() not in name:
+            continue
+        if statuses and (option.get("compliance_status") or "").lower() not in statuses:
+            continue
+        if "min_score" in params and (score is None or score < float(params["min_score"])):
+            continue
+        if "max_score" in params and (score is None or score > float(params["max_score"])):
+            continue
+        arns.append(option["app_arn"])
+    return arns
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--apps", type=int, default=10000, help="Number of applications in the fake account.")
+    parser.add_argument("--runs", type=int, default=20, help="Requests timed per query.")
+    args = parser.parse_args()
+
+    register_clients({
+        "resiliencehub": FakeResilienceHubClient(app_count=args.apps, components_per_app=1, resources_per_component=1, versions_per_app=2),
+    })
+    get_applications = load_lambda("get_applications")
+
+    def request(params: Dict) -> Dict:
+        event = {
+            "httpMethod": "GET",
+            "path": "/get-applications-options",
+            "headers": {"origin": ORIGIN},
+            "queryStringParameters": params or None,
+        }
+        with contextlib.redirect_stdout(io.StringIO()):
+            return get_applications.lambda_handler(event, None)
+
+    # Fills the options cache and builds the index.
+    request({})
+    with contextlib.redirect_stdout(io.StringIO()):
+        options = get_applications.get_assessment_options()
+
+    def timed(func) -> float:
+        start = time.perf_counter()
+        for _ in range(args.runs):
+            func()
+        return (time.perf_counter() - start) * 1000 / args.runs
+
+    full_ms = timed(lambda: json.dumps(options))
+    print(f"{'request':>14} {'options':>8} {'bytes':>9} {'ms':>7}")
+    print(f"{'full list':>14} {len(options):>8} {len(json.dumps(options)):>9} {full_ms:>7.2f}")
+    for name, params in QUERIES.items():
+        response = request(params)
+        page = json.loads(response["body"])
+        elapsed_ms = timed(lambda: request(params))
+        print(f"{name:>14} {len(page['options']):>8} {len(response['body']):>9} {elapsed_ms:>7.2f}")
+
+    def walk(params: Dict, limit: int) -> List[Dict]:
+        pages = []
+        cursor = None
+        while True:
+            page = json.loads(request({**params, "limit": str(limit), **({"cursor": cursor} if cursor else {})})["body"])
+            pages.append(page)
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return pages
+
+    seen = [option["app_arn"] for page in walk({}, 500) for option in page["options"]]
+    if sorted(seen) != sorted(option["app_arn"] for option in options) or len(set(seen)) != len(seen):
+        raise AssertionError("Walking the pages did not return every option exactly once")
+    print(f"walked {len(seen)} options in pages of 500")
+
+    # Every page reports the number of options matching the filters, not of every option.
+    for name, params in QUERIES.items():
+        expected = reference_matches(options, params)
+        pages = walk(params, 50)
+        matched = [option["app_arn"] for page in pages for option in page["options"]]
+        if sorted(matched) != sorted(expected) or len(set(matched)) != len(matched):
+            raise AssertionError(f"Pages of the {name} query differ from the filtered options")
+        if any(page["total"] != len(expected) for page in pages):
+            raise AssertionError(f"Total of the {name} query is not {len(expected)}")
+    print(f"checked the pages and totals of {len(QUERIES)} queries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Check pagination.paginate against a fake multi-page list operation.
+
+Covers the traversal of every page, the nextToken and argument forwarding,
+max_items stopping in the middle of a page, and the next page not being
+requested when the caller stops early:
+
+    python -m benchmarks.pagination_checks
+"""
+
+import itertools
+from typing import Dict, List, Optional
+
+from benchmarks.loader import load_common
+
+
+pagination = load_common("pagination")
+
+
+class FakeListOperation:
+    """
+    List operation returning fixed pages of items, linked by nextToken, and recording its requests.
+    """
+
+    __name__ = "list_items"
+
+    def __init__(self, pages: List[List[int]]):
+        self.pages = pages
+        self.requests = []
+
+    def __call__(self, nextToken: Optional[str] = None, **kwargs) -> Dict:
+        self.requests.append({"nextToken": nextToken, **kwargs})
+        index = int(nextToken[len("token-"):]) if nextToken else 0
+        response = {"items": self.pages[index]}
+        if index + 1 < len(self.pages):
+            response["nextToken"] = f"token-{index + 1}"
+        return response
+
+
+def check(failures: List[str], name: str, actual, expected) -> None:
+    if actual != expected:
+        failures.append(f"{name}: {actual!r}, expected {expected!r}")
+
+
+def main() -> None:
+    failures = []
+
+    # Every page in order, including an empty page in the middle.
+    operation = FakeListOperation([[1, 2, 3], [], [4, 5]])
+    items = list(pagination.paginate(operation, "items", appArn="arn:app"))
+    check(failures, "multi-page items", items, [1, 2, 3, 4, 5])
+    check(
+        failures,
+        "forwarded requests",
+        operation.requests,
+        [
+            {"nextToken": None, "appArn": "arn:app"},
+            {"nextToken": "token-1", "appArn": "arn:app"},
+            {"nextToken": "token-2", "appArn": "arn:app"},
+        ],
+    )
+
+    # A single page, without nextToken, takes a single request.
+    operation = FakeListOperation([[1, 2]])
+    check(failures, "single page items", list(pagination.paginate(operation, "items")), [1, 2])
+    check(failures, "single page requests", len(operation.requests), 1)
+
+    # max_items stops in the middle of the second page.
+    operation = FakeListOperation([[1, 2, 3], [4, 5, 6], [7, 8, 9]])
+    check(failures, "max_items mid-page items", list(pagination.paginate(operation, "items", max_items=4)), [1, 2, 3, 4])
+    check(failures, "max_items mid-page requests", len(operation.requests), 2)
+
+    # max_items at the end of a page does not request the next page.
+    operation = FakeListOperation([[1, 2, 3], [4, 5, 6]])
+    check(failures, "max_items page end items", list(pagination.paginate(operation, "items", max_items=3)), [1, 2, 3])
+    check(failures, "max_items page end requests", len(operation.requests), 1)
+
+    # No request at all before the first item is consumed, nor for max_items=0.
+    operation = FakeListOperation([[1, 2, 3], [4, 5, 6]])
+    iterator = pagination.paginate(operation, "items")
+    check(failures, "lazy requests", len(operation.requests), 0)
+    check(failures, "max_items=0 items", list(pagination.paginate(operation, "items", max_items=0)), [])
+    check(failures, "max_items=0 requests", len(operation.requests), 0)
+
+    # Stopping after the first page, e.g. a search finding its match, skips the others.
+    check(failures, "early stop items", list(itertools.islice(iterator, 3)), [1, 2, 3])
+    check(failures, "early stop requests", len(operation.requests), 1)
+    check(failures, "resumed items", next(iterator), 4)
+    check(failures, "resumed requests", [request["nextToken"] for request in operation.requests], [None, "token-1"])
+
+    for failure in failures:
+        print(f"FAILED {failure}")
+    if failures:
+        raise SystemExit(1)
+    print("pagination checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Compare generating reports one request at a time with a single batch job.
+
+Then checks that batch items stop generating before the function times out, and
+that items left running by an interrupted run are retried once, then failed:
+
+    python -m benchmarks.report_batch --apps 5 --latency 0.1 --model-latency 0.5
+"""
+
+import argparse
+import contextlib
+import io
+import time
+from typing import List
+
+from benchmarks.fakes import FakeBedrockClient, FakeResilienceHubClient
+from benchmarks.loader import load_lambda, register_clients
+from cache import InMemoryBackend
+
+PERSONAS = ["executive", "manager", "engineer"]
+
+
+class FakeContext:
+    """
+    Lambda context stand-in with a fixed remaining time.
+    """
+
+    def __init__(self, remaining_seconds: float):
+        self.end = time.monotonic() + remaining_seconds
+
+    def get_remaining_time_in_millis(self) -> int:
+        return int((self.end - time.monotonic()) * 1000)
+
+
+def check_item_deadline(generate_report, reports: List[dict], failures: List[str]) -> None:
+    # A slow stream, cut by a function with 1.5 seconds left once the 5 second margin is taken.
+    register_clients({"bedrock-runtime": FakeBedrockClient(report="x" * 1600, chunk_latency=0.05)})
+    generate_report.REPORT_CACHE.backend = InMemoryBackend()
+    cutoff_seconds, generate_report.BATCH_CUTOFF_SECONDS = generate_report.BATCH_CUTOFF_SECONDS, 0
+    items = [{**report, "job_id": generate_report.REPORT_JOBS.create(report)["jobId"]} for report in reports[:2]]
+    job = generate_report.REPORT_JOBS.create({"reports": reports[:2]}, kind="batch", items=items)
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_report.run_batch_job(job, context=FakeContext(6.5))
+    finally:
+        generate_report.BATCH_CUTOFF_SECONDS = cutoff_seconds
+    seconds = time.perf_counter() - start
+    children = [generate_report.REPORT_JOBS.get(item["job_id"]) for item in items]
+    if seconds > 3:
+        failures.append(f"item deadline: the batch run took {seconds:.1f} s, past the deadline")
+    if not all(child["status"] == "SUCCEEDED" and child.get("truncated") for child in children):
+        failures.append(f"item deadline: items ended {[(child['status'], child.get('truncated')) for child in children]}")
+
+
+def check_interrupted_items(generate_report, reports: List[dict], failures: List[str]) -> None:
+    register_clients({"bedrock-runtime": FakeBedrockClient()})
+    generate_report.REPORT_CACHE.backend = InMemoryBackend()
+    # Left running by one interrupted run, by two, and never started.
+    children = [
+        generate_report.REPORT_JOBS.create(reports[0], status=generate_report.JobStatus.RUNNING, attempts=1),
+        generate_report.REPORT_JOBS.create(reports[1], status=generate_report.JobStatus.RUNNING, attempts=2),
+        generate_report.REPORT_JOBS.create(reports[2]),
+    ]
+    items = [{**report, "job_id": child["jobId"]} for report, child in zip(reports, children)]
+    job = generate_report.REPORT_JOBS.create({"reports": reports[:3]}, kind="batch", items=items)
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate_report.run_batch_job(job)
+    statuses = [generate_report.REPORT_JOBS.get(child["jobId"])["status"] for child in children]
+    if statuses != ["SUCCEEDED", "FAILED", "SUCCEEDED"]:
+        failures.append(f"interrupted items: ended {statuses}, expected retried, failed and generated")
+    if generate_report.REPORT_JOBS.get(job["jobId"])["status"] != "SUCCEEDED":
+        failures.append("interrupted items: the batch did not finish")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--apps", type=int, default=5, help="Number of applications in the batch.")
+    parser.add_argument("--latency", type=float, default=0.1, help="Injected latency per Resilience Hub call in seconds.")
+    parser.add_argument("--model-latency", type=float, default=0.5, help="Injected latency per model invocation in seconds.")
+    args = parser.parse_args()
+
+    generate_report = load_lambda("generate_report")
+    resiliencehub = FakeResilienceHubClient(app_count=args.apps, latency=args.latency)
+    bedrock = FakeBedrockClient(latency=args.model_latency)
+    register_clients({"resiliencehub": resiliencehub, "bedrock-runtime": bedrock})
+
+    reports = [
+        {
+            "app_arn": app["appArn"],
+            "assessment_arn": resiliencehub.assessments[app["appArn"]][-1]["assessmentArn"],
+            "persona": persona,
+        }
+        for app in resiliencehub.apps
+        for persona in PERSONAS
+    ]
+
+    generate_report.REPORT_CACHE.backend = InMemoryBackend()
+    resiliencehub.calls.clear()
+    start = time.perf_counter()
+    for report in reports:
+        generate_report.generate_report(report["persona"], report["assessment_arn"], report["app_arn"])
+    sequential_seconds = time.perf_counter() - start
+    sequential_calls = sum(resiliencehub.calls.values())
+
+    generate_report.REPORT_CACHE.backend = InMemoryBackend()
+    resiliencehub.calls.clear()
+    start = time.perf_counter()
+    job = generate_report.submit_batch_job(reports)
+    while generate_report.REPORT_JOBS.get(job["jobId"])["status"] in ("PENDING", "RUNNING"):
+        time.sleep(0.01)
+    batch_seconds = time.perf_counter() - start
+    batch_calls = sum(resiliencehub.calls.values())
+    manifest = generate_report.batch_manifest(generate_report.REPORT_JOBS.get(job["jobId"]))
+
+    print(f"reports: {len(reports)}, model concurrency: {generate_report.BATCH_CONCURRENCY}")
+    print(f"{'mode':>11} {'seconds':>8} {'api calls':>10}")
+    print(f"{'sequential':>11} {sequential_seconds:>8.2f} {sequential_calls:>10}")
+    print(f"{'batch':>11} {batch_seconds:>8.2f} {batch_calls:>10}")
+    print(f"manifest counts: {manifest['counts']}")
+
+    failures = []
+    check_item_deadline(generate_report, reports, failures)
+    check_interrupted_items(generate_report, reports, failures)
+    for failure in failures:
+        print(f"FAILED {failure}")
+    if failures:
+        raise SystemExit(1)
+    print("batch item deadline and interrupted items checked")
+
+
+if __name__ == "__main__":
+    main()
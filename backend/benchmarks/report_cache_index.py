@@ -0,0 +1,119 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Check the application index of the report cache, in memory and on the DynamoDB stand-in.
+
+A report of an older assessment, written late, must not evict the reports of the
+newer assessment, and concurrent writers of the same application must not lose
+each other's index keys:
+
+    python -m benchmarks.report_cache_index --writers 16
+"""
+
+import argparse
+import threading
+from typing import Callable, Dict, List
+
+from benchmarks.fakes import FakeDynamoDBClient
+from benchmarks.loader import load_common, load_lambda
+
+
+cache = load_common("cache")
+
+APP_ARN = "arn:aws:resiliencehub:us-east-1:123456789012:app/app-00000"
+OLDER = ("arn:aws:resiliencehub:us-east-1:123456789012:app-assessment/older", 1_717_200_000.0)
+NEWER = ("arn:aws:resiliencehub:us-east-1:123456789012:app-assessment/newer", 1_717_300_000.0)
+
+
+def run_concurrently(writers: int, write: Callable[[int], None]) -> None:
+    barrier = threading.Barrier(writers)
+
+    def run(index: int) -> None:
+        barrier.wait()
+        write(index)
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def check(name: str, new_backend: Callable[[], object], report_cache_class, writers: int) -> List[str]:
+    """
+    Runs the index checks against fresh backends.
+
+    Returns:
+        List[str]: Failed checks.
+    """
+    failures = []
+
+    def put(report_cache, key: str, assessment) -> None:
+        report_cache.put(key, APP_ARN, assessment[0], f"report {key}", assessment_end_time=assessment[1])
+
+    def cached(report_cache, key: str) -> bool:
+        return report_cache.backend.get(key) is not None
+
+    # A late write for the older assessment keeps the newer assessment's reports.
+    report_cache = report_cache_class(new_backend())
+    put(report_cache, "report#newer", NEWER)
+    put(report_cache, "report#older", OLDER)
+    if not cached(report_cache, "report#newer"):
+        failures.append(f"{name}: a late write for an older assessment evicted the newer report")
+    if cached(report_cache, "report#older"):
+        failures.append(f"{name}: the report of an older assessment was kept")
+
+    # A newer assessment evicts the older one's reports.
+    report_cache = report_cache_class(new_backend())
+    put(report_cache, "report#older", OLDER)
+    put(report_cache, "report#newer", NEWER)
+    if cached(report_cache, "report#older") or not cached(report_cache, "report#newer"):
+        failures.append(f"{name}: a newer assessment did not replace the older reports")
+
+    # Concurrent writers of the same assessment, starting without an index, keep every key.
+    report_cache = report_cache_class(new_backend())
+    run_concurrently(writers, lambda index: put(report_cache, f"report#{index}", NEWER))
+    indexed = set(report_cache.backend.members(report_cache._index_key(APP_ARN)))
+    if indexed != {f"report#{index}" for index in range(writers)}:
+        failures.append(f"{name}: {writers} concurrent writers left {len(indexed)} index keys")
+
+    # Concurrent writers of both assessments leave only the newer assessment's reports.
+    report_cache = report_cache_class(new_backend())
+    run_concurrently(
+        writers,
+        lambda index: put(report_cache, f"report#{index}", NEWER if index % 2 else OLDER),
+    )
+    kept = {index for index in range(writers) if cached(report_cache, f"report#{index}")}
+    if kept != {index for index in range(writers) if index % 2}:
+        failures.append(f"{name}: concurrent writers of two assessments kept reports {sorted(kept)}")
+
+    report_cache.invalidate_app(APP_ARN)
+    if any(cached(report_cache, f"report#{index}") for index in range(writers)):
+        failures.append(f"{name}: invalidate_app left reports behind")
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=16, help="Concurrent writers of the same application.")
+    args = parser.parse_args()
+
+    report_cache_class = load_lambda("generate_report").ReportCache
+    backends: Dict[str, Callable[[], object]] = {
+        "in-memory": cache.InMemoryBackend,
+        "dynamodb": lambda: cache.DynamoDBBackend("cache", client=FakeDynamoDBClient()),
+    }
+    failures = []
+    for name, new_backend in backends.items():
+        failures.extend(check(name, new_backend, report_cache_class, args.writers))
+    for failure in failures:
+        print(f"FAILED {failure}")
+    if failures:
+        raise SystemExit(1)
+    print(f"report cache index checks passed on {', '.join(backends)}, with {args.writers} concurrent writers")
+
+
+if __name__ == "__main__":
+    main()
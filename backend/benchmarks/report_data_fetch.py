@@ -0,0 +1,106 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Compare sequential and concurrent fetching of the data behind a report, and check
+the status returned when fetching fails.
+
+    python -m benchmarks.report_data_fetch --latency 0.2
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import time
+
+from benchmarks.fakes import FakeClientError, FakeResilienceHubClient
+from benchmarks.loader import load_lambda, register_clients
+
+
+class FailingResilienceHubClient(FakeResilienceHubClient):
+    """
+    Resilience Hub stand-in failing every assessment recommendations call with an error code.
+    """
+
+    def __init__(self, code: str, status_code: int):
+        super().__init__(app_count=1)
+        self.error = (code, status_code)
+
+    def list_app_component_recommendations(self, assessmentArn: str, nextToken=None):
+        raise FakeClientError(*self.error)
+
+
+def check_statuses(generate_report) -> None:
+    """
+    Checks that rejected requests get a 4xx, and throttled or failing calls a 502 or 503.
+    """
+    cases = [
+        ("unknown application", None, 404),
+        ("access denied", ("AccessDeniedException", 403), 400),
+        ("validation", ("ValidationException", 400), 400),
+        ("throttled", ("ThrottlingException", 429), 503),
+        ("server error", ("InternalServerException", 500), 502),
+    ]
+    failures = []
+    for name, error, expected in cases:
+        client = FailingResilienceHubClient(*error) if error else FakeResilienceHubClient(app_count=1)
+        register_clients({"resiliencehub": client})
+        app_arn = client.apps[0]["appArn"]
+        assessment_arn = client.assessments[app_arn][0]["assessmentArn"]
+        event = {
+            "httpMethod": "POST",
+            "path": "/generate-report",
+            "headers": {"origin": "https://localhost:8080"},
+            "body": json.dumps({
+                "persona": "engineer",
+                "app_arn": app_arn + "-unknown" if error is None else app_arn,
+                "assessment_arn": assessment_arn,
+            }),
+        }
+        generate_report.REPORT_CACHE.invalidate_app(app_arn)
+        with contextlib.redirect_stdout(io.StringIO()):
+            status = generate_report.lambda_handler(event, None)["statusCode"]
+        if status != expected:
+            failures.append(f"{name}: status {status}, expected {expected}")
+    for failure in failures:
+        print(f"FAILED {failure}")
+    if failures:
+        raise SystemExit(1)
+    print("data fetch error statuses checked")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.2, help="Injected latency per API call in seconds.")
+    parser.add_argument("--runs", type=int, default=5, help="Number of measured runs per mode.")
+    args = parser.parse_args()
+
+    generate_report = load_lambda("generate_report")
+    client = FakeResilienceHubClient(app_count=1, latency=args.latency)
+    register_clients({"resiliencehub": client})
+    app_arn = client.apps[0]["appArn"]
+    assessment_arn = client.assessments[app_arn][0]["assessmentArn"]
+
+    start = time.perf_counter()
+    for _ in range(args.runs):
+        app = generate_report.describe_app(app_arn)
+        app = generate_report.list_app_version_resources(app)
+        app["recommendations"] = generate_report.get_assessment_recommendations(assessment_arn)
+    sequential_seconds = (time.perf_counter() - start) / args.runs
+
+    start = time.perf_counter()
+    for _ in range(args.runs):
+        generate_report.gather_app_data(app_arn, assessment_arn)
+    concurrent_seconds = (time.perf_counter() - start) / args.runs
+
+    print(f"latency per call: {args.latency * 1000:.0f} ms")
+    print(f"{'sequential':>11} {sequential_seconds * 1000:>8.0f} ms")
+    print(f"{'concurrent':>11} {concurrent_seconds * 1000:>8.0f} ms")
+
+    check_statuses(generate_report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Check the report job states clients poll.
+
+A job running for longer than the function timeout was lost to a timed out
+invocation, and must fail, then not run if its invoke arrives later. A pending job
+may wait for a throttled or retried invoke, so it only fails after the much longer
+pending timeout. Items of a batch job only wait for their turn, so they are left
+alone. A running job returns the text generated so far, and an invoke of an
+expired job does nothing:
+
+    python -m benchmarks.report_jobs
+"""
+
+import contextlib
+import io
+import json
+import time
+from typing import Dict, List
+
+from benchmarks.fakes import FakeBedrockClient, FakeResilienceHubClient
+from benchmarks.loader import load_lambda, register_clients
+
+
+ORIGIN = "https://localhost:8080"
+
+
+def poll(generate_report, job_id: str) -> Dict:
+    event = {
+        "httpMethod": "GET",
+        "path": "/generate-report-jobs",
+        "headers": {"origin": ORIGIN},
+        "queryStringParameters": {"job_id": job_id},
+    }
+    with contextlib.redirect_stdout(io.StringIO()):
+        response = generate_report.lambda_handler(event, None)
+    return json.loads(response["body"])
+
+
+def check(failures: List[str], name: str, actual, expected) -> None:
+    if actual != expected:
+        failures.append(f"{name}: {actual!r}, expected {expected!r}")
+
+
+def main() -> None:
+    resiliencehub = FakeResilienceHubClient(app_count=1)
+    register_clients({"resiliencehub": resiliencehub, "bedrock-runtime": FakeBedrockClient()})
+    generate_report = load_lambda("generate_report")
+    jobs = generate_report.REPORT_JOBS
+    app_arn = resiliencehub.apps[0]["appArn"]
+    request = {
+        "persona": "engineer",
+        "app_arn": app_arn,
+        "assessment_arn": resiliencehub.assessments[app_arn][0]["assessmentArn"],
+    }
+    now = time.time()
+    failures = []
+
+    def aged(job: Dict, **fields) -> Dict:
+        jobs.backend.put(jobs._key(job["jobId"]), {**job, **fields}, ttl_seconds=jobs.ttl_seconds)
+        return job
+
+    def polled(job: Dict):
+        response = poll(generate_report, job["jobId"])
+        return response["status"], bool(response.get("error"))
+
+    waiting = aged(jobs.create(request), updatedAt=now - generate_report.JOB_STALE_SECONDS - 60)
+    check(failures, "pending job waiting for a throttled invoke", polled(waiting), ("PENDING", False))
+
+    dropped = aged(jobs.create(request), updatedAt=now - generate_report.JOB_PENDING_TIMEOUT_SECONDS - 1)
+    check(failures, "pending job of a dropped invoke", polled(dropped), ("FAILED", True))
+
+    # Progress updates do not keep a job alive past the function timeout.
+    job = aged(
+        jobs.create(request, status=generate_report.JobStatus.RUNNING),
+        startedAt=now - generate_report.JOB_STALE_SECONDS - 1,
+    )
+    check(failures, "job running past the function timeout", polled(job), ("FAILED", True))
+
+    # The asynchronous invoke of a failed job arrives late.
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate_report.run_report_job(job["jobId"])
+    check(failures, "late run of a failed job", jobs.get(job["jobId"])["status"], "FAILED")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate_report.run_report_job("expired")
+
+    item = aged(jobs.create(request, kind="batch_item"), updatedAt=now - generate_report.JOB_PENDING_TIMEOUT_SECONDS - 1)
+    check(failures, "waiting batch item", poll(generate_report, item["jobId"])["status"], "PENDING")
+
+    running = jobs.create(request, status=generate_report.JobStatus.RUNNING, startedAt=now, partialText="<HTML><body>Part")
+    check(failures, "running job", polled(running), ("RUNNING", False))
+    check(failures, "running job partial text", poll(generate_report, running["jobId"]).get("partial-text"), "<HTML><body>Part")
+
+    for failure in failures:
+        print(f"FAILED {failure}")
+    if failures:
+        raise SystemExit(1)
+    print(
+        f"report job checks passed, with jobs failing after {generate_report.JOB_STALE_SECONDS:g} s running"
+        f" or {generate_report.JOB_PENDING_TIMEOUT_SECONDS:g} s pending"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Compare time to first byte of blocking and streamed report generation.
+
+Then checks that POST /generate-report hands off to a report job the reports
+needing map-reduce summaries or a large prompt, before invoking the model, and
+those not complete before the response deadline. The job completes them from
+the report input already built:
+
+    python -m benchmarks.report_streaming --chunks 200 --chunk-latency 0.05
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import time
+
+from benchmarks.fakes import FakeBedrockClient, FakeResilienceHubClient
+from benchmarks.loader import load_lambda, register_clients
+from cache import InMemoryBackend
+
+
+class DeferredJobQueue:
+    """
+    Job queue keeping the submitted jobs, so they only run once the request has been measured.
+    """
+
+    def __init__(self):
+        self.job_ids = []
+
+    def submit(self, job_id: str) -> None:
+        self.job_ids.append(job_id)
+
+
+def check_hand_off(generate_report, report: str, chunk_latency: float) -> None:
+    """
+    Requests reports through POST /generate-report that must be handed off to a report
+    job, and checks the job completes them without fetching the data again.
+    """
+    cases = [
+        # name, components, settings, whether text is generated before the hand-off
+        ("cut off", 5, {"RESPONSE_DEADLINE_SECONDS": 0.5}, True),
+        ("large prompt", 5, {"SYNC_MAX_PROMPT_TOKENS": 100}, False),
+        ("map-reduce", 2000, {}, False),
+    ]
+    failures = []
+    print(f"{'hand-off':>13} {'status':>7} {'response s':>11} {'model calls':>12} {'job fetches':>12}")
+    for name, components, settings, partial in cases:
+        resiliencehub = FakeResilienceHubClient(app_count=1, components_per_app=components, distinct_changes=components > 5)
+        bedrock = FakeBedrockClient(report=report, chunk_latency=chunk_latency)
+        register_clients({"resiliencehub": resiliencehub, "bedrock-runtime": bedrock})
+        generate_report.REPORT_CACHE.backend = InMemoryBackend()
+        app_arn = resiliencehub.apps[0]["appArn"]
+        event = {
+            "httpMethod": "POST",
+            "path": "/generate-report",
+            "headers": {"origin": "https://localhost:8080"},
+            "body": json.dumps({
+                "persona": "engineer",
+                "app_arn": app_arn,
+                "assessment_arn": resiliencehub.assessments[app_arn][0]["assessmentArn"],
+            }),
+        }
+        queue = DeferredJobQueue()
+        settings = {**settings, "JOB_QUEUE": queue}
+        defaults = {setting: getattr(generate_report, setting) for setting in settings}
+        for setting, value in settings.items():
+            setattr(generate_report, setting, value)
+        start = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                response = generate_report.lambda_handler(event, None)
+        finally:
+            for setting, value in defaults.items():
+                setattr(generate_report, setting, value)
+        response_seconds = time.perf_counter() - start
+        model_calls = sum(bedrock.calls.values())
+        fetches = sum(resiliencehub.calls.values())
+
+        body = json.loads(response["body"])
+        if response["statusCode"] != 202 or "generated-text" in body:
+            failures.append(f"{name}: returned as {response['statusCode']} with {sorted(body)}")
+            continue
+        if partial and not report.startswith(body.get("partial-text") or "-"):
+            failures.append(f"{name}: the hand-off response lacks the text generated so far")
+        if not partial and model_calls:
+            failures.append(f"{name}: {model_calls} model calls before the hand-off")
+        with contextlib.redirect_stdout(io.StringIO()):
+            for job_id in queue.job_ids:
+                generate_report.run_report_job(job_id)
+        job = generate_report.REPORT_JOBS.get(body["job_id"])
+        if job["status"] != "SUCCEEDED" or job["result"] != report or job.get("truncated"):
+            failures.append(f"{name}: the report job ended {job['status']}, truncated: {job.get('truncated')}")
+        job_fetches = sum(resiliencehub.calls.values()) - fetches
+        # The map-reduce hand-off happens before the report input is built, so only its job fetches.
+        if components <= 5 and job_fetches:
+            failures.append(f"{name}: the report job fetched the data again")
+        print(f"{name:>13} {response['statusCode']:>7} {response_seconds:>11.2f} {model_calls:>12} {job_fetches:>12}")
+
+    for failure in failures:
+        print(f"FAILED {failure}")
+    if failures:
+        raise SystemExit(1)
+    print("reports handed off to report jobs, which completed them")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=200, help="Number of streamed chunks in the report.")
+    parser.add_argument("--chunk-latency", type=float, default=0.05, help="Seconds between streamed chunks.")
+    parser.add_argument("--first-chunk-latency", type=float, default=0.5, help="Seconds before the first chunk.")
+    args = parser.parse_args()
+
+    generate_report = load_lambda("generate_report")
+    report = "<HTML>" + "x" * (16 * args.chunks) + "</HTML>"
+
+    # A blocking invocation only returns once the whole report has been generated.
+    generation_seconds = args.first_chunk_latency + args.chunk_latency * args.chunks
+    blocking = FakeBedrockClient(latency=generation_seconds, report=report)
+    start = time.perf_counter()
+    generate_report.invoke_jamba_message(blocking, generate_report.MODEL_ID, "prompt")
+    blocking_seconds = time.perf_counter() - start
+
+    streaming = FakeBedrockClient(
+        latency=args.first_chunk_latency, report=report, chunk_latency=args.chunk_latency
+    )
+    first_chunk_at = []
+    start = time.perf_counter()
+    generate_report.collect_stream(
+        generate_report.stream_jamba_message(streaming, generate_report.MODEL_ID, "prompt"),
+        on_chunk=lambda chunk: first_chunk_at.append(time.perf_counter() - start) if not first_chunk_at else None,
+    )
+    streaming_seconds = time.perf_counter() - start
+
+    print(f"{'mode':>10} {'first byte':>11} {'complete':>9}")
+    print(f"{'blocking':>10} {blocking_seconds:>10.2f}s {blocking_seconds:>8.2f}s")
+    print(f"{'streaming':>10} {first_chunk_at[0]:>10.2f}s {streaming_seconds:>8.2f}s")
+
+    check_hand_off(generate_report, report, args.chunk_latency)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Measure the first report request of a new assessment with and without a warm-up run.
+
+Then checks that a run skips the reports an earlier run queued while their jobs
+are still running, or after they failed, until the retry delay has passed:
+
+    python -m benchmarks.report_warm_up --apps 5 --model-latency 2
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import time
+
+from typing import Dict, List
+
+from benchmarks.fakes import FakeBedrockClient, FakeClientError, FakeResilienceHubClient
+from benchmarks.loader import load_lambda, register_clients
+from cache import InMemoryBackend
+
+
+class FailingBedrockClient(FakeBedrockClient):
+    """
+    Bedrock stand-in rejecting every streamed invocation.
+    """
+
+    def invoke_model_with_response_stream(self, modelId: str, body: str) -> Dict:
+        self.calls["invoke_model_with_response_stream"] += 1
+        raise FakeClientError("ValidationException", 400)
+
+
+def warm_up(generate_report, wait: bool = True) -> Dict:
+    with contextlib.redirect_stdout(io.StringIO()):
+        summary = json.loads(generate_report.lambda_handler({"reportWarmUp": {}}, None)["body"])
+        while wait and "job_id" in summary and generate_report.REPORT_JOBS.get(summary["job_id"])["status"] in ("PENDING", "RUNNING"):
+            time.sleep(0.01)
+    return summary
+
+
+def check_skipped(generate_report, failures: List[str]) -> None:
+    generate_report.REPORT_CACHE.backend = InMemoryBackend()
+    generate_report.REPORT_JOBS.backend = InMemoryBackend()
+
+    register_clients({"bedrock-runtime": FakeBedrockClient(latency=0.5)})
+    first = warm_up(generate_report, wait=False)
+    second = warm_up(generate_report)
+    if second["queued"] or second["skipped"] != first["queued"]:
+        failures.append(f"reports still running were queued again: {second}")
+    while generate_report.REPORT_JOBS.get(first["job_id"])["status"] in ("PENDING", "RUNNING"):
+        time.sleep(0.01)
+
+    generate_report.REPORT_CACHE.backend = InMemoryBackend()
+    generate_report.REPORT_JOBS.backend = InMemoryBackend()
+    bedrock = FailingBedrockClient()
+    register_clients({"bedrock-runtime": bedrock})
+    first = warm_up(generate_report)
+    calls = bedrock.calls["invoke_model_with_response_stream"]
+    second = warm_up(generate_report)
+    if second["queued"] or bedrock.calls["invoke_model_with_response_stream"] != calls:
+        failures.append(f"failed reports were queued again: {second}")
+
+    # The retry delay has passed once the markers expire.
+    for key in list(generate_report.REPORT_JOBS.backend._entries):
+        if key.startswith("warm-up#"):
+            generate_report.REPORT_JOBS.backend.delete(key)
+    third = warm_up(generate_report)
+    if third["queued"] != first["queued"]:
+        failures.append(f"failed reports were not retried after the retry delay: {third}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--apps", type=int, default=5, help="Number of applications.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Injected latency per Resilience Hub call in seconds.")
+    parser.add_argument("--model-latency", type=float, default=2.0, help="Injected latency per model invocation in seconds.")
+    args = parser.parse_args()
+
+    resiliencehub = FakeResilienceHubClient(app_count=args.apps, latency=args.latency)
+    bedrock = FakeBedrockClient(latency=args.model_latency)
+    register_clients({"resiliencehub": resiliencehub, "bedrock-runtime": bedrock})
+    generate_report = load_lambda("generate_report")
+
+    app_arn = resiliencehub.apps[0]["appArn"]
+    event = {
+        "httpMethod": "POST",
+        "path": "/generate-report",
+        "headers": {"origin": "https://localhost:8080"},
+        "body": json.dumps({
+            "persona": "executive",
+            "app_arn": app_arn,
+            "assessment_arn": resiliencehub.assessments[app_arn][-1]["assessmentArn"],
+        }),
+    }
+
+    def first_request() -> float:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_report.lambda_handler(event, None)
+        return time.perf_counter() - start
+
+    generate_report.REPORT_CACHE.backend = InMemoryBackend()
+    cold_seconds = first_request()
+
+    generate_report.REPORT_CACHE.backend = InMemoryBackend()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        summary = json.loads(generate_report.lambda_handler({"reportWarmUp": {}}, None)["body"])
+    while generate_report.REPORT_JOBS.get(summary["job_id"])["status"] in ("PENDING", "RUNNING"):
+        time.sleep(0.01)
+    warm_up_seconds = time.perf_counter() - start
+    warm_seconds = first_request()
+
+    print(f"warm-up run: {summary}, {warm_up_seconds:.2f} s in the background")
+    print(f"first request without warm-up: {cold_seconds * 1000:.0f} ms")
+    print(f"first request after warm-up:   {warm_seconds * 1000:.1f} ms")
+
+    failures = []
+    check_skipped(generate_report, failures)
+    for failure in failures:
+        print(f"FAILED {failure}")
+    if failures:
+        raise SystemExit(1)
+    print("reports already queued are skipped until the retry delay has passed")
+
+
+if __name__ == "__main__":
+    main()
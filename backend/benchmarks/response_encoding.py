@@ -0,0 +1,128 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Compare the size and transfer time of API responses across encodings.
+
+The report response is measured against its former double-encoded body, and the
+applications list against its former default-separator body. Transfer times are
+estimated for a slow link, e.g. a corporate VPN:
+
+    python -m benchmarks.response_encoding --apps 1000 --link-kbps 2000 --rtt-ms 80
+"""
+
+import argparse
+import base64
+import contextlib
+import io
+import json
+import time
+from typing import Dict
+
+from benchmarks.fakes import FakeBedrockClient, FakeResilienceHubClient
+from benchmarks.loader import load_lambda, register_clients
+
+
+ORIGIN = "https://localhost:8080"
+ACCEPT_ENCODINGS = {
+    "identity": "identity",
+    "gzip": "gzip, deflate",
+    "br": "gzip, deflate, br",
+}
+
+
+def synthetic_report(sections: int) -> str:
+    """
+    Builds an HTML report resembling a model output, with newlines, quotes and tables.
+    """
+    rows = []
+    for section in range(sections):
+        rows.append(f'<h2 class="section">Component group {section}</h2>\n<table class="findings">\n')
+        for row in range(8):
+            rows.append(
+                f'  <tr><td class="logical-id">"app-component-{section}-{row}"</td>'
+                f'<td>Enable Multi-AZ for "database-{row}" to meet the RTO of 3600 seconds.</td></tr>\n'
+            )
+        rows.append("</table>\n<p>Suggested changes reduce the estimated \"RPO\" from 86400 to 300 seconds.</p>\n")
+    return "<HTML>\n<body>\n<h1>Resilience report</h1>\n" + "".join(rows) + "</body>\n</HTML>"
+
+
+def wire_bytes(response: Dict) -> int:
+    """
+    Returns the number of body bytes API Gateway sends for a proxy response.
+    """
+    body = response.get("body") or ""
+    if response.get("isBase64Encoded"):
+        return len(base64.b64decode(body))
+    return len(body.encode("utf-8"))
+
+
+def transfer_ms(size: int, link_kbps: float, rtt_ms: float) -> float:
+    return rtt_ms + size * 8 / link_kbps
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--apps", type=int, default=1000, help="Number of applications in the fake account.")
+    parser.add_argument("--sections", type=int, default=60, help="Component groups in the synthetic report.")
+    parser.add_argument("--link-kbps", type=float, default=2000, help="Link bandwidth in kilobits per second.")
+    parser.add_argument("--rtt-ms", type=float, default=80, help="Link round-trip time in milliseconds.")
+    args = parser.parse_args()
+
+    report = synthetic_report(args.sections)
+    resiliencehub = FakeResilienceHubClient(app_count=args.apps, components_per_app=1, resources_per_component=1)
+    register_clients({"resiliencehub": resiliencehub, "bedrock-runtime": FakeBedrockClient(report=report)})
+    get_applications = load_lambda("get_applications")
+    generate_report = load_lambda("generate_report")
+
+    app_arn = resiliencehub.apps[0]["appArn"]
+    report_body = json.dumps({
+        "persona": "engineer",
+        "app_arn": app_arn,
+        "assessment_arn": resiliencehub.assessments[app_arn][0]["assessmentArn"],
+    })
+
+    def invoke(handler, event: Dict) -> Dict:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return handler(event, None)
+
+    cases = {}
+    for name, accept_encoding in ACCEPT_ENCODINGS.items():
+        headers = {"origin": ORIGIN, "Accept-Encoding": accept_encoding}
+        report_event = {"httpMethod": "POST", "path": "/generate-report", "headers": headers, "body": report_body}
+        options_event = {
+            "httpMethod": "GET",
+            "path": "/get-applications-options",
+            "headers": headers,
+            "queryStringParameters": {"limit": str(args.apps)},
+        }
+        # The first invocations fill the caches, so the second ones time the encoding only.
+        invoke(generate_report.lambda_handler, report_event)
+        invoke(get_applications.lambda_handler, options_event)
+        for path, handler, event in (
+            ("report", generate_report.lambda_handler, report_event),
+            ("options", get_applications.lambda_handler, options_event),
+        ):
+            start = time.perf_counter()
+            response = invoke(handler, event)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            encoding = response["headers"].get("Content-Encoding", "identity")
+            cases[f"{path} {encoding}"] = (wire_bytes(response), elapsed_ms)
+
+    options = get_applications.get_assessment_options()
+    before = {
+        "report before": len(json.dumps({"generated-text": json.dumps(report), "truncated": False}).encode("utf-8")),
+        "options before": len(json.dumps(options).encode("utf-8")),
+    }
+
+    print(f"link: {args.link_kbps:.0f} kbit/s, {args.rtt_ms:.0f} ms round trip")
+    print(f"{'response':>18} {'bytes':>9} {'handler ms':>11} {'transfer ms':>12}")
+    for case, size in before.items():
+        print(f"{case:>18} {size:>9} {'-':>11} {transfer_ms(size, args.link_kbps, args.rtt_ms):>12.1f}")
+    for case, (size, elapsed_ms) in cases.items():
+        print(f"{case:>18} {size:>9} {elapsed_ms:>11.2f} {transfer_ms(size, args.link_kbps, args.rtt_ms):>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
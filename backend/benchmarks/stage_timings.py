@@ -0,0 +1,57 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Break down a /generate-report invocation by stage, from the Embedded Metric Format line it prints.
+
+    python -m benchmarks.stage_timings --latency 0.1 --model-latency 1
+"""
+
+import argparse
+import contextlib
+import io
+import json
+
+from benchmarks.fakes import FakeBedrockClient, FakeResilienceHubClient
+from benchmarks.loader import load_lambda, register_clients
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.1, help="Injected latency per Resilience Hub call in seconds.")
+    parser.add_argument("--model-latency", type=float, default=1.0, help="Injected latency before the first model chunk in seconds.")
+    args = parser.parse_args()
+
+    resiliencehub = FakeResilienceHubClient(app_count=1, latency=args.latency)
+    register_clients({
+        "resiliencehub": resiliencehub,
+        "bedrock-runtime": FakeBedrockClient(latency=args.model_latency),
+    })
+    generate_report = load_lambda("generate_report")
+
+    app_arn = resiliencehub.apps[0]["appArn"]
+    event = {
+        "httpMethod": "POST",
+        "path": "/generate-report",
+        "headers": {"origin": "https://localhost:8080"},
+        "body": json.dumps({
+            "persona": "engineer",
+            "app_arn": app_arn,
+            "assessment_arn": resiliencehub.assessments[app_arn][0]["assessmentArn"],
+        }),
+    }
+
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout):
+        generate_report.lambda_handler(event, None)
+    emf = next(json.loads(line) for line in stdout.getvalue().splitlines() if line.startswith('{"_aws"'))
+
+    definitions = emf["_aws"]["CloudWatchMetrics"][0]["Metrics"]
+    for definition in definitions:
+        print(f"{definition['Name']:>32} {emf[definition['Name']]:>10} {definition['Unit']}")
+    print(f"{'apiCalls':>32} {emf['properties']['apiCalls']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+End-to-end benchmark suite driving both Lambda handlers against a synthetic account.
+
+Reports p50/p95 latency, Resilience Hub and Bedrock calls per invocation, and the
+peak memory allocated by an invocation, for every case:
+
+    python -m benchmarks.suite --account medium
+
+Save the results as a baseline, then fail on regressions against it:
+
+    python -m benchmarks.suite --save-baseline benchmarks/baseline.json
+    python -m benchmarks.suite --baseline benchmarks/baseline.json --tolerance 0.25
+
+Latency is dominated by the injected latencies, so baselines carry over between
+machines reasonably well. Regenerate them after an intended performance change.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+from benchmarks.fakes import FakeBedrockClient, FakeResilienceHubClient
+from benchmarks.loader import load_lambda, register_clients
+from cache import InMemoryBackend
+
+
+ACCOUNTS = {
+    "small": {"app_count": 10, "versions_per_app": 2, "assessments_per_app": 3, "components_per_app": 5, "resources_per_component": 2},
+    "medium": {"app_count": 200, "versions_per_app": 3, "assessments_per_app": 5, "components_per_app": 20, "resources_per_component": 3},
+    "large": {"app_count": 2000, "versions_per_app": 3, "assessments_per_app": 10, "components_per_app": 10, "resources_per_component": 2},
+}
+
+ORIGIN = "https://localhost:8080"
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """
+    Returns the value below which the given fraction of values fall, by nearest rank.
+    """
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+def measure(invoke: Callable[[int], None], reset: Callable[[], None], clients: List, runs: int) -> Dict:
+    """
+    Runs an invocation repeatedly and summarizes its latency, calls and memory.
+
+    Args:
+        invoke: Runs invocation number i. Its stdout, the EMF lines, is discarded.
+        reset: Called before every invocation, e.g. to empty a cache.
+        clients: Fake clients whose calls are counted.
+        runs (int): Number of measured invocations.
+
+    Returns:
+        Dict: p50 and p95 latency in milliseconds, calls per invocation and peak memory in KiB.
+    """
+    latencies = []
+    calls_before = sum(sum(client.calls.values()) for client in clients)
+    for run in range(runs):
+        reset()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            invoke(run)
+            latencies.append((time.perf_counter() - start) * 1000)
+    calls = sum(sum(client.calls.values()) for client in clients) - calls_before
+
+    # Measured separately, as tracing allocations slows the invocation down.
+    reset()
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        invoke(runs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(percentile(latencies, 0.95), 2),
+        "calls_per_invocation": round(calls / runs, 2),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def run_suite(account: str, runs: int, latency: float, model_latency: float, page_size: int, quota: float) -> Dict[str, Dict]:
+    """
+    Runs every benchmark case against a synthetic account.
+
+    Returns:
+        Dict[str, Dict]: Results keyed by case name.
+    """
+    resiliencehub = FakeResilienceHubClient(latency=latency, page_size=page_size, quota=quota, **ACCOUNTS[account])
+    bedrock = FakeBedrockClient(latency=model_latency)
+    register_clients({"resiliencehub": resiliencehub, "bedrock-runtime": bedrock})
+    get_applications = load_lambda("get_applications")
+    generate_report = load_lambda("generate_report")
+
+    options_event = {"httpMethod": "GET", "path": "/get-applications-options", "headers": {"origin": ORIGIN}}
+
+    def report_event(index: int, persona: str = "engineer") -> Dict:
+        app_arn = resiliencehub.apps[index % len(resiliencehub.apps)]["appArn"]
+        return {
+            "httpMethod": "POST",
+            "path": "/generate-report",
+            "headers": {"origin": ORIGIN},
+            "body": json.dumps({
+                "persona": persona,
+                "app_arn": app_arn,
+                "assessment_arn": resiliencehub.assessments[app_arn][-1]["assessmentArn"],
+            }),
+        }
+
+    def empty_options_cache() -> None:
+        get_applications.OPTIONS_CACHE.backend = InMemoryBackend()
+
+    def empty_report_cache() -> None:
+        generate_report.REPORT_CACHE.backend = InMemoryBackend()
+
+    clients = [resiliencehub, bedrock]
+    results = {
+        "get_applications.cold": measure(
+            lambda run: get_applications.lambda_handler(options_event, None),
+            empty_options_cache, clients, runs,
+        ),
+        "get_applications.warm": measure(
+            lambda run: get_applications.lambda_handler(options_event, None),
+            lambda: None, clients, runs,
+        ),
+        "generate_report.uncached": measure(
+            lambda run: generate_report.lambda_handler(report_event(run), None),
+            empty_report_cache, clients, runs,
+        ),
+    }
+    empty_report_cache()
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate_report.lambda_handler(report_event(0), None)
+    results["generate_report.cached"] = measure(
+        lambda run: generate_report.lambda_handler(report_event(0), None),
+        lambda: None, clients, runs,
+    )
+    return results
+
+
+# Increases below these are noise whatever the tolerance, e.g. on sub-millisecond cached cases.
+NOISE_FLOORS = {"p50_ms": 5.0, "p95_ms": 5.0, "peak_kib": 64.0}
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    """
+    Lists the regressions of results against a baseline.
+
+    Latency and memory regress when they exceed the baseline by more than the
+    tolerance and the noise floor, calls per invocation when they exceed it at all.
+    """
+    regressions = []
+    for case, baseline_result in baseline.items():
+        result = results.get(case)
+        if result is None:
+            continue
+        for metric, floor in NOISE_FLOORS.items():
+            limit = max(baseline_result[metric] * (1 + tolerance), baseline_result[metric] + floor)
+            if result[metric] > limit:
+                regressions.append(f"{case} {metric}: {result[metric]} > {baseline_result[metric]} (+{tolerance:.0%})")
+        if result["calls_per_invocation"] > baseline_result["calls_per_invocation"]:
+            regressions.append(
+                f"{case} calls_per_invocation: {result['calls_per_invocation']} > {baseline_result['calls_per_invocation']}"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--account", choices=sorted(ACCOUNTS), default="medium", help="Size of the synthetic account.")
+    parser.add_argument("--runs", type=int, default=10, help="Measured invocations per case.")
+    parser.add_argument("--latency", type=float, default=0.02, help="Injected latency per Resilience Hub call in seconds.")
+    parser.add_argument("--model-latency", type=float, default=0.2, help="Injected latency per model invocation in seconds.")
+    parser.add_argument("--page-size", type=int, default=100, help="Items per page of Resilience Hub list calls.")
+    parser.add_argument("--quota", type=float, default=None, help="Resilience Hub calls per second before throttling.")
+    parser.add_argument("--baseline", help="Baseline JSON file to compare with. Exits with status 1 on regressions.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed latency and memory increase over the baseline.")
+    parser.add_argument("--save-baseline", help="Write the results to this JSON file.")
+    args = parser.parse_args()
+
+    results = run_suite(args.account, args.runs, args.latency, args.model_latency, args.page_size, args.quota)
+
+    print(f"account: {args.account} {ACCOUNTS[args.account]}")
+    print(f"{'case':>26} {'p50 ms':>9} {'p95 ms':>9} {'calls':>7} {'peak KiB':>10}")
+    for case, result in results.items():
+        print(
+            f"{case:>26} {result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f}"
+            f" {result['calls_per_invocation']:>7} {result['peak_kib']:>10.1f}"
+        )
+
+    settings = {
+        "account": args.account,
+        "latency": args.latency,
+        "model_latency": args.model_latency,
+        "page_size": args.page_size,
+        "quota": args.quota,
+    }
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as baseline_file:
+            json.dump({"settings": settings, "results": results}, baseline_file, indent=2)
+            baseline_file.write("\n")
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline["settings"] != settings:
+            print(f"warning: baseline recorded with {baseline['settings']}")
+        regressions = compare(results, baseline["results"], args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print("no regressions")
+
+
+if __name__ == "__main__":
+    main()
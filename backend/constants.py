@@ -11,3 +11,156 @@ SSM_PARAMETER = 'resilience-hub-genai-config'
 
 # REPLACE EMAIL with your email address
 EMAIL = 'TYPE YOUR EMAIL HERE'
+
+# Where the Lambda functions read allowed_origins from:
+# 'ssm' calls SSM on first use, 'extension' goes through the AWS Parameters and Secrets
+# Lambda Extension cache, 'environment' sets it as an environment variable at deploy time
+CONFIG_SOURCE = 'ssm'
+
+# CORS
+# Origins allowed in addition to the web site, e.g. 'http://localhost:8080' for local development
+ADDITIONAL_ALLOWED_ORIGINS = []
+# Seconds browsers may cache a preflight response
+CORS_MAX_AGE_SECONDS = 600
+
+# Web site
+# Seconds browsers and CloudFront cache the fingerprinted files under /assets. Keep in
+# sync with the Cache-Control set by frontend/frontend_deploy.sh.
+STATIC_ASSETS_MAX_AGE_SECONDS = 365 * 24 * 3600
+
+# Custom report personas, keyed by name, in addition to executive, manager and engineer.
+# Each template must contain $report once, where the assessment data goes, e.g.
+# {'auditor': '# AWS Resilience Hub resiliency assessments\n$report\n# Instructions\nReport for an auditor...'}
+# The templates are checked when the stack is synthesized.
+CUSTOM_PERSONAS = {}
+
+# Backend deployment
+# 'split' deploys the GetApplications and GenerateReport functions, 'unified' deploys a
+# single Backend function routing to both, so they share warm containers and configuration
+DEPLOYMENT_MODE = 'split'
+
+# Performance profiles
+# Memory (MB), timeout (seconds), ephemeral storage (MiB), reserved concurrency (None for
+# unreserved) and provisioned concurrency (0 for none) of each function. The profile is
+# selected with PERFORMANCE_PROFILE, or with the performance_profile context value, e.g.
+# cdk deploy -c performance_profile=production. Run benchmarks.memory_sizing to size memory.
+PERFORMANCE_PROFILE = 'default'
+PERFORMANCE_PROFILES = {
+    'default': {
+        'GetApplications': {'memory_size': 512, 'timeout_seconds': 60},
+        'GenerateReport': {'memory_size': 512, 'timeout_seconds': 90},
+        'Backend': {'memory_size': 512, 'timeout_seconds': 90},
+    },
+    # Lowest cost for occasional use. The functions mostly wait on Resilience Hub and Bedrock.
+    'economy': {
+        'GetApplications': {'memory_size': 256, 'timeout_seconds': 60},
+        'GenerateReport': {'memory_size': 256, 'timeout_seconds': 90},
+        'Backend': {'memory_size': 256, 'timeout_seconds': 90},
+    },
+    # No cold start on the applications list, and report generation capped below the Bedrock quotas.
+    'production': {
+        'GetApplications': {'memory_size': 512, 'timeout_seconds': 60, 'provisioned_concurrency': 1},
+        'GenerateReport': {'memory_size': 1024, 'timeout_seconds': 90, 'reserved_concurrency': 20},
+        'Backend': {'memory_size': 1024, 'timeout_seconds': 90, 'provisioned_concurrency': 1, 'reserved_concurrency': 25},
+    },
+}
+
+# Lambda tuning
+# Maximum number of Resilience Hub applications queried concurrently
+GET_APPLICATIONS_MAX_CONCURRENCY = 16
+
+# Assessment options cache
+# Seconds the cached options are served without refreshing
+OPTIONS_CACHE_TTL_SECONDS = 300
+# Seconds past the TTL the cached options are served while refreshing in the background
+OPTIONS_CACHE_STALE_SECONDS = 3600
+# Seconds past the stale window the last options are kept, so that the refresh after
+# a quiet period still only queries the applications that changed
+OPTIONS_CACHE_RETAIN_SECONDS = 7 * 24 * 3600
+# Share the cache between Lambda containers through a DynamoDB table
+CACHE_TABLE_ENABLED = False
+# Options returned per page of the applications list, by default and at most
+OPTIONS_PAGE_SIZE = 50
+OPTIONS_MAX_PAGE_SIZE = 1000
+# Seconds browsers may reuse an options response (Cache-Control: private, max-age)
+OPTIONS_RESPONSE_MAX_AGE_SECONDS = 60
+
+# API Gateway response cache
+# Cache GET /get-applications-options responses in API Gateway, keyed on the caller's
+# Authorization header. The cache cluster is billed per hour while deployed.
+API_CACHE_ENABLED = False
+# Cache cluster size in GB, one of '0.5', '1.6', '6.1', '13.5', '28.4', '58.2', '118', '237'
+API_CACHE_SIZE_GB = '0.5'
+# Seconds a cached response is served, at most 3600
+API_CACHE_TTL_SECONDS = 300
+
+# Generated report cache
+# Seconds a generated report is served from the cache
+REPORT_CACHE_TTL_SECONDS = 7 * 24 * 3600
+# Maximum number of reports kept in a Lambda container when the cache table is disabled
+REPORT_CACHE_MAX_ENTRIES = 128
+
+# Report generation
+# Stream the model output, so a report not complete before the API Gateway timeout is
+# handed off to a report job, with the text generated so far
+STREAMING_ENABLED = True
+# Seconds after which a streamed report is handed off, below the 25 second API Gateway limit
+RESPONSE_DEADLINE_SECONDS = 23
+# Estimated prompt tokens above which POST /generate-report hands a report off to a report
+# job before invoking the model, as its generation would likely outlast the response deadline
+SYNC_MAX_PROMPT_TOKENS = 8000
+# Seconds each Resilience Hub call behind a report may take
+FETCH_TIMEOUT_SECONDS = 10
+# Estimated tokens the recommendations may take in the prompt
+PROMPT_TOKEN_BUDGET = 32000
+# Summarize recommendations exceeding the prompt budget in chunks (map), then generate
+# the report from the summaries (reduce), instead of omitting the lowest priority ones
+MAP_REDUCE_ENABLED = True
+# Chunks summarized concurrently, and the maximum tokens of each summary
+MAP_CONCURRENCY = 4
+MAP_MAX_TOKENS = 1000
+
+# Asynchronous report jobs
+# Seconds a report job is kept after its last update
+REPORT_JOBS_TTL_SECONDS = 24 * 3600
+# Seconds a report job may wait for its asynchronous invoke, the default maximum
+# event age of Lambda asynchronous invocations, after which the event is dropped
+REPORT_JOBS_PENDING_TIMEOUT_SECONDS = 6 * 3600
+
+# Report warm-up
+# Pre-generate the reports of new assessments on a schedule. The cache table is then
+# deployed, so every Lambda container serves the pre-generated reports.
+WARM_UP_ENABLED = False
+WARM_UP_INTERVAL_MINUTES = 15
+# Personas and applications (names or ARNs, every application when empty) to pre-generate reports for
+WARM_UP_PERSONAS = ['executive', 'manager', 'engineer']
+WARM_UP_APPS = []
+# Maximum number of reports queued per run
+WARM_UP_MAX_REPORTS = 20
+# Seconds before a report already queued is queued again, when its job is still pending,
+# failed or was lost, so failing reports do not take the budget of every run
+WARM_UP_RETRY_SECONDS = 24 * 3600
+
+# Batch report generation
+# Maximum number of reports in one batch request
+BATCH_MAX_REPORTS = 100
+# Reports of a batch generated concurrently, kept low to stay within Bedrock quotas
+BATCH_CONCURRENCY = 4
+
+# Call execution
+# Client-side rate limits in calls per second, per service or per "service.operation" API
+API_RATE_LIMITS = {
+    'resiliencehub': {'rate': 10, 'burst': 20},
+    'bedrock-runtime': {'rate': 1, 'burst': 4},
+}
+# Retries of throttled or transient failures, with jittered exponential backoff
+API_MAX_RETRIES = 5
+
+# Response encoding
+# Responses of at least this many bytes are compressed with gzip, or brotli when the
+# brotli module is bundled, if the client accepts it
+COMPRESSION_MIN_BYTES = 1024
+
+# Observability
+# CloudWatch namespace of the Embedded Metric Format metrics logged by the functions
+METRICS_NAMESPACE = 'ResilienceHubGenAI'
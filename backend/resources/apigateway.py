@@ -1,5 +1,8 @@
 
+from typing import List
+
 from aws_cdk import Duration
+from aws_cdk import Token
 from aws_cdk import aws_apigateway
 from aws_cdk import aws_cognito
 from aws_cdk import aws_lambda
@@ -8,19 +11,108 @@ import constants
 
 
 
+# Answers CORS preflight requests in API Gateway. The Origin header must exactly match
+# one of the allowed origins, which is echoed back, and other origins get a 403.
+PREFLIGHT_RESPONSE_TEMPLATE = """#set($origin = $input.params().header.get('origin'))
+#if("$!origin" == "")
+#set($origin = $input.params().header.get('Origin'))
+#end
+#set($allowed = [ALLOWED_ORIGINS])
+#if($allowed.contains("$!origin.toLowerCase()"))
+#set($context.responseOverride.header.Access-Control-Allow-Origin = $origin)
+#else
+#set($context.responseOverride.status = 403)
+#end
+"""
+
+
+# Request headers allowed by the preflight responses, as returned by the Lambda functions.
+ALLOW_HEADERS = 'authorization, Content-Type, x-cache-bypass'
+
+# Request parameters the cached applications options responses are keyed on. The
+# Authorization header keeps each caller's responses apart, and a new x-cache-bypass
+# value misses the cache, so the function refreshes the options.
+OPTIONS_CACHE_KEY_PARAMETERS = [
+    'method.request.header.Authorization',
+    'method.request.header.x-cache-bypass',
+    'method.request.header.Origin',
+    'method.request.header.Accept-Encoding',
+] + [
+    f'method.request.querystring.{name}'
+    for name in ('q', 'prefix', 'compliance_status', 'min_score', 'max_score', 'cursor', 'limit')
+]
+
+
+def preflight_origin(origin: str) -> str:
+    """
+    Normalizes an origin like the Lambda functions do, leaving deploy-time tokens untouched.
+    """
+    if Token.is_unresolved(origin):
+        return origin
+    return origin.strip().rstrip('/').lower()
+
+
 class ApiGateway(Construct):
-    def __init__(self, scope: Construct, construct_id: str, get_applications_function: aws_lambda.Function, generate_report_function: aws_lambda.Function, user_pool: aws_cognito.UserPool, **kwargs) -> None:
+    def __init__(self, scope: Construct, construct_id: str, get_applications_function: aws_lambda.IFunction, generate_report_function: aws_lambda.IFunction, user_pool: aws_cognito.UserPool, allowed_origins: List[str], **kwargs) -> None:
         super().__init__(scope, construct_id, **kwargs)
 
+        self.preflight_integration = aws_apigateway.MockIntegration(
+            # Without it, the */* binary media type makes the mock skip its templates.
+            content_handling=aws_apigateway.ContentHandling.CONVERT_TO_TEXT,
+            request_templates={'application/json': '{"statusCode": 200}'},
+            integration_responses=[
+                aws_apigateway.IntegrationResponse(
+                    status_code='200',
+                    content_handling=aws_apigateway.ContentHandling.CONVERT_TO_TEXT,
+                    response_parameters={
+                        'method.response.header.Access-Control-Allow-Methods': "'GET, POST'",
+                        'method.response.header.Access-Control-Allow-Headers': f"'{ALLOW_HEADERS}'",
+                        'method.response.header.Access-Control-Max-Age': f"'{constants.CORS_MAX_AGE_SECONDS}'",
+                        'method.response.header.Vary': "'Origin'",
+                    },
+                    response_templates={
+                        'application/json': PREFLIGHT_RESPONSE_TEMPLATE.replace(
+                            'ALLOWED_ORIGINS',
+                            ', '.join(f'"{preflight_origin(origin)}"' for origin in allowed_origins)
+                        ),
+                    },
+                )
+            ],
+        )
+        self.preflight_method_responses = [
+            aws_apigateway.MethodResponse(
+                status_code=status_code,
+                response_parameters={
+                    'method.response.header.Access-Control-Allow-Origin': True,
+                    'method.response.header.Access-Control-Allow-Methods': True,
+                    'method.response.header.Access-Control-Allow-Headers': True,
+                    'method.response.header.Access-Control-Max-Age': True,
+                    'method.response.header.Vary': True,
+                },
+            )
+            for status_code in ('200', '403')
+        ]
+
         rest_api = aws_apigateway.RestApi(
             self,
             id='ResilienceHubReportAPI',
             endpoint_types=[aws_apigateway.EndpointType.REGIONAL],
+            # Lets the functions return gzip or brotli compressed bodies as base64.
+            binary_media_types=['*/*'],
             deploy_options=aws_apigateway.StageOptions(
                 metrics_enabled=True,
                 logging_level=aws_apigateway.MethodLoggingLevel.INFO,
                 data_trace_enabled=False,
-                stage_name='live'
+                stage_name='live',
+                cache_cluster_enabled=constants.API_CACHE_ENABLED,
+                cache_cluster_size=constants.API_CACHE_SIZE_GB if constants.API_CACHE_ENABLED else None,
+                method_options={
+                    '/get-applications-options/GET': aws_apigateway.MethodDeploymentOptions(
+                        caching_enabled=constants.API_CACHE_ENABLED,
+                        cache_ttl=Duration.seconds(constants.API_CACHE_TTL_SECONDS),
+                        cache_data_encrypted=True,
+                    ),
+                },
             ),
             
             deploy=True
@@ -35,36 +127,60 @@ class ApiGateway(Construct):
 
 
         get_applications_options = rest_api.root.add_resource('get-applications-options')
+        self.add_preflight(get_applications_options)
+
         get_applications_options.add_method(
-            http_method='OPTIONS',
+            http_method='GET',
+            authorizer=authorizer,
+            request_parameters={parameter: False for parameter in OPTIONS_CACHE_KEY_PARAMETERS},
             integration=aws_apigateway.LambdaIntegration(
                 handler=get_applications_function,
                 proxy=True,
-                timeout=Duration.seconds(5)
+                timeout=Duration.seconds(25),
+                cache_key_parameters=OPTIONS_CACHE_KEY_PARAMETERS,
             ),
         )
 
-        get_applications_options.add_method(
-            http_method='GET',
+        generate_report = rest_api.root.add_resource('generate-report')
+        self.add_preflight(generate_report)
+
+        generate_report.add_method(
+            http_method='POST',
             authorizer=authorizer,
             integration=aws_apigateway.LambdaIntegration(
-                handler=get_applications_function,
+                handler=generate_report_function,
                 proxy=True,
                 timeout=Duration.seconds(25)
             ),
         )
 
-        generate_report = rest_api.root.add_resource('generate-report')
-        generate_report.add_method(
-            http_method='OPTIONS',
+        generate_report_jobs = rest_api.root.add_resource('generate-report-jobs')
+        self.add_preflight(generate_report_jobs)
+
+        generate_report_jobs.add_method(
+            http_method='POST',
+            authorizer=authorizer,
             integration=aws_apigateway.LambdaIntegration(
                 handler=generate_report_function,
                 proxy=True,
-                timeout=Duration.seconds(5)
+                timeout=Duration.seconds(10)
             ),
         )
 
-        generate_report.add_method(
+        generate_report_jobs.add_method(
+            http_method='GET',
+            authorizer=authorizer,
+            integration=aws_apigateway.LambdaIntegration(
+                handler=generate_report_function,
+                proxy=True,
+                timeout=Duration.seconds(10)
+            ),
+        )
+
+        generate_report_batch = rest_api.root.add_resource('generate-report-batch')
+        self.add_preflight(generate_report_batch)
+
+        generate_report_batch.add_method(
             http_method='POST',
             authorizer=authorizer,
             integration=aws_apigateway.LambdaIntegration(
@@ -77,5 +193,17 @@ class ApiGateway(Construct):
         self.api = rest_api
         self.paths = {
             'get-applications-options': get_applications_options.path,
-            'generate-report': generate_report.path
+            'generate-report': generate_report.path,
+            'generate-report-jobs': generate_report_jobs.path,
+            'generate-report-batch': generate_report_batch.path
         }
+
+    def add_preflight(self, resource: aws_apigateway.Resource) -> None:
+        """
+        Answers the CORS preflight requests of a resource without invoking a Lambda function.
+        """
+        resource.add_method(
+            http_method='OPTIONS',
+            integration=self.preflight_integration,
+            method_responses=self.preflight_method_responses,
+        )
@@ -30,14 +30,31 @@ class CloudFront(Construct):
         )
         self.assets_bucket = assets_bucket
 
-        cache_disabled_policy = aws_cloudfront.CachePolicy(
+        # Entry points and other unhashed files are revalidated with S3 on every request,
+        # so a deployment is visible at once. S3 serves them with Cache-Control: no-cache.
+        revalidate_policy = aws_cloudfront.CachePolicy(
             self,
             id='CloudFrontCachePolicy',
             cache_policy_name='CloudFrontCachePolicy',
             default_ttl=Duration.seconds(0),
             min_ttl=Duration.seconds(0),
-            max_ttl=Duration.seconds(0),
+            # Above 0, so that CloudFront compresses the responses.
+            max_ttl=Duration.days(1),
+            enable_accept_encoding_gzip=True,
+            enable_accept_encoding_brotli=True,
         )
+        # Vite fingerprints the bundles under /assets, so a changed file gets a new name.
+        immutable_policy = aws_cloudfront.CachePolicy(
+            self,
+            id='CloudFrontAssetsCachePolicy',
+            cache_policy_name='CloudFrontAssetsCachePolicy',
+            default_ttl=Duration.seconds(constants.STATIC_ASSETS_MAX_AGE_SECONDS),
+            min_ttl=Duration.seconds(constants.STATIC_ASSETS_MAX_AGE_SECONDS),
+            max_ttl=Duration.seconds(constants.STATIC_ASSETS_MAX_AGE_SECONDS),
+            enable_accept_encoding_gzip=True,
+            enable_accept_encoding_brotli=True,
+        )
+        assets_origin = aws_cloudfront_origins.S3BucketOrigin.with_origin_access_control(assets_bucket)
         http_403_error = aws_cloudfront.ErrorResponse(
             http_status=403,
             ttl=Duration.minutes(1),
@@ -49,10 +66,19 @@ class CloudFront(Construct):
             id='CloudFrontDistribution',
             comment='AWSResilienceHubGenAI',
             default_behavior=aws_cloudfront.BehaviorOptions(
-                origin=aws_cloudfront_origins.S3BucketOrigin.with_origin_access_control(assets_bucket),
-                cache_policy=cache_disabled_policy,
+                origin=assets_origin,
+                cache_policy=revalidate_policy,
+                compress=True,
                 viewer_protocol_policy=aws_cloudfront.ViewerProtocolPolicy.REDIRECT_TO_HTTPS
             ),
+            additional_behaviors={
+                '/assets/*': aws_cloudfront.BehaviorOptions(
+                    origin=assets_origin,
+                    cache_policy=immutable_policy,
+                    compress=True,
+                    viewer_protocol_policy=aws_cloudfront.ViewerProtocolPolicy.REDIRECT_TO_HTTPS
+                ),
+            },
             default_root_object="/welcome/index.html",
             error_responses=[http_403_error]
         )
@@ -0,0 +1,28 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+
+from aws_cdk import RemovalPolicy
+from aws_cdk import aws_dynamodb
+from constructs import Construct
+
+
+
+class CacheTable(Construct):
+    def __init__(self, scope: Construct, construct_id: str, **kwargs) -> None:
+        super().__init__(scope, construct_id, **kwargs)
+
+        cache_table = aws_dynamodb.Table(
+            self,
+            id='CacheTable',
+            partition_key=aws_dynamodb.Attribute(
+                name='pk',
+                type=aws_dynamodb.AttributeType.STRING
+            ),
+            billing_mode=aws_dynamodb.BillingMode.PAY_PER_REQUEST,
+            time_to_live_attribute='expiresAt',
+            removal_policy=RemovalPolicy.DESTROY
+        )
+
+        self.table = cache_table
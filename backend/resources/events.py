@@ -0,0 +1,31 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+
+from aws_cdk import Duration
+from aws_cdk import aws_events
+from aws_cdk import aws_events_targets
+from aws_cdk import aws_lambda
+from constructs import Construct
+
+
+
+class ReportWarmUpSchedule(Construct):
+    def __init__(self, scope: Construct, construct_id: str, generate_report_function: aws_lambda.IFunction, interval_minutes: int, **kwargs) -> None:
+        super().__init__(scope, construct_id, **kwargs)
+
+        warm_up_rule = aws_events.Rule(
+            self,
+            id='ReportWarmUpRule',
+            description='Pre-generate the reports of new AWS Resilience Hub assessments.',
+            schedule=aws_events.Schedule.rate(Duration.minutes(interval_minutes)),
+            targets=[
+                aws_events_targets.LambdaFunction(
+                    generate_report_function,
+                    event=aws_events.RuleTargetInput.from_object({'reportWarmUp': {}})
+                )
+            ]
+        )
+
+        self.rule = warm_up_rule
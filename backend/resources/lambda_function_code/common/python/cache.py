@@ -0,0 +1,357 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Key/value caching with pluggable backends and stale-while-revalidate reads.
+"""
+
+import gzip
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from calls import error_code
+from config import get_client
+
+
+class InMemoryBackend:
+    """
+    Cache backend that lives in the Lambda container and survives warm invocations.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        """
+        Args:
+            max_entries (int, optional): Maximum number of entries kept. The least
+                recently used entry is evicted first. Unbounded when None.
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            return self._get(key)
+
+    def put(self, key: str, value: Dict, ttl_seconds: Optional[int] = None) -> None:
+        with self._lock:
+            self._put(key, value, ttl_seconds)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def add_member(self, key: str, member: str, tag: str, rank: float, ttl_seconds: Optional[int] = None) -> Tuple[bool, List[str]]:
+        """
+        Adds a member to the tagged set stored at key.
+
+        The set is replaced by a new one when it is missing, or when it has another
+        tag and a lower rank. A set with another tag and the same or a higher rank
+        is kept, and the member is not added.
+
+        Args:
+            key (str): Key of the set.
+            member (str): Member to add.
+            tag (str): Tag of the set the member belongs to, e.g. an assessment ARN.
+            rank (float): Rank of the tag, e.g. the assessment end time.
+            ttl_seconds (int, optional): Seconds the set is kept after this update.
+
+        Returns:
+            Tuple[bool, List[str]]: Whether the member was added, and the members of
+                the set it replaced.
+        """
+        with self._lock:
+            stored = self._get(key)
+            if stored is not None and stored.get("tag") == tag:
+                members = stored["members"] + ([] if member in stored["members"] else [member])
+                self._put(key, {**stored, "members": members}, ttl_seconds)
+                return True, []
+            if stored is not None and "tag" in stored and stored["rank"] >= rank:
+                return False, []
+            self._put(key, {"tag": tag, "rank": rank, "members": [member]}, ttl_seconds)
+            return True, list(stored["members"]) if stored is not None and "tag" in stored else []
+
+    def members(self, key: str) -> List[str]:
+        """
+        Returns the members of the tagged set stored at key.
+        """
+        stored = self.get(key)
+        return list(stored["members"]) if stored is not None and "members" in stored else []
+
+    def _get(self, key: str) -> Optional[Dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _put(self, key: str, value: Dict, ttl_seconds: Optional[int]) -> None:
+        expires_at = time.time() + ttl_seconds if ttl_seconds else None
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while self.max_entries is not None and len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class DynamoDBBackend:
+    """
+    Cache backend stored in a DynamoDB table shared by every container.
+
+    The table uses a string partition key named pk and a number attribute named
+    expiresAt for DynamoDB time to live. Any object exposing get_item, put_item
+    and delete_item with the low-level client signature can stand in for the
+    DynamoDB client.
+
+    Values are stored as gzip compressed JSON. A value still larger than
+    MAX_ITEM_BYTES once compressed, like the options snapshot of a large account,
+    is split into shard items, written before the item of the key that lists them.
+    """
+
+    # Below the 400 KB DynamoDB item size limit, leaving room for the other attributes.
+    MAX_ITEM_BYTES = 350 * 1024
+
+    def __init__(self, table_name: str, client=None):
+        self.table_name = table_name
+        self._client = client
+
+    @property
+    def client(self):
+        return self._client or get_client("dynamodb")
+
+    def get(self, key: str) -> Optional[Dict]:
+        item = self._get_item(key)
+        if item is None:
+            return None
+        # DynamoDB deletes expired items lazily, so they can still be returned.
+        if "expiresAt" in item and float(item["expiresAt"]["N"]) <= time.time():
+            return None
+        if "shards" in item:
+            chunks = []
+            for shard_key in self._shard_keys(key, item):
+                shard = self._get_item(shard_key)
+                # Deleted by a concurrent write, or by time to live.
+                if shard is None:
+                    return None
+                chunks.append(shard["value"]["B"])
+            return json.loads(gzip.decompress(b"".join(chunks)))
+        if "B" in item["value"]:
+            return json.loads(gzip.decompress(item["value"]["B"]))
+        # Uncompressed value written by an earlier version.
+        return json.loads(item["value"]["S"])
+
+    def put(self, key: str, value: Dict, ttl_seconds: Optional[int] = None) -> None:
+        data = gzip.compress(json.dumps(value, separators=(",", ":")).encode("utf-8"))
+        expires = {"expiresAt": {"N": str(int(time.time() + ttl_seconds))}} if ttl_seconds else {}
+        if len(data) <= self.MAX_ITEM_BYTES:
+            item = {"pk": {"S": key}, "value": {"B": data}, **expires}
+        else:
+            version = uuid.uuid4().hex
+            chunks = [data[start:start + self.MAX_ITEM_BYTES] for start in range(0, len(data), self.MAX_ITEM_BYTES)]
+            item = {"pk": {"S": key}, "version": {"S": version}, "shards": {"N": str(len(chunks))}, **expires}
+            for shard_key, chunk in zip(self._shard_keys(key, item), chunks):
+                self.client.put_item(
+                    TableName=self.table_name,
+                    Item={"pk": {"S": shard_key}, "value": {"B": chunk}, **expires},
+                )
+        response = self.client.put_item(TableName=self.table_name, Item=item, ReturnValues="ALL_OLD")
+        self._delete_shards(key, response.get("Attributes"))
+
+    def delete(self, key: str) -> None:
+        response = self.client.delete_item(
+            TableName=self.table_name,
+            Key={"pk": {"S": key}},
+            ReturnValues="ALL_OLD",
+        )
+        self._delete_shards(key, response.get("Attributes"))
+
+    def add_member(self, key: str, member: str, tag: str, rank: float, ttl_seconds: Optional[int] = None) -> Tuple[bool, List[str]]:
+        """
+        Adds a member to the tagged set stored at key, like InMemoryBackend.add_member.
+
+        The member is added to a string set attribute with a conditional update,
+        and a set is replaced with a conditional put, so concurrent writers neither
+        lose members nor replace a set of a higher rank.
+        """
+        expires = {"expiresAt": {"N": str(int(time.time() + ttl_seconds))}} if ttl_seconds else {}
+        # DynamoDB rejects attribute names and values the expressions do not use.
+        update_names = {"#tag": "tag", "#members": "members", **({"#expiresAt": "expiresAt"} if expires else {})}
+        # A failed put means another writer stored a set in between, possibly with the same tag.
+        for _ in range(2):
+            try:
+                self.client.update_item(
+                    TableName=self.table_name,
+                    Key={"pk": {"S": key}},
+                    UpdateExpression="ADD #members :member" + (" SET #expiresAt = :expiresAt" if expires else ""),
+                    ConditionExpression="#tag = :tag",
+                    ExpressionAttributeNames=update_names,
+                    ExpressionAttributeValues={
+                        ":member": {"SS": [member]},
+                        ":tag": {"S": tag},
+                        **({":expiresAt": expires["expiresAt"]} if expires else {}),
+                    },
+                )
+                return True, []
+            except Exception as exc:
+                if not is_conditional_check_failure(exc):
+                    raise
+            try:
+                response = self.client.put_item(
+                    TableName=self.table_name,
+                    Item={
+                        "pk": {"S": key},
+                        "tag": {"S": tag},
+                        "rank": {"N": repr(float(rank))},
+                        "members": {"SS": [member]},
+                        **expires,
+                    },
+                    ConditionExpression="attribute_not_exists(#tag) OR #rank < :rank",
+                    ExpressionAttributeNames={"#tag": "tag", "#rank": "rank"},
+                    ExpressionAttributeValues={":rank": {"N": repr(float(rank))}},
+                    ReturnValues="ALL_OLD",
+                )
+            except Exception as exc:
+                if not is_conditional_check_failure(exc):
+                    raise
+                continue
+            replaced = response.get("Attributes") or {}
+            self._delete_shards(key, replaced)
+            return True, list(replaced.get("members", {}).get("SS", []))
+        return False, []
+
+    def members(self, key: str) -> List[str]:
+        """
+        Returns the members of the tagged set stored at key.
+        """
+        item = self._get_item(key)
+        if item is None or ("expiresAt" in item and float(item["expiresAt"]["N"]) <= time.time()):
+            return []
+        return list(item.get("members", {}).get("SS", []))
+
+    def _get_item(self, key: str) -> Optional[Dict]:
+        response = self.client.get_item(
+            TableName=self.table_name,
+            Key={"pk": {"S": key}},
+        )
+        return response.get("Item")
+
+    def _delete_shards(self, key: str, item: Optional[Dict]) -> None:
+        # Shards of a replaced or deleted value. A reader still fetching them sees a miss.
+        if item and "shards" in item:
+            for shard_key in self._shard_keys(key, item):
+                self.client.delete_item(TableName=self.table_name, Key={"pk": {"S": shard_key}})
+
+    @staticmethod
+    def _shard_keys(key: str, item: Dict) -> List[str]:
+        return [f"{key}#{item['version']['S']}#{index}" for index in range(int(item["shards"]["N"]))]
+
+
+def is_conditional_check_failure(exc: Exception) -> bool:
+    """
+    Tells whether a DynamoDB call failed on its condition expression.
+    """
+    # CallError carries the code of the ClientError it wraps.
+    return (getattr(exc, "code", None) or error_code(exc)) == "ConditionalCheckFailedException"
+
+
+def default_backend(max_entries: Optional[int] = None):
+    """
+    Returns the backend selected by the environment.
+
+    The DynamoDB backend is used when the cache_table environment variable is set,
+    otherwise an in-memory backend.
+
+    Args:
+        max_entries (int, optional): Size bound of the in-memory backend.
+    """
+    table_name = os.environ.get("cache_table")
+    if table_name:
+        return DynamoDBBackend(table_name)
+    return InMemoryBackend(max_entries=max_entries)
+
+
+class StaleWhileRevalidateCache:
+    """
+    Serves cached values while they are fresh and refreshes them when they age.
+
+    Values younger than ttl_seconds are returned as is. Values that are older, but
+    still within stale_seconds past the ttl, are returned immediately while a
+    background thread refreshes them. Anything older is refreshed before returning,
+    and is kept retain_seconds longer so that refresh still receives it.
+
+    A value that cannot be stored is still returned, and refreshed again on the next call.
+    """
+
+    def __init__(self, backend, ttl_seconds: int, stale_seconds: int = 0, retain_seconds: int = 0):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.retain_seconds = retain_seconds
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def get_or_refresh(self, key: str, refresh: Callable[[Optional[Dict]], Dict], force: bool = False) -> Dict:
+        """
+        Returns the cached value for key, refreshing it when needed.
+
+        Args:
+            key (str): Cache key.
+            refresh: Function building a new value. It receives the previously
+                cached value, or None, so it can refresh incrementally.
+            force (bool): Refresh before returning, whatever the age of the value.
+
+        Returns:
+            Dict: The cached or refreshed value.
+        """
+        entry = self.backend.get(key)
+        if entry is None or force:
+            return self._refresh(key, refresh, entry["value"] if entry else None)
+
+        age = time.time() - entry["storedAt"]
+        if age < self.ttl_seconds:
+            return entry["value"]
+
+        if age < self.ttl_seconds + self.stale_seconds:
+            self._refresh_in_background(key, refresh, entry["value"])
+            return entry["value"]
+
+        return self._refresh(key, refresh, entry["value"])
+
+    def _refresh(self, key: str, refresh: Callable[[Optional[Dict]], Dict], previous: Optional[Dict]) -> Dict:
+        value = refresh(previous)
+        try:
+            self.backend.put(
+                key,
+                {"storedAt": time.time(), "value": value},
+                ttl_seconds=self.ttl_seconds + self.stale_seconds + self.retain_seconds,
+            )
+        except Exception as exc:
+            print(f"Storing {key} in the cache failed: {exc}")
+        return value
+
+    def _refresh_in_background(self, key: str, refresh: Callable[[Optional[Dict]], Dict], previous: Dict) -> None:
+        # Lambda freezes the container once the handler returns, so the refresh
+        # may finish during the next invocation of the same container.
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                self._refresh(key, refresh, previous)
+            except Exception as exc:
+                print(f"Background refresh of {key} failed: {exc}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, daemon=True).start()
@@ -0,0 +1,370 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Call execution for Boto3 clients: client-side rate limiting, adaptive retries and call metrics.
+
+Clients returned by config.get_client are wrapped in a ResilientClient. Each API,
+identified as "service.operation", draws from its own token bucket. Throttled calls
+are retried with jittered exponential backoff and slow the bucket down, and successful
+calls let it recover. Failures surface as CallError subclasses.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+import metrics
+
+
+THROTTLING_CODES = {
+    "Throttling",
+    "ThrottlingException",
+    "ThrottledException",
+    "TooManyRequestsException",
+    "RequestLimitExceeded",
+    "ProvisionedThroughputExceededException",
+    "RequestThrottled",
+    "RequestThrottledException",
+    "SlowDown",
+}
+
+# Hard quotas, e.g. a Bedrock account quota, are not lifted by retrying or slowing down.
+QUOTA_CODES = {
+    "ServiceQuotaExceededException",
+}
+
+TRANSIENT_CODES = {
+    "InternalServerException",
+    "InternalServerError",
+    "InternalFailure",
+    "ServiceUnavailable",
+    "ServiceUnavailableException",
+    "ModelNotReadyException",
+    "ModelTimeoutException",
+    "ModelStreamErrorException",
+    "RequestTimeout",
+    "RequestTimeoutException",
+}
+
+TRANSIENT_EXCEPTIONS = {
+    "EndpointConnectionError",
+    "ConnectTimeoutError",
+    "ReadTimeoutError",
+    "ConnectionClosedError",
+}
+
+MAX_RETRIES = int(os.environ.get("max_retries", "5"))
+BACKOFF_BASE_SECONDS = float(os.environ.get("backoff_base_seconds", "0.1"))
+BACKOFF_MAX_SECONDS = float(os.environ.get("backoff_max_seconds", "5"))
+
+
+class CallError(Exception):
+    """
+    Raised when a call fails, after any retries.
+    """
+
+    def __init__(self, api: str, code: str, attempts: int, cause: Exception):
+        self.api = api
+        self.code = code
+        self.attempts = attempts
+        self.cause = cause
+        super().__init__(f"{api} failed after {attempts} attempt(s): {code}: {cause}")
+
+
+class ThrottledError(CallError):
+    """
+    The service kept throttling the call.
+    """
+
+
+class TransientError(CallError):
+    """
+    The call kept failing with server-side or connection errors.
+    """
+
+
+class RequestError(CallError):
+    """
+    The call failed for a reason retrying cannot fix, e.g. validation or access denied.
+    """
+
+
+def error_code(exc: Exception) -> str:
+    """
+    Returns the service error code of a botocore ClientError, or the exception class name.
+    """
+    response = getattr(exc, "response", None)
+    if isinstance(response, dict):
+        code = response.get("Error", {}).get("Code")
+        if code:
+            return code
+    return type(exc).__name__
+
+
+def classify(exc: Exception) -> type:
+    """
+    Returns the CallError subclass matching an exception raised by a client.
+    """
+    code = error_code(exc)
+    # Exception events of response streams are named in lower camel case, e.g. throttlingException.
+    code = code[:1].upper() + code[1:]
+    if code in QUOTA_CODES:
+        return RequestError
+    if code in THROTTLING_CODES:
+        return ThrottledError
+    if code in TRANSIENT_CODES or code in TRANSIENT_EXCEPTIONS:
+        return TransientError
+    response = getattr(exc, "response", None)
+    status = response.get("ResponseMetadata", {}).get("HTTPStatusCode") if isinstance(response, dict) else None
+    if status == 429:
+        return ThrottledError
+    if status is not None and status >= 500:
+        return TransientError
+    return RequestError
+
+
+def stream_error(service_name: str, operation: str, exc: Exception) -> CallError:
+    """
+    Returns the CallError of an exception raised while reading a response stream.
+
+    The stream is read after the call returned, so ResilientClient does not see these
+    errors, e.g. a throttlingException event. Throttling still slows the API's bucket down.
+
+    Args:
+        service_name (str): Boto3 service name.
+        operation (str): Client method name that returned the stream.
+        exc (Exception): Exception raised by the stream.
+
+    Returns:
+        CallError: The matching CallError subclass, to be raised by the caller.
+    """
+    error_class = classify(exc)
+    if error_class is ThrottledError:
+        bucket = bucket_for(service_name, operation)
+        if bucket is not None:
+            bucket.on_throttled()
+    return error_class(f"{service_name}.{operation}", error_code(exc), 1, exc)
+
+
+class TokenBucket:
+    """
+    Token bucket with an adaptive refill rate.
+
+    The rate is halved, down to min_rate, every time the service throttles, and
+    grows back by a twentieth of max_rate with every successful call.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None, min_rate: Optional[float] = None):
+        """
+        Args:
+            rate (float): Maximum sustained calls per second.
+            burst (float, optional): Bucket capacity. Defaults to rate.
+            min_rate (float, optional): Lowest rate adapted to. Defaults to a tenth of rate.
+        """
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min_rate or rate / 10
+        self.capacity = max(burst or rate, 1)
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Takes a token, waiting until one is available.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def on_throttled(self) -> None:
+        with self._lock:
+            self.rate = max(self.rate / 2, self.min_rate)
+
+    def on_success(self) -> None:
+        if self.rate < self.max_rate:
+            with self._lock:
+                self.rate = min(self.rate + self.max_rate / 20, self.max_rate)
+
+
+class CallMetrics:
+    """
+    Per-API call counts, retries and latencies, accumulated for the container lifetime.
+    """
+
+    def __init__(self):
+        self._apis = {}
+        self._lock = threading.Lock()
+
+    def record(self, api: str, latency_seconds: float, attempts: int, throttled: int, waited_seconds: float, error: Optional[str] = None) -> None:
+        metrics.count("ApiCalls")
+        metrics.count("ApiRetries", attempts - 1)
+        metrics.count("ApiThrottles", throttled)
+        metrics.count("ApiErrors", 1 if error else 0)
+        metrics.count("ApiLatencyMs", latency_seconds * 1000, "Milliseconds")
+        metrics.tally("apiCalls", api)
+        with self._lock:
+            api_metrics = self._apis.setdefault(api, {
+                "calls": 0,
+                "errors": 0,
+                "retries": 0,
+                "throttles": 0,
+                "totalLatencyMs": 0.0,
+                "maxLatencyMs": 0.0,
+                "rateLimitWaitMs": 0.0,
+            })
+            latency_ms = latency_seconds * 1000
+            api_metrics["calls"] += 1
+            api_metrics["errors"] += 1 if error else 0
+            api_metrics["retries"] += attempts - 1
+            api_metrics["throttles"] += throttled
+            api_metrics["totalLatencyMs"] += latency_ms
+            api_metrics["maxLatencyMs"] = max(api_metrics["maxLatencyMs"], latency_ms)
+            api_metrics["rateLimitWaitMs"] += waited_seconds * 1000
+
+    def stats(self) -> Dict:
+        """
+        Returns a copy of the metrics, keyed by API, with latencies rounded to milliseconds.
+        """
+        with self._lock:
+            return {
+                api: {name: round(value, 1) if isinstance(value, float) else value for name, value in api_metrics.items()}
+                for api, api_metrics in self._apis.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._apis.clear()
+
+
+METRICS = CallMetrics()
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def rate_limits() -> Dict:
+    """
+    Returns the rate limits configured in the rate_limits environment variable.
+
+    The variable holds a JSON object keyed by service ("resiliencehub") or API
+    ("bedrock-runtime.invoke_model"), with rate and optional burst values.
+    APIs without a limit are not rate limited.
+    """
+    return json.loads(os.environ.get("rate_limits") or "{}")
+
+
+def bucket_for(service_name: str, operation: str) -> Optional[TokenBucket]:
+    """
+    Returns the token bucket of an API, creating it on first use.
+
+    Args:
+        service_name (str): Boto3 service name.
+        operation (str): Client method name.
+
+    Returns:
+        TokenBucket: The bucket, or None if the API is not rate limited.
+    """
+    api = f"{service_name}.{operation}"
+    if api in _buckets:
+        return _buckets[api]
+    with _buckets_lock:
+        if api not in _buckets:
+            limits = rate_limits()
+            limit = limits.get(api) or limits.get(service_name)
+            _buckets[api] = TokenBucket(limit["rate"], limit.get("burst")) if limit else None
+        return _buckets[api]
+
+
+def backoff_seconds(attempt: int) -> float:
+    """
+    Returns the full-jitter exponential backoff before retry number attempt.
+    """
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+
+class ResilientClient:
+    """
+    Wraps a Boto3 client so every method call is rate limited, retried and measured.
+
+    Attributes other than methods are passed through unchanged.
+    """
+
+    def __init__(self, client, service_name: str, max_retries: Optional[int] = None):
+        """
+        Args:
+            client: Boto3 client, or any object with the same methods.
+            service_name (str): Boto3 service name, used to look up rate limits.
+            max_retries (int, optional): Retries of throttled or transient failures.
+                Defaults to the max_retries environment variable.
+        """
+        self.client = client
+        self.service_name = service_name
+        self.max_retries = MAX_RETRIES if max_retries is None else max_retries
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self.client, name)
+        if not callable(attribute) or name.startswith("_") or name in ("get_paginator", "get_waiter", "can_paginate"):
+            return attribute
+
+        def call(*args, **kwargs):
+            return self._call(name, attribute, args, kwargs)
+
+        call.__name__ = name
+        return call
+
+    def _call(self, operation: str, method, args, kwargs):
+        api = f"{self.service_name}.{operation}"
+        bucket = bucket_for(self.service_name, operation)
+        start = time.monotonic()
+        waited = 0.0
+        throttled = 0
+        attempt = 0
+        while True:
+            attempt += 1
+            if bucket is not None:
+                waited += bucket.acquire()
+            try:
+                result = method(*args, **kwargs)
+            except Exception as exc:
+                error_class = classify(exc)
+                if error_class is ThrottledError:
+                    throttled += 1
+                    if bucket is not None:
+                        bucket.on_throttled()
+                if error_class is RequestError or attempt > self.max_retries:
+                    METRICS.record(api, time.monotonic() - start, attempt, throttled, waited, error=error_code(exc))
+                    raise error_class(api, error_code(exc), attempt, exc) from exc
+                time.sleep(backoff_seconds(attempt))
+                continue
+
+            if bucket is not None:
+                bucket.on_success()
+            METRICS.record(api, time.monotonic() - start, attempt, throttled, waited)
+            return result
+
+
+def reset() -> None:
+    """
+    Forgets the token buckets and metrics.
+    """
+    with _buckets_lock:
+        _buckets.clear()
+    METRICS.reset()
@@ -0,0 +1,153 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Lazily loaded stack configuration and Boto3 clients, cached for the container lifetime.
+
+Clients are wrapped in calls.ResilientClient, which takes over retries from botocore.
+"""
+
+import json
+import os
+import threading
+import urllib.request
+from typing import Dict, FrozenSet, Optional
+
+
+_clients = {}
+_config = None
+_lock = threading.RLock()
+
+
+def get_client(service_name: str):
+    """
+    Returns the Boto3 client of a service, creating it on first use.
+
+    Args:
+        service_name (str): Boto3 service name, e.g. "resiliencehub".
+
+    Returns:
+        The cached Boto3 client, wrapped in a ResilientClient.
+    """
+    client = _clients.get(service_name)
+    if client is None:
+        with _lock:
+            client = _clients.get(service_name)
+            if client is None:
+                import boto3
+                from botocore.config import Config
+                from calls import ResilientClient
+                # Retries are made by ResilientClient, so botocore makes a single attempt.
+                client = ResilientClient(
+                    boto3.client(service_name, config=Config(retries={"total_max_attempts": 1, "mode": "standard"})),
+                    service_name,
+                )
+                _clients[service_name] = client
+    return client
+
+
+def register_client(service_name: str, client) -> None:
+    """
+    Replaces the client of a service, e.g. with a local stand-in.
+
+    Args:
+        service_name (str): Boto3 service name.
+        client: Object used in place of the Boto3 client. It is wrapped in a
+            ResilientClient like the Boto3 clients.
+    """
+    from calls import ResilientClient
+    with _lock:
+        _clients[service_name] = ResilientClient(client, service_name)
+
+
+def get_config() -> Dict:
+    """
+    Returns the stack configuration, loading it once per container.
+
+    The configuration comes from the first available source:
+    the allowed_origins environment variable, the AWS Parameters and Secrets
+    Lambda Extension when its layer is attached, or the SSM parameter named
+    by the parameters environment variable.
+
+    Returns:
+        Dict: Configuration with at least the allowed_origins key, the set of normalized
+            allowed origins, and optionally personas, custom report persona templates
+            keyed by name.
+    """
+    global _config
+    if _config is None:
+        with _lock:
+            if _config is None:
+                config = _load_config()
+                config["allowed_origins"] = parse_origins(config.get("allowed_origins"))
+                _config = config
+    return _config
+
+
+def normalize_origin(origin: str) -> str:
+    """
+    Returns an origin in the form compared: without surrounding spaces or a trailing
+    slash, and lowercase, as schemes and host names are case-insensitive.
+    """
+    return origin.strip().rstrip("/").lower()
+
+
+def parse_origins(origins) -> FrozenSet[str]:
+    """
+    Parses the allowed origins, a comma-separated string or a list, into a set of normalized origins.
+    """
+    if isinstance(origins, str):
+        origins = origins.split(",")
+    return frozenset(normalize_origin(origin) for origin in origins or [] if origin.strip())
+
+
+def is_allowed_origin(origin: Optional[str]) -> bool:
+    """
+    Tells whether an Origin request header exactly matches one of the allowed origins.
+
+    Args:
+        origin (str, optional): Value of the Origin header.
+
+    Returns:
+        bool: True if the origin is allowed. Partial origins, e.g. a prefix of an
+            allowed origin, are not.
+    """
+    if not origin:
+        return False
+    return normalize_origin(origin) in get_config()["allowed_origins"]
+
+
+def reset() -> None:
+    """
+    Forgets the cached configuration and clients.
+    """
+    global _config
+    with _lock:
+        _config = None
+        _clients.clear()
+
+
+def _load_config() -> Dict:
+    if "allowed_origins" in os.environ:
+        return {
+            "allowed_origins": os.environ["allowed_origins"],
+            "personas": json.loads(os.environ.get("personas") or "{}"),
+        }
+
+    parameter_name = os.environ["parameters"]
+    extension_port = os.environ.get("PARAMETERS_SECRETS_EXTENSION_HTTP_PORT")
+    if extension_port:
+        return json.loads(_get_parameter_from_extension(parameter_name, extension_port))
+
+    response = get_client("ssm").get_parameter(Name=parameter_name)
+    return json.loads(response["Parameter"]["Value"])
+
+
+def _get_parameter_from_extension(parameter_name: str, port: str) -> str:
+    request = urllib.request.Request(
+        f"http://localhost:{port}/systemsmanager/parameters/get?name={parameter_name}",
+        headers={"X-Aws-Parameters-Secrets-Token": os.environ["AWS_SESSION_TOKEN"]},
+    )
+    with urllib.request.urlopen(request, timeout=2) as response:
+        return json.loads(response.read())["Parameter"]["Value"]
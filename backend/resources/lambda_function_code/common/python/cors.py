@@ -0,0 +1,52 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+CORS headers of the API responses, shared by every handler.
+
+Preflight requests are answered by API Gateway; these headers are the Lambda-side
+counterpart, added to every response of an allowed origin.
+"""
+
+from typing import Dict, Optional
+
+from config import is_allowed_origin
+from encoding import header
+
+
+ALLOW_METHODS = "GET, POST"
+ALLOW_HEADERS = "authorization, Content-Type, x-cache-bypass"
+
+
+def request_origin(event: Dict) -> Optional[str]:
+    """
+    Returns the Origin header of an API Gateway proxy event, whatever its case.
+    """
+    return header(event.get("headers"), "origin")
+
+
+def allowed_origin(event: Dict) -> Optional[str]:
+    """
+    Returns the origin of a request if it is allowed, None otherwise.
+    """
+    origin = request_origin(event)
+    return origin if is_allowed_origin(origin) else None
+
+
+def cors_headers(origin: str) -> Dict[str, str]:
+    """
+    Returns the CORS headers of a response to an allowed origin.
+
+    Args:
+        origin (str): Origin of the request, echoed back.
+
+    Returns:
+        Dict[str, str]: Response headers.
+    """
+    return {
+        "Access-Control-Allow-Origin": origin,
+        "Access-Control-Allow-Methods": ALLOW_METHODS,
+        "Access-Control-Allow-Headers": ALLOW_HEADERS,
+        "Vary": "Origin",
+    }
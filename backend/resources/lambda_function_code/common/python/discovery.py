@@ -0,0 +1,138 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Discovery of the Resilience Hub applications and assessments that reports can be generated for.
+
+Shared by the assessment options of the web UI and the report warm-up, so both
+select the same latest successful assessment of every application.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import metrics
+from pagination import paginate
+
+
+MAX_CONCURRENCY = int(os.environ.get('max_concurrency', '16'))
+
+
+def map_concurrently(func: Callable, items: List, max_workers: int = MAX_CONCURRENCY) -> List:
+    """
+    Apply a function to every item with at most max_workers calls in flight.
+
+    Args:
+        func: Function to call for each item.
+        items: Items to process.
+        max_workers: Parallelism cap. A value of 1 runs the calls sequentially.
+
+    Returns:
+        List of results in the same order as the items.
+    """
+    if max_workers <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(func, items))
+
+
+@metrics.timed("ListActiveApps")
+def list_active_apps(client) -> List[Dict]:
+    """
+    List your Resilience Hub applications and filter out the inactive ones.
+
+    Args:
+        client: Boto3 client for Resilience Hub.
+
+    Returns:
+        List of dictionaries representing active Resilience Hub applications.
+    """
+    app_summaries = paginate(client.list_apps, "appSummaries")
+    active_apps = [app for app in app_summaries if app["status"] == "Active"]
+    return active_apps
+
+
+@metrics.timed("ListReleaseVersions")
+def list_release_versions(client, apps: List[Dict], max_workers: int = MAX_CONCURRENCY) -> List[Dict]:
+    """
+    List the release versions for the given Resilience Hub applications.
+
+    Args:
+        client: Boto3 client for Resilience Hub.
+        apps: List of dictionaries representing Resilience Hub applications.
+        max_workers: Maximum number of applications queried concurrently.
+
+    Returns:
+        List of dictionaries representing Resilience Hub applications with a release version.
+    """
+    def has_release_version(app: Dict) -> bool:
+        app_versions = paginate(client.list_app_versions, "appVersions", appArn=app["appArn"])
+        return any(version["appVersion"] == "release" for version in app_versions)
+
+    has_release = map_concurrently(has_release_version, apps, max_workers)
+    release_apps = [app for app, released in zip(apps, has_release) if released]
+    return release_apps
+
+
+def latest_app_assessment(client, app: Dict) -> Optional[Dict]:
+    """
+    Return the latest successful assessment of a Resilience Hub application.
+
+    The assessments are scanned once as their pages arrive, keeping the one
+    with the latest end time, instead of being collected and sorted.
+
+    Args:
+        client: Boto3 client for Resilience Hub.
+        app: Dictionary representing a Resilience Hub application.
+
+    Returns:
+        Dictionary representing the assessment, or None if no assessment succeeded.
+    """
+    assessment_summaries = paginate(
+        client.list_app_assessments, "assessmentSummaries", appArn=app["appArn"]
+    )
+    return max(
+        (assessment for assessment in assessment_summaries if assessment["assessmentStatus"] == "Success"),
+        key=lambda assessment: assessment["endTime"],
+        default=None,
+    )
+
+
+@metrics.timed("ListLatestAppAssessments")
+def list_apps_with_latest_assessment(client, apps: List[Dict], max_workers: int = MAX_CONCURRENCY) -> List[Tuple[Dict, Dict]]:
+    """
+    Pair the given Resilience Hub applications with their latest successful assessment.
+
+    Args:
+        client: Boto3 client for Resilience Hub.
+        apps: List of dictionaries representing Resilience Hub applications.
+        max_workers: Maximum number of applications queried concurrently.
+
+    Returns:
+        List of (application, assessment) tuples in application order. Applications
+        without a successful assessment are left out.
+    """
+    latest_assessments = map_concurrently(lambda app: latest_app_assessment(client, app), apps, max_workers)
+    return [
+        (app, assessment)
+        for app, assessment in zip(apps, latest_assessments)
+        if assessment is not None
+    ]
+
+
+def list_latest_app_assessments(client, apps: List[Dict], max_workers: int = MAX_CONCURRENCY) -> List[Dict]:
+    """
+    List the latest successful assessment for the given Resilience Hub applications.
+
+    Args:
+        client: Boto3 client for Resilience Hub.
+        apps: List of dictionaries representing Resilience Hub applications.
+        max_workers: Maximum number of applications queried concurrently.
+
+    Returns:
+        List of dictionaries representing the latest successful assessment for each application.
+    """
+    return [assessment for _, assessment in list_apps_with_latest_assessment(client, apps, max_workers)]
@@ -0,0 +1,147 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Response body encoding for API Gateway proxy responses: compact JSON and content negotiation.
+
+Bodies are serialized once with compact separators, then compressed with the best
+encoding the client accepts, brotli when the module is available and gzip otherwise.
+Compressed bodies are returned base64 encoded with isBase64Encoded set, which API
+Gateway decodes back to binary because the API lists */* as a binary media type.
+As a side effect, API Gateway also hands request bodies to the function base64
+encoded, so handlers read them with request_body.
+"""
+
+import base64
+import gzip
+import json
+import os
+from typing import Dict, List, Optional
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# Bodies smaller than this are sent as they are, compressing them saves less than the headers cost.
+MIN_COMPRESS_BYTES = int(os.environ.get("compression_min_bytes", "1024"))
+GZIP_LEVEL = int(os.environ.get("gzip_level", "6"))
+BROTLI_QUALITY = int(os.environ.get("brotli_quality", "5"))
+
+
+def compress_gzip(data: bytes) -> bytes:
+    # mtime is fixed so identical bodies compress to identical bytes.
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def compress_brotli(data: bytes) -> bytes:
+    return brotli.compress(data, quality=BROTLI_QUALITY)
+
+
+# Supported encodings, in order of preference.
+ENCODERS = {"gzip": compress_gzip}
+if brotli is not None:
+    ENCODERS = {"br": compress_brotli, **ENCODERS}
+
+
+def to_json(value) -> str:
+    """
+    Serializes a value to JSON without the whitespace of the default separators.
+    """
+    return json.dumps(value, separators=(",", ":"))
+
+
+def header(headers: Optional[Dict], name: str) -> Optional[str]:
+    """
+    Returns a request header, whatever the case of its name.
+    """
+    name = name.lower()
+    for key, value in (headers or {}).items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def accepted_encodings(accept_encoding: Optional[str]) -> List[str]:
+    """
+    Lists the supported encodings an Accept-Encoding header allows, most preferred first.
+
+    Encodings are ranked by quality value, then by the server preference. An
+    encoding with q=0 is refused, and * stands for any encoding not listed.
+
+    Args:
+        accept_encoding (str, optional): Value of the Accept-Encoding request header.
+
+    Returns:
+        List[str]: Encodings to choose from, empty if the body must stay uncompressed.
+    """
+    qualities = {}
+    for item in (accept_encoding or "").split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+
+    ranked = []
+    for preference, coding in enumerate(ENCODERS):
+        quality = qualities.get(coding, qualities.get("*", 0.0))
+        if quality > 0:
+            ranked.append((-quality, preference, coding))
+    return [coding for _, _, coding in sorted(ranked)]
+
+
+def encode_response(event: Dict, response: Dict) -> Dict:
+    """
+    Compresses the body of a proxy response when the client accepts it.
+
+    Accept-Encoding is added to the Vary header either way, so caches keep the
+    compressed and uncompressed variants apart.
+
+    Args:
+        event (Dict): API Gateway proxy event, for its Accept-Encoding header.
+        response (Dict): Proxy response with a string body, updated in place.
+
+    Returns:
+        Dict: The response.
+    """
+    headers = response.setdefault("headers", {})
+    vary = headers.get("Vary")
+    headers["Vary"] = f"{vary}, Accept-Encoding" if vary else "Accept-Encoding"
+    body = response.get("body")
+    if not body or response.get("isBase64Encoded"):
+        return response
+
+    data = body.encode("utf-8")
+    if len(data) < MIN_COMPRESS_BYTES:
+        return response
+
+    encodings = accepted_encodings(header(event.get("headers"), "accept-encoding"))
+    if not encodings:
+        return response
+
+    encoding = encodings[0]
+    response["body"] = base64.b64encode(ENCODERS[encoding](data)).decode("ascii")
+    response["isBase64Encoded"] = True
+    headers["Content-Encoding"] = encoding
+    return response
+
+
+def request_body(event: Dict) -> str:
+    """
+    Returns the body of a proxy event as text, decoding it if API Gateway base64 encoded it.
+    """
+    body = event.get("body") or ""
+    if event.get("isBase64Encoded"):
+        return base64.b64decode(body).decode("utf-8")
+    return body
@@ -0,0 +1,171 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Per-invocation stage timings and counters, emitted as CloudWatch Embedded Metric Format.
+
+The handler is wrapped with metric_scope, pipeline stages with stage or timed, and
+counters are added with count. When the handler returns, one JSON line is printed
+to stdout, where CloudWatch Logs extracts the metrics from it:
+
+    {"_aws": {"Timestamp": ..., "CloudWatchMetrics": [...]}, "Function": "GenerateReport",
+     "describe_appMs": 212.4, "ApiCalls": 3, ..., "properties": {...}}
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+
+NAMESPACE = os.environ.get("metrics_namespace", "ResilienceHubGenAI")
+
+
+class MetricsRecorder:
+    """
+    Accumulates the metrics of one invocation.
+
+    Stages running on worker threads record into the same recorder, so every
+    update is made under a lock. Stages run more than once add up.
+    """
+
+    def __init__(self, function_name: str):
+        self.function_name = function_name
+        self.values = {}
+        self.units = {}
+        self.properties = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, value: float, unit: str = "Count") -> None:
+        with self._lock:
+            self.values[name] = self.values.get(name, 0) + value
+            self.units[name] = unit
+
+    def set_property(self, name: str, value) -> None:
+        with self._lock:
+            self.properties[name] = value
+
+    def tally(self, name: str, key: str, value: int = 1) -> None:
+        with self._lock:
+            counts = self.properties.setdefault(name, {})
+            counts[key] = counts.get(key, 0) + value
+
+    def to_emf(self) -> Dict:
+        """
+        Returns the recorded metrics as an Embedded Metric Format document.
+        """
+        with self._lock:
+            document = {
+                "_aws": {
+                    "Timestamp": int(time.time() * 1000),
+                    "CloudWatchMetrics": [
+                        {
+                            "Namespace": NAMESPACE,
+                            "Dimensions": [["Function"]],
+                            "Metrics": [{"Name": name, "Unit": unit} for name, unit in self.units.items()],
+                        }
+                    ],
+                },
+                "Function": self.function_name,
+                "properties": dict(self.properties),
+            }
+            for name, value in self.values.items():
+                document[name] = round(value, 3) if isinstance(value, float) else value
+        return document
+
+
+# The recorder of the invocation in progress. Lambda runs one invocation at a time per container.
+_recorder = MetricsRecorder("local")
+
+
+def current() -> MetricsRecorder:
+    """
+    Returns the recorder of the invocation in progress.
+    """
+    return _recorder
+
+
+def count(name: str, value: float = 1, unit: str = "Count") -> None:
+    """
+    Adds a value to a metric of the current invocation.
+
+    Args:
+        name (str): Metric name.
+        value (float): Value added.
+        unit (str): CloudWatch unit of the metric.
+    """
+    _recorder.add(name, value, unit)
+
+
+def set_property(name: str, value) -> None:
+    """
+    Attaches a value to the log line without making it a metric, e.g. per-API counts.
+    """
+    _recorder.set_property(name, value)
+
+
+def tally(name: str, key: str, value: int = 1) -> None:
+    """
+    Adds to a per-key count attached to the log line, e.g. {"apiCalls": {"resiliencehub.list_apps": 3}}.
+    """
+    _recorder.tally(name, key, value)
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Records the duration of a block as the metric {name}Ms, whether or not it raises.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _recorder.add(f"{name}Ms", (time.perf_counter() - start) * 1000, "Milliseconds")
+
+
+def timed(name: Optional[str] = None) -> Callable:
+    """
+    Decorator recording the duration of every call to a function as a stage.
+
+    Args:
+        name (str, optional): Stage name. Defaults to the function name.
+    """
+    def decorator(func: Callable) -> Callable:
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(stage_name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def metric_scope(function_name: str) -> Callable:
+    """
+    Decorator for Lambda handlers starting a new recorder for every invocation and
+    printing its Embedded Metric Format line when the handler returns or raises.
+
+    Args:
+        function_name (str): Value of the Function dimension.
+    """
+    def decorator(handler: Callable) -> Callable:
+        @functools.wraps(handler)
+        def wrapper(event, context):
+            global _recorder
+            _recorder = MetricsRecorder(function_name)
+            try:
+                with stage("Handler"):
+                    return handler(event, context)
+            finally:
+                print(json.dumps(_recorder.to_emf(), default=str))
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,48 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Lazy pagination over nextToken-based Boto3 list operations.
+"""
+
+from typing import Callable, Iterator, Optional
+
+import metrics
+
+
+def paginate(boto3_method: Callable, response_key: str, max_items: Optional[int] = None, **kwargs) -> Iterator:
+    """
+    Yields the items of a paginated Boto3 method as each page arrives.
+
+    The next page is only requested once the caller has consumed the current
+    one, so stopping the iteration early skips the remaining API calls.
+
+    Args:
+        boto3_method: Boto3 method to call.
+        response_key (str): Key in the response dictionary containing the items.
+        max_items (int, optional): Maximum number of items to yield.
+        **kwargs: Additional arguments to pass to the Boto3 method.
+
+    Yields:
+        Items from every page, in order.
+    """
+    if max_items is not None and max_items <= 0:
+        return
+
+    yielded = 0
+    request = dict(kwargs)
+    while True:
+        response = boto3_method(**request)
+        metrics.count("Pages")
+        metrics.tally("pages", getattr(boto3_method, "__name__", "unknown"))
+        for item in response.get(response_key, []):
+            yield item
+            yielded += 1
+            if max_items is not None and yielded >= max_items:
+                return
+
+        next_token = response.get("nextToken")
+        if not next_token:
+            return
+        request["nextToken"] = next_token
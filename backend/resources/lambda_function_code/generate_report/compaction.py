@@ -0,0 +1,234 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+This module compacts component recommendations into a token-budgeted prompt section.
+"""
+
+import json
+import math
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+
+# Breached and unassessed components come first, so they survive truncation.
+STATUS_PRIORITY = {
+    "BreachedUnattainable": 0,
+    "BreachedCanMeet": 1,
+    "MissingPolicy": 2,
+    "NotAssessed": 3,
+    "MetCanImprove": 4,
+}
+
+CHARS_PER_TOKEN = 4
+
+
+@dataclass
+class RecommendationGroup:
+    """
+    Components sharing the same recommendation status and suggested changes.
+    """
+
+    status: str
+    changes: List[str]
+    components: List[str]
+
+    def to_text(self) -> str:
+        lines = [f"STATUS: {self.status}", "COMPONENTS:"]
+        lines.extend(f"- {component}" for component in self.components)
+        lines.append("SUGGESTED CHANGES:")
+        lines.extend(f"- {change}" for change in self.changes)
+        return "\n".join(lines) + "\n"
+
+
+@dataclass
+class CompactedRecommendations:
+    """
+    Result of the compaction stage.
+    """
+
+    text: str
+    estimated_tokens: int
+    groups_included: int
+    groups_omitted: int
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimates the number of model tokens in a text.
+
+    Args:
+        text (str): Text to measure.
+
+    Returns:
+        int: Estimated token count, assuming about four characters per token.
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def change_to_text(change) -> str:
+    """
+    Renders a suggested change as canonical text, so identical changes compare equal.
+    """
+    if isinstance(change, str):
+        return change
+    return json.dumps(change, sort_keys=True, default=str)
+
+
+def group_recommendations(recommendations: List[Dict], component_label: Callable[[str], str]) -> List[RecommendationGroup]:
+    """
+    Deduplicates suggested changes and groups components by recommendation.
+
+    Args:
+        recommendations (List[Dict]): Component recommendations of an assessment.
+        component_label (Callable): Returns the text describing an application component.
+
+    Returns:
+        List[RecommendationGroup]: Groups in priority order, breached and unassessed first,
+            then by number of components and by text, so the order is deterministic.
+    """
+    groups = {}
+    for recommendation in recommendations:
+        changes = []
+        for config_recommendation in recommendation.get("configRecommendations", []):
+            for change in config_recommendation.get("suggestedChanges", []):
+                text = change_to_text(change)
+                if text not in changes:
+                    changes.append(text)
+
+        status = recommendation["recommendationStatus"]
+        key = (status, tuple(sorted(changes)))
+        if key not in groups:
+            groups[key] = RecommendationGroup(status=status, changes=sorted(changes), components=[])
+        label = component_label(recommendation["appComponentName"])
+        if label not in groups[key].components:
+            groups[key].components.append(label)
+
+    return sorted(
+        groups.values(),
+        key=lambda group: (
+            STATUS_PRIORITY.get(group.status, len(STATUS_PRIORITY)),
+            -len(group.components),
+            group.status,
+            group.changes,
+        ),
+    )
+
+
+def compact_recommendations(recommendations: List[Dict], component_label: Callable[[str], str], token_budget: Optional[int] = None) -> CompactedRecommendations:
+    """
+    Builds the recommendations section of the prompt within a token budget.
+
+    Groups are added in priority order until the next one would exceed the budget,
+    and the number of omitted groups is stated at the end.
+
+    Args:
+        recommendations (List[Dict]): Component recommendations of an assessment.
+        component_label (Callable): Returns the text describing an application component.
+        token_budget (int, optional): Maximum estimated tokens of the section. Unbounded when None.
+
+    Returns:
+        CompactedRecommendations: Section text, its estimated token count and group counts.
+    """
+    groups = group_recommendations(recommendations, component_label)
+
+    parts = []
+    used_tokens = 0
+    for index, group in enumerate(groups):
+        text = group.to_text()
+        tokens = estimate_tokens(text)
+        if token_budget is not None and used_tokens + tokens > token_budget:
+            omitted = len(groups) - index
+            parts.append(f"{omitted} further recommendation groups omitted to fit the token budget.\n")
+            break
+        parts.append(text)
+        used_tokens += tokens
+    else:
+        omitted = 0
+
+    section = "".join(parts)
+    return CompactedRecommendations(
+        text=section,
+        estimated_tokens=estimate_tokens(section),
+        groups_included=len(groups) - omitted,
+        groups_omitted=omitted,
+    )
+
+
+def split_group(group: RecommendationGroup, token_budget: int) -> List[RecommendationGroup]:
+    """
+    Splits a group whose text exceeds the token budget into groups of fewer components.
+
+    Args:
+        group (RecommendationGroup): Group to split.
+        token_budget (int): Maximum estimated tokens of each resulting group.
+
+    Returns:
+        List[RecommendationGroup]: The group itself when it fits, otherwise its parts.
+            A single component exceeding the budget on its own keeps a group of its own.
+    """
+    if estimate_tokens(group.to_text()) <= token_budget:
+        return [group]
+
+    parts = []
+    components = []
+    for component in group.components:
+        candidate = RecommendationGroup(status=group.status, changes=group.changes, components=components + [component])
+        if components and estimate_tokens(candidate.to_text()) > token_budget:
+            parts.append(RecommendationGroup(status=group.status, changes=group.changes, components=components))
+            components = [component]
+        else:
+            components = candidate.components
+    parts.append(RecommendationGroup(status=group.status, changes=group.changes, components=components))
+    return parts
+
+
+def partition_texts(texts: List[str], chunk_tokens: int) -> List[str]:
+    """
+    Packs texts, in order, into chunks of at most chunk_tokens estimated tokens.
+
+    Args:
+        texts (List[str]): Texts to pack. A text exceeding the chunk size gets a chunk of its own.
+        chunk_tokens (int): Maximum estimated tokens of a chunk.
+
+    Returns:
+        List[str]: The chunks.
+    """
+    chunks = []
+    parts = []
+    used_tokens = 0
+    for text in texts:
+        tokens = estimate_tokens(text)
+        if parts and used_tokens + tokens > chunk_tokens:
+            chunks.append("".join(parts))
+            parts = []
+            used_tokens = 0
+        parts.append(text)
+        used_tokens += tokens
+    if parts:
+        chunks.append("".join(parts))
+    return chunks
+
+
+def partition_recommendations(recommendations: List[Dict], component_label: Callable[[str], str], chunk_tokens: int) -> List[str]:
+    """
+    Splits the recommendations section into chunks that each fit a model call.
+
+    Unlike compact_recommendations, nothing is omitted: groups larger than a chunk
+    are split by components, then packed into chunks in priority order.
+
+    Args:
+        recommendations (List[Dict]): Component recommendations of an assessment.
+        component_label (Callable): Returns the text describing an application component.
+        chunk_tokens (int): Maximum estimated tokens of a chunk.
+
+    Returns:
+        List[str]: Recommendation section chunks. A single chunk when everything fits.
+    """
+    texts = [
+        part.to_text()
+        for group in group_recommendations(recommendations, component_label)
+        for part in split_group(group, chunk_tokens)
+    ]
+    return partition_texts(texts, chunk_tokens)
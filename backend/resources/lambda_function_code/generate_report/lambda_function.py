@@ -6,31 +6,121 @@
 This module provides functionality for generating reports based on Resilience Hub assessments.
 """
 
+from __future__ import annotations
+
 import json
-from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
+import hashlib
 import os
+import time
 import json
-import boto3
-import prompts
+from cache import DynamoDBBackend, InMemoryBackend, default_backend
+from calls import CallError, RequestError, ThrottledError, stream_error
+from config import get_client, get_config
+from cors import allowed_origin, cors_headers
+from discovery import list_active_apps, list_latest_app_assessments, list_release_versions
+from encoding import encode_response, request_body, to_json
+import compaction
+from compaction import compact_recommendations, estimate_tokens, partition_recommendations, partition_texts
+import metrics
+from pagination import paginate
+from report_cache import ReportCache
+from report_jobs import InMemoryJobQueue, JobStatus, JobStore, LambdaJobQueue, ProgressWriter
+from prompts import BUILT_IN_PERSONAS, SUMMARY_TEMPLATE, PromptRegistry, UnknownPersonaError
+
+if TYPE_CHECKING:
+    # Annotations only. Importing boto3 is deferred to the first client creation.
+    import boto3
 
 
-RH_CLIENT = boto3.client("resiliencehub")
-BEDROCK_CLIENT = boto3.client("bedrock-runtime")
 MODEL_ID = 'ai21.jamba-1-5-mini-v1:0'
+INFERENCE_PARAMS = {"max_tokens": 4000, "temperature": 0, "top_k": 1}
+
+STREAMING_ENABLED = os.environ.get('streaming_enabled', 'true') == 'true'
+RESPONSE_DEADLINE_SECONDS = float(os.environ.get('response_deadline_seconds', '23'))
+# Reports with larger estimated prompts go to a report job before the model is invoked.
+SYNC_MAX_PROMPT_TOKENS = int(os.environ.get('sync_max_prompt_tokens', '8000'))
+
+PROMPT_TOKEN_BUDGET = int(os.environ.get('prompt_token_budget', '32000'))
+
+# Context windows, in tokens, of the supported models.
+MODEL_CONTEXT_WINDOWS = {
+    'ai21.jamba-1-5-mini-v1:0': 256000,
+    'ai21.jamba-1-5-large-v1:0': 256000,
+}
+MODEL_CONTEXT_TOKENS = int(os.environ.get('model_context_tokens') or MODEL_CONTEXT_WINDOWS.get(MODEL_ID, 8192))
+
+# Applications whose recommendations exceed one prompt are summarized in chunks (map),
+# and the report is generated from the summaries (reduce).
+MAP_REDUCE_ENABLED = os.environ.get('map_reduce_enabled', 'true') == 'true'
+MAP_MAX_TOKENS = int(os.environ.get('map_max_tokens', '1000'))
+MAP_CONCURRENCY = int(os.environ.get('map_concurrency', '4'))
+# Room left in the context window for the template and application details.
+PROMPT_OVERHEAD_TOKENS = 1000
+# Chunks fit the context window of the model, and the prompt budget to bound the latency of each call.
+MAP_CHUNK_TOKENS = min(PROMPT_TOKEN_BUDGET, MODEL_CONTEXT_TOKENS - MAP_MAX_TOKENS - PROMPT_OVERHEAD_TOKENS)
+
+# Changes to the compaction stage or its budget change the report cache key of every persona,
+# changes to a persona template only the keys of that persona.
+pipeline_digest = hashlib.sha256(
+    f"{PROMPT_TOKEN_BUDGET}:{MAP_REDUCE_ENABLED}:{MAP_CHUNK_TOKENS}:{MAP_MAX_TOKENS}:{SUMMARY_TEMPLATE.digest}".encode("utf-8")
+)
+with open(compaction.__file__, "rb") as compaction_file:
+    pipeline_digest.update(compaction_file.read())
+PIPELINE_HASH = pipeline_digest.hexdigest()
+
+# Built-in personas plus the custom ones from the stack configuration, compiled on first use.
+_prompt_registry = None
+
+FETCH_TIMEOUT_SECONDS = float(os.environ.get('fetch_timeout_seconds', '10'))
+# Kept for the lifetime of the container, so a timed out call never blocks the handler.
+FETCH_EXECUTOR = ThreadPoolExecutor(max_workers=6)
+
+BATCH_MAX_REPORTS = int(os.environ.get('batch_max_reports', '100'))
+BATCH_CONCURRENCY = int(os.environ.get('batch_concurrency', '4'))
+# Items are not started later than this many seconds before the function times out.
+BATCH_CUTOFF_SECONDS = float(os.environ.get('batch_cutoff_seconds', '30'))
+# Attempts at a batch item before it is failed, when runs are interrupted while generating it.
+BATCH_ITEM_MAX_ATTEMPTS = 2
 
+# Scheduled pre-generation of the reports of new assessments.
+WARM_UP_PERSONAS = [persona for persona in os.environ.get('warm_up_personas', 'executive,manager,engineer').split(',') if persona]
+# Application names or ARNs to pre-generate reports for. Every application when empty.
+WARM_UP_APPS = {app for app in os.environ.get('warm_up_apps', '').split(',') if app}
+WARM_UP_MAX_REPORTS = int(os.environ.get('warm_up_max_reports', '20'))
+WARM_UP_RETRY_SECONDS = int(os.environ.get('warm_up_retry_seconds', '86400'))
 
-PARAMETERS = os.environ['parameters']
+# Seconds clients are asked to wait before retrying a throttled request.
+THROTTLED_RETRY_AFTER_SECONDS = 5
 
-ssm = boto3.client('ssm')
-response = ssm.get_parameter(
-    Name=PARAMETERS
+MODEL_INVOCATION_ERROR = "Model invocation error"
+OUTPUT_PARSING_ERROR = "Output parsing error"
+
+
+REPORT_CACHE = ReportCache(
+    backend=default_backend(max_entries=int(os.environ.get('report_cache_max_entries', '128'))),
+    ttl_seconds=int(os.environ.get('report_cache_ttl', '604800')),
 )
-values = json.loads(response['Parameter']['Value'])
 
-ALLOWED_ORIGINS = values['allowed_origins']
+JOBS_TABLE = os.environ.get('jobs_table')
+JOBS_TTL_SECONDS = int(os.environ.get('jobs_ttl', '86400'))
+# A job running for longer than the function timeout was lost to a timed out invocation.
+JOB_STALE_SECONDS = float(os.environ.get('function_timeout_seconds', '90'))
+# A job waiting longer than this for its asynchronous invoke, which may be throttled or
+# retried meanwhile, was lost to a dropped invoke.
+JOB_PENDING_TIMEOUT_SECONDS = float(os.environ.get('jobs_pending_timeout', '21600'))
 
+if JOBS_TABLE:
+    REPORT_JOBS = JobStore(DynamoDBBackend(JOBS_TABLE), ttl_seconds=JOBS_TTL_SECONDS)
+    JOB_QUEUE = LambdaJobQueue(os.environ['AWS_LAMBDA_FUNCTION_NAME'])
+else:
+    REPORT_JOBS = JobStore(InMemoryBackend(), ttl_seconds=JOBS_TTL_SECONDS)
+    JOB_QUEUE = InMemoryJobQueue(lambda job_id: run_report_job(job_id))
 
+
+@metrics.metric_scope("GenerateReport")
 def lambda_handler(event: Dict, context) -> Dict:
     """
     Lambda function handler.
@@ -42,6 +132,36 @@ def lambda_handler(event: Dict, context) -> Dict:
     Returns:
         Dict: Response payload.
     """
+    if "reportJob" in event:
+        run_report_job(event["reportJob"]["jobId"], context=context)
+        return {"statusCode": 200}
+
+    if "reportWarmUp" in event:
+        return {"statusCode": 200, "body": json.dumps(warm_up_reports())}
+
+    try:
+        return route_request(event)
+    except UnknownPersonaError as exc:
+        return cors_response(
+            event=event,
+            status_code=400,
+            body=to_json({"error": str(exc)}),
+        )
+
+
+def route_request(event: Dict) -> Dict:
+    """
+    Handles an API Gateway request.
+
+    Args:
+        event (Dict): API Gateway proxy event.
+
+    Returns:
+        Dict: Response payload.
+
+    Raises:
+        UnknownPersonaError: If a report is requested for an unknown persona, before any other work.
+    """
     method = event["httpMethod"]
     path = event["path"]
 
@@ -49,59 +169,659 @@ def lambda_handler(event: Dict, context) -> Dict:
         return cors_response(event=event, status_code=200)
 
     elif method == "POST" and path == "/generate-report":
-        request_json = json.loads(event["body"])
-        persona = request_json["persona"]
-        assessment_arn = request_json["assessment_arn"]
-        app_arn = request_json["app_arn"]
-
-        app = describe_app(app_arn)
-        app = list_app_version_resources(app)
-        app["recommendations"] = get_assessment_recommendations(assessment_arn)
-        
-        rh_report = build_prompts(app)
-        report = str(rh_report)
-        prompt = set_prompt(persona, report)
+        deadline = time.monotonic() + RESPONSE_DEADLINE_SECONDS
+        request_json = json.loads(request_body(event))
+        report_request = {
+            "persona": request_json["persona"],
+            "assessment_arn": request_json["assessment_arn"],
+            "app_arn": request_json["app_arn"],
+        }
+        try:
+            generated_text, _ = generate_report(**report_request, deadline=deadline, hand_off=True)
+        except ReportHandOff as hand_off:
+            print(f"Handing the report off to a report job: {hand_off}")
+            metrics.count("ReportHandOffs")
+            job = submit_report_job(report_request, report_input=hand_off.report_input)
+            body = job_to_response(job)
+            if hand_off.partial_text:
+                body["partial-text"] = hand_off.partial_text
+            return cors_response(
+                event=event,
+                status_code=202,
+                body=to_json(body),
+            )
+        except DataFetchError as exc:
+            print(f"Error fetching report data: {exc}")
+            return cors_response(
+                event=event,
+                status_code=exc.status_code,
+                body=to_json({"error": str(exc)}),
+                headers={"Retry-After": str(THROTTLED_RETRY_AFTER_SECONDS)} if exc.status_code == 503 else None,
+            )
+        except ThrottledError as exc:
+            print(f"Throttled generating report: {exc}")
+            return cors_response(
+                event=event,
+                status_code=503,
+                body=to_json({"error": "The service is busy, please retry shortly"}),
+                headers={"Retry-After": str(THROTTLED_RETRY_AFTER_SECONDS)},
+            )
         return cors_response(
             event=event,
             status_code=200,
-            body=json.dumps(
+            body=to_json(
                 {
-                    "generated-text": json.dumps(
-                        invoke_jamba_message(BEDROCK_CLIENT, MODEL_ID, prompt)
-                    )
+                    "generated-text": generated_text,
                 }
             ),
         )
+
+    elif method == "POST" and path == "/generate-report-jobs":
+        request_json = json.loads(request_body(event))
+        job = submit_report_job(
+            {
+                "persona": request_json["persona"],
+                "assessment_arn": request_json["assessment_arn"],
+                "app_arn": request_json["app_arn"],
+            }
+        )
+        return cors_response(
+            event=event,
+            status_code=202,
+            body=to_json(job_to_response(job)),
+        )
+
+    elif method == "POST" and path == "/generate-report-batch":
+        request_json = json.loads(request_body(event))
+        reports = request_json.get("reports") or []
+        if not 0 < len(reports) <= BATCH_MAX_REPORTS:
+            return cors_response(
+                event=event,
+                status_code=400,
+                body=to_json({"error": f"reports must list between 1 and {BATCH_MAX_REPORTS} reports"}),
+            )
+        job = submit_batch_job(
+            [
+                {
+                    "persona": report["persona"],
+                    "assessment_arn": report["assessment_arn"],
+                    "app_arn": report["app_arn"],
+                }
+                for report in reports
+            ]
+        )
+        return cors_response(
+            event=event,
+            status_code=202,
+            body=to_json(job_to_response(job)),
+        )
+
+    elif method == "GET" and path == "/generate-report-jobs":
+        query = event.get("queryStringParameters") or {}
+        job = REPORT_JOBS.get(query.get("job_id", ""))
+        if job is None:
+            return cors_response(event=event, status_code=404)
+        job = fail_stale_job(job)
+        return cors_response(
+            event=event,
+            status_code=200,
+            body=to_json(job_to_response(job)),
+        )
     return cors_response(event=event, status_code=404)
 
 
-def cors_response(event: Dict, status_code: int, body: str = None) -> Dict:
+def generate_report(persona: str, assessment_arn: str, app_arn: str, deadline: Optional[float] = None, on_chunk: Optional[Callable[[str], None]] = None, app: Optional[Dict] = None, report_input: Optional[Dict] = None, hand_off: bool = False) -> Tuple[str, bool]:
+    """
+    Generates a report, serving it from the report cache when possible.
+
+    Args:
+        persona (str): Report persona.
+        assessment_arn (str): Assessment ARN.
+        app_arn (str): Application ARN.
+        deadline (float, optional): time.monotonic() value after which to stop generating.
+        on_chunk (Callable, optional): Called with every streamed chunk.
+        app (Dict, optional): Application data already returned by gather_app_data.
+        report_input (Dict, optional): Report input of an earlier attempt, from ReportHandOff,
+            so the data is neither fetched nor summarized again.
+        hand_off (bool): Whether to raise ReportHandOff, rather than summarize recommendations,
+            invoke the model with a prompt above SYNC_MAX_PROMPT_TOKENS or return a cut off report.
+
+    Returns:
+        Tuple[str, bool]: Generated text, and whether the generation completed.
+
+    Raises:
+        UnknownPersonaError: If the persona has no template, before any other work.
+        ReportHandOff: With hand_off, if the report is better generated by a report job.
+    """
+    cache_key = ReportCache.report_key(
+        assessment_arn, persona, prompt_hash(persona), MODEL_ID, INFERENCE_PARAMS
+    )
+    with metrics.stage("ReportCacheGet"):
+        generated_text = REPORT_CACHE.get(cache_key)
+    complete = True
+    metrics.count("ReportCacheHits" if generated_text is not None else "ReportCacheMisses")
+
+    if generated_text is None:
+        if report_input is None:
+            if app is None:
+                app = gather_app_data(app_arn, assessment_arn)
+            report_input = {
+                "text": build_report_input(app, assessment_arn, summarize=not hand_off),
+                "assessmentEndTime": app.get("assessmentEndTime"),
+            }
+
+        if report_input["text"] is None:
+            generated_text, complete = MODEL_INVOCATION_ERROR, True
+        else:
+            prompt = set_prompt(persona, report_input["text"])
+            metrics.count("PromptCharacters", len(prompt))
+            if hand_off and estimate_tokens(prompt) > SYNC_MAX_PROMPT_TOKENS:
+                raise ReportHandOff(f"estimated prompt of {estimate_tokens(prompt)} tokens", report_input)
+            generated_text, complete = generate_text(prompt, deadline=deadline, on_chunk=on_chunk)
+            if hand_off and not complete:
+                raise ReportHandOff("not complete before the response deadline", report_input, generated_text)
+        if complete and generated_text not in (MODEL_INVOCATION_ERROR, OUTPUT_PARSING_ERROR):
+            with metrics.stage("ReportCachePut"):
+                REPORT_CACHE.put(cache_key, app_arn, assessment_arn, generated_text, assessment_end_time=report_input["assessmentEndTime"])
+
+    metrics.set_property("reportCache", REPORT_CACHE.stats())
+    return generated_text, complete
+
+
+class ReportHandOff(Exception):
+    """
+    Raised by generate_report on the synchronous path when a report is better generated
+    by a report job: its recommendations need summarizing, its prompt is large, or it was
+    not complete before the response deadline.
+    """
+
+    def __init__(self, reason: str, report_input: Optional[Dict] = None, partial_text: Optional[str] = None):
+        """
+        Args:
+            reason (str): Why the report is handed off.
+            report_input (Dict, optional): Report input already built, with its text and
+                assessmentEndTime, so the job does not build it again.
+            partial_text (str, optional): Text generated before the response deadline.
+        """
+        self.report_input = report_input
+        self.partial_text = partial_text
+        super().__init__(reason)
+
+
+class DataFetchError(Exception):
+    """
+    Raised when fetching the Resilience Hub data of a report fails or times out.
+    """
+
+    def __init__(self, call: str, cause: Exception):
+        self.call = call
+        self.cause = cause
+        super().__init__(f"{call} failed: {cause!r}")
+
+    @property
+    def status_code(self) -> int:
+        """
+        HTTP status of the failure: 404 or 400 when the request itself was rejected,
+        e.g. an unknown ARN or denied access, 503 when throttled, and 502 otherwise.
+        """
+        if isinstance(self.cause, RequestError):
+            return 404 if self.cause.code == "ResourceNotFoundException" else 400
+        if isinstance(self.cause, ThrottledError):
+            return 503
+        return 502
+
+
+@metrics.timed("GatherAppData")
+def gather_app_data(app_arn: str, assessment_arn: str, timeout: float = None) -> Dict:
+    """
+    Fetches the application, its resources, the assessment and its recommendations concurrently.
+
+    Args:
+        app_arn (str): Application ARN.
+        assessment_arn (str): Assessment ARN.
+        timeout (float, optional): Seconds each call may take. Defaults to FETCH_TIMEOUT_SECONDS.
+
+    Returns:
+        Dict: Application details with resources, resource index, recommendations and
+            the assessment end time.
+
+    Raises:
+        DataFetchError: If any call fails or exceeds the timeout.
+    """
+    if timeout is None:
+        timeout = FETCH_TIMEOUT_SECONDS
+    deadline = time.monotonic() + timeout
+
+    futures = {
+        "describe_app": FETCH_EXECUTOR.submit(describe_app, app_arn),
+        "list_app_version_resources": FETCH_EXECUTOR.submit(list_app_version_resources, {"appArn": app_arn}),
+        "get_assessment_recommendations": FETCH_EXECUTOR.submit(get_assessment_recommendations, assessment_arn),
+        "describe_app_assessment": FETCH_EXECUTOR.submit(describe_app_assessment, assessment_arn),
+    }
+
+    results = {}
+    try:
+        for call, future in futures.items():
+            try:
+                results[call] = future.result(timeout=max(deadline - time.monotonic(), 0))
+            except FutureTimeoutError as exc:
+                raise DataFetchError(call, TimeoutError(f"no response after {timeout} seconds")) from exc
+            except Exception as exc:
+                raise DataFetchError(call, exc) from exc
+    finally:
+        for future in futures.values():
+            future.cancel()
+
+    app = results["describe_app"]
+    app["resources"] = results["list_app_version_resources"]["resources"]
+    app["resourcesByComponent"] = results["list_app_version_resources"]["resourcesByComponent"]
+    app["recommendations"] = results["get_assessment_recommendations"]
+    app["assessmentEndTime"] = assessment_end_time(results["describe_app_assessment"])
+    return app
+
+
+def assessment_end_time(assessment: Dict) -> Optional[float]:
+    """
+    Returns the end time of an assessment in seconds since the epoch, or None while it runs.
+    """
+    end_time = assessment.get("endTime")
+    return end_time.timestamp() if end_time is not None else None
+
+
+def submit_report_job(request: Dict, report_input: Optional[Dict] = None) -> Dict:
+    """
+    Creates a report job and queues it, or completes it at once on a report cache hit.
+
+    Args:
+        request (Dict): Report request with persona, assessment_arn and app_arn.
+        report_input (Dict, optional): Report input already built by a handed off request.
+
+    Returns:
+        Dict: The created job.
+    """
+    cache_key = ReportCache.report_key(
+        request["assessment_arn"], request["persona"], prompt_hash(request["persona"]), MODEL_ID, INFERENCE_PARAMS
+    )
+    cached_text = REPORT_CACHE.get(cache_key)
+    if cached_text is not None:
+        return REPORT_JOBS.create(request, status=JobStatus.SUCCEEDED, result=cached_text)
+
+    job = REPORT_JOBS.create(request, **({"reportInput": report_input} if report_input else {}))
+    JOB_QUEUE.submit(job["jobId"])
+    return job
+
+
+def run_report_job(job_id: str, context=None) -> None:
+    """
+    Runs a queued report job and records its outcome in the job store.
+
+    Args:
+        job_id (str): Job ID.
+        context: Lambda context object, used to stop generating before the function times out.
+    """
+    job = REPORT_JOBS.get(job_id)
+    if job is None or job["status"] == JobStatus.FAILED.value:
+        print(f"Report job {job_id} {'not found' if job is None else 'already failed'}, not running it")
+        return
+    report_input = job.get("reportInput")
+    # Dropped from the job, so the progress updates do not write it again every time.
+    job = REPORT_JOBS.update(job_id, status=JobStatus.RUNNING, startedAt=time.time(), reportInput=None)
+    if job.get("kind") == "batch":
+        run_batch_job(job, context=context)
+        return
+    request = job["request"]
+
+    deadline = None
+    if context is not None:
+        deadline = time.monotonic() + context.get_remaining_time_in_millis() / 1000 - 5
+
+    try:
+        generated_text, complete = generate_report(
+            persona=request["persona"],
+            assessment_arn=request["assessment_arn"],
+            app_arn=request["app_arn"],
+            deadline=deadline,
+            on_chunk=ProgressWriter(REPORT_JOBS, job_id),
+            report_input=report_input,
+        )
+    except Exception as exc:
+        print(f"Report job {job_id} failed: {exc}")
+        REPORT_JOBS.update(job_id, status=JobStatus.FAILED, error=str(exc))
+        return
+
+    REPORT_JOBS.update(
+        job_id,
+        status=JobStatus.SUCCEEDED,
+        result=generated_text,
+        truncated=not complete,
+        partialText=None,
+    )
+
+
+def fail_stale_job(job: Dict) -> Dict:
+    """
+    Marks a lost job as failed, so clients polling it stop waiting: a job running for
+    longer than the function timeout, or pending for longer than JOB_PENDING_TIMEOUT_SECONDS.
+
+    Items of a batch job wait for their turn, so only their batch job is checked.
+
+    Args:
+        job (Dict): Job from the job store.
+
+    Returns:
+        Dict: The job, failed if it was stale.
+    """
+    if job.get("kind") == "batch_item":
+        return job
+    if job["status"] == JobStatus.RUNNING.value:
+        age = time.time() - job.get("startedAt", job["updatedAt"])
+        timeout = JOB_STALE_SECONDS
+    elif job["status"] == JobStatus.PENDING.value:
+        age = time.time() - job["updatedAt"]
+        timeout = JOB_PENDING_TIMEOUT_SECONDS
+    else:
+        return job
+    if age <= timeout:
+        return job
+    print(f"Report job {job['jobId']} {job['status'].lower()} for {age:.0f} seconds, failing it")
+    return REPORT_JOBS.update(job["jobId"], status=JobStatus.FAILED, error="The report job timed out")
+
+
+def submit_batch_job(requests: List[Dict]) -> Dict:
+    """
+    Creates a batch job with one child report job per distinct request, and queues it.
+
+    Requests already in the report cache complete at once.
+
+    Args:
+        requests (List[Dict]): Report requests with persona, assessment_arn and app_arn.
+
+    Returns:
+        Dict: The batch job.
+
+    Raises:
+        UnknownPersonaError: If any request has an unknown persona. No job is created then.
+    """
+    for request in requests:
+        get_prompt_registry().get(request["persona"])
+
+    unique_requests = list({
+        (request["app_arn"], request["assessment_arn"], request["persona"]): request
+        for request in requests
+    }.values())
+
+    items = []
+    pending = 0
+    for request in unique_requests:
+        cache_key = ReportCache.report_key(
+            request["assessment_arn"], request["persona"], prompt_hash(request["persona"]), MODEL_ID, INFERENCE_PARAMS
+        )
+        cached_text = REPORT_CACHE.get(cache_key)
+        if cached_text is not None:
+            child = REPORT_JOBS.create(request, status=JobStatus.SUCCEEDED, result=cached_text)
+        else:
+            child = REPORT_JOBS.create(request, kind="batch_item")
+            pending += 1
+        items.append({**request, "job_id": child["jobId"]})
+
+    if not pending:
+        return REPORT_JOBS.create({"reports": requests}, status=JobStatus.SUCCEEDED, kind="batch", items=items)
+
+    job = REPORT_JOBS.create({"reports": requests}, kind="batch", items=items)
+    JOB_QUEUE.submit(job["jobId"])
+    return job
+
+
+def run_batch_job(job: Dict, context=None) -> None:
+    """
+    Generates the pending reports of a batch job, BATCH_CONCURRENCY at a time.
+
+    Resilience Hub data is fetched once per application and assessment, whatever the
+    number of personas. Items that cannot start before the function runs out of time
+    are left pending and the batch job is queued again to continue with them. Items
+    that started stop generating before the function times out, like report jobs.
+
+    Runs of a batch job never overlap, so an item still running when a run starts was
+    interrupted, e.g. by the function timing out. It is retried, up to
+    BATCH_ITEM_MAX_ATTEMPTS attempts, then failed.
+
+    Args:
+        job (Dict): Batch job from the job store.
+        context: Lambda context object, used to stop starting and generating items before the function times out.
+    """
+    cutoff = None
+    deadline = None
+    if context is not None:
+        remaining_seconds = context.get_remaining_time_in_millis() / 1000
+        cutoff = time.monotonic() + remaining_seconds - BATCH_CUTOFF_SECONDS
+        deadline = time.monotonic() + remaining_seconds - 5
+
+    pending = []
+    attempts = {}
+    for item in job["items"]:
+        child = REPORT_JOBS.get(item["job_id"])
+        if child["status"] == JobStatus.RUNNING.value and child.get("attempts", 1) >= BATCH_ITEM_MAX_ATTEMPTS:
+            print(f"Batch item {item['job_id']} was interrupted {child.get('attempts', 1)} times")
+            REPORT_JOBS.update(item["job_id"], status=JobStatus.FAILED, error="Interrupted before completing")
+        elif child["status"] in (JobStatus.PENDING.value, JobStatus.RUNNING.value):
+            attempts[item["job_id"]] = child.get("attempts", 0)
+            pending.append(item)
+
+    # Each call is made once per batch, however many items share the application or assessment.
+    futures = {}
+    for item in pending:
+        app_arn, assessment_arn = item["app_arn"], item["assessment_arn"]
+        if ("describe_app", app_arn) not in futures:
+            futures[("describe_app", app_arn)] = FETCH_EXECUTOR.submit(describe_app, app_arn)
+            futures[("list_app_version_resources", app_arn)] = FETCH_EXECUTOR.submit(list_app_version_resources, {"appArn": app_arn})
+        if ("get_assessment_recommendations", assessment_arn) not in futures:
+            futures[("get_assessment_recommendations", assessment_arn)] = FETCH_EXECUTOR.submit(get_assessment_recommendations, assessment_arn)
+            futures[("describe_app_assessment", assessment_arn)] = FETCH_EXECUTOR.submit(describe_app_assessment, assessment_arn)
+
+    def result(call: str, arn: str):
+        try:
+            return futures[(call, arn)].result(timeout=FETCH_TIMEOUT_SECONDS)
+        except FutureTimeoutError as exc:
+            raise DataFetchError(call, TimeoutError(f"no response after {FETCH_TIMEOUT_SECONDS} seconds")) from exc
+        except Exception as exc:
+            raise DataFetchError(call, exc) from exc
+
+    def run_item(item: Dict) -> bool:
+        if cutoff is not None and time.monotonic() >= cutoff:
+            return False
+        REPORT_JOBS.update(item["job_id"], status=JobStatus.RUNNING, attempts=attempts[item["job_id"]] + 1)
+        try:
+            app = dict(result("describe_app", item["app_arn"]))
+            resources = result("list_app_version_resources", item["app_arn"])
+            app["resources"] = resources["resources"]
+            app["resourcesByComponent"] = resources["resourcesByComponent"]
+            app["recommendations"] = result("get_assessment_recommendations", item["assessment_arn"])
+            app["assessmentEndTime"] = assessment_end_time(result("describe_app_assessment", item["assessment_arn"]))
+            generated_text, complete = generate_report(
+                persona=item["persona"],
+                assessment_arn=item["assessment_arn"],
+                app_arn=item["app_arn"],
+                deadline=deadline,
+                app=app,
+            )
+        except Exception as exc:
+            print(f"Batch item {item['job_id']} failed: {exc}")
+            REPORT_JOBS.update(item["job_id"], status=JobStatus.FAILED, error=str(exc))
+            return True
+
+        if generated_text in (MODEL_INVOCATION_ERROR, OUTPUT_PARSING_ERROR):
+            REPORT_JOBS.update(item["job_id"], status=JobStatus.FAILED, error=generated_text)
+        else:
+            REPORT_JOBS.update(item["job_id"], status=JobStatus.SUCCEEDED, result=generated_text, truncated=not complete)
+        return True
+
+    with ThreadPoolExecutor(max_workers=max(BATCH_CONCURRENCY, 1)) as executor:
+        started = list(executor.map(run_item, pending))
+
+    if all(started):
+        REPORT_JOBS.update(job["jobId"], status=JobStatus.SUCCEEDED)
+    else:
+        REPORT_JOBS.update(job["jobId"], status=JobStatus.PENDING)
+        JOB_QUEUE.submit(job["jobId"])
+
+
+@metrics.timed("WarmUp")
+def warm_up_reports() -> Dict:
+    """
+    Queues the reports missing from the report cache for the latest successful assessments.
+
+    Assessments are selected like the assessment options of the web UI. A new
+    assessment has no cached reports, so its reports are queued on the next run.
+    The most recent assessments go first, and at most WARM_UP_MAX_REPORTS reports
+    are queued per run, as a batch job. Reports queued by an earlier run whose job
+    is still pending or running, or failed, are skipped for WARM_UP_RETRY_SECONDS.
+
+    Returns:
+        Dict: Number of assessments considered, reports missing, reports skipped as
+            already queued and reports queued, and the batch job ID when reports were queued.
+    """
+    client = get_client("resiliencehub")
+    apps = list_active_apps(client)
+    if WARM_UP_APPS:
+        apps = [app for app in apps if app["appArn"] in WARM_UP_APPS or app["name"] in WARM_UP_APPS]
+    assessments = list_latest_app_assessments(client, list_release_versions(client, apps))
+    assessments.sort(key=lambda assessment: assessment["endTime"], reverse=True)
+
+    known_personas = get_prompt_registry().personas()
+    personas = [persona for persona in WARM_UP_PERSONAS if persona in known_personas]
+
+    missing = []
+    skipped = 0
+    for assessment in assessments:
+        for persona in personas:
+            cache_key = ReportCache.report_key(
+                assessment["assessmentArn"], persona, prompt_hash(persona), MODEL_ID, INFERENCE_PARAMS
+            )
+            if REPORT_CACHE.get(cache_key) is not None:
+                continue
+            if warm_up_queued(cache_key):
+                skipped += 1
+                continue
+            missing.append((cache_key, {
+                "persona": persona,
+                "assessment_arn": assessment["assessmentArn"],
+                "app_arn": assessment["appArn"],
+            }))
+
+    queued = missing[:max(WARM_UP_MAX_REPORTS, 0)]
+    summary = {"assessments": len(assessments), "missing": len(missing) + skipped, "skipped": skipped, "queued": len(queued)}
+    if queued:
+        job = submit_batch_job([request for _, request in queued])
+        # The requests are distinct, so the batch items are in the same order.
+        for (cache_key, _), item in zip(queued, job["items"]):
+            REPORT_JOBS.backend.put(warm_up_marker_key(cache_key), {"jobId": item["job_id"]}, ttl_seconds=WARM_UP_RETRY_SECONDS)
+        summary["job_id"] = job["jobId"]
+    metrics.count("WarmUpReportsQueued", len(queued))
+    metrics.set_property("warmUp", summary)
+    return summary
+
+
+def warm_up_marker_key(cache_key: str) -> str:
+    return f"warm-up#{cache_key}"
+
+
+def warm_up_queued(cache_key: str) -> bool:
+    """
+    Tells whether a warm-up run queued a report within WARM_UP_RETRY_SECONDS, and
+    its job has not succeeded: it is still pending or running, or failed.
+
+    Args:
+        cache_key (str): Report cache key of the report.
+
+    Returns:
+        bool: True if the report must not be queued again yet.
+    """
+    marker = REPORT_JOBS.backend.get(warm_up_marker_key(cache_key))
+    if marker is None:
+        return False
+    job = REPORT_JOBS.get(marker["jobId"])
+    return job is not None and job["status"] != JobStatus.SUCCEEDED.value
+
+
+def batch_manifest(job: Dict) -> Dict:
+    """
+    Builds the manifest of a batch job from the status of its child jobs.
+
+    Args:
+        job (Dict): Batch job from the job store.
+
+    Returns:
+        Dict: Per-report results, failures and counts. Reports are fetched through
+            their job_id on GET /generate-report-jobs.
+    """
+    results = []
+    failures = []
+    counts = {status.value: 0 for status in JobStatus}
+    for item in job["items"]:
+        child = REPORT_JOBS.get(item["job_id"]) or {"status": JobStatus.FAILED.value, "error": "Job expired"}
+        counts[child["status"]] += 1
+        entry = {**item, "status": child["status"]}
+        if child["status"] == JobStatus.FAILED.value:
+            entry["error"] = child.get("error")
+            failures.append(entry)
+        else:
+            results.append(entry)
+    return {"results": results, "failures": failures, "counts": counts}
+
+
+def job_to_response(job: Dict) -> Dict:
+    """
+    Builds the API representation of a report job.
+
+    Args:
+        job (Dict): Job from the job store.
+
+    Returns:
+        Dict: Job ID, status and, when available, the generated or partial text.
+    """
+    response = {
+        "job_id": job["jobId"],
+        "status": job["status"],
+    }
+    if job.get("kind") == "batch":
+        response["manifest"] = batch_manifest(job)
+    elif job["status"] == JobStatus.SUCCEEDED.value:
+        response["generated-text"] = job["result"]
+        response["truncated"] = job.get("truncated", False)
+    elif job["status"] == JobStatus.FAILED.value:
+        response["error"] = job.get("error")
+    elif job.get("partialText"):
+        response["partial-text"] = job["partialText"]
+    return response
+
+
+def cors_response(event: Dict, status_code: int, body: str = None, headers: Optional[Dict] = None) -> Dict:
     """
     Constructs a CORS-enabled response.
 
     Args:
         evet (dict): lambda event, used to get the origin from headers
         status_code (int): HTTP status code.
-        body (str, optional): Response body.
+        body (str, optional): Response body, compressed when the client accepts it.
+        headers (Dict, optional): Additional response headers.
 
     Returns:
         Dict: Response payload.
     """
 
-    headers = event.get('headers')
-    origin = headers.get('origin')
+    origin = allowed_origin(event)
 
-    if origin in ALLOWED_ORIGINS:
+    if origin:
         response = {
             "statusCode": status_code,
             "headers": {
-                "Access-Control-Allow-Origin": origin,
-                "Access-Control-Allow-Methods": "POST",
-                "Access-Control-Allow-Headers": "authorization, Content-Type",
+                **cors_headers(origin),
+                **(headers or {}),
             },
         }
         if body:
             response["body"] = body
+        encode_response(event, response)
     else:
         response = {
             "statusCode": 403
@@ -130,6 +850,7 @@ def list_app_versions(client: boto3.Session, apps: List[Dict]) -> List[Dict]:
     return apps
 
 
+@metrics.timed("ListAppVersionResources")
 def list_app_version_resources(app: Dict) -> Dict:
     """
     Lists the resources associated with the latest version of an application.
@@ -143,15 +864,35 @@ def list_app_version_resources(app: Dict) -> Dict:
     app_arn = app["appArn"]
     app_version = "release"
     results = get_results(
-        RH_CLIENT.list_app_version_resources,
+        get_client("resiliencehub").list_app_version_resources,
         "physicalResources",
         appArn=app_arn,
         appVersion=app_version,
     )
     app["resources"] = results
+    app["resourcesByComponent"] = build_resource_index(results)
     return app
 
 
+@metrics.timed("BuildResourceIndex")
+def build_resource_index(resources: List[Dict]) -> Dict[str, List[Dict]]:
+    """
+    Indexes physical resources by the ID of every application component they belong to.
+
+    Args:
+        resources (List[Dict]): Physical resources of an application version.
+
+    Returns:
+        Dict[str, List[Dict]]: Resources keyed by application component ID, in listing order.
+    """
+    index = {}
+    for resource in resources:
+        component_ids = {component["id"] for component in resource.get("appComponents", [])}
+        for component_id in component_ids:
+            index.setdefault(component_id, []).append(resource)
+    return index
+
+
 def list_app_assessments(client: boto3.Session, apps: List[Dict]) -> List[Dict]:
     """
     Lists the latest assessment for each application.
@@ -197,15 +938,94 @@ def list_app_component_recommendations(client: boto3.Session, apps: List[Dict])
     return apps
 
 
-def build_prompts(app: Dict) -> str:
+def build_report_input(app: Dict, assessment_arn: Optional[str] = None, summarize: bool = True) -> Optional[str]:
     """
-    Builds a prompt string based on the application details and recommendations.
+    Builds the assessment data of the persona prompt, summarizing it first when it exceeds one prompt.
+
+    Summaries do not depend on the persona, so they are kept in the report cache
+    backend and shared by the reports of every persona on the same assessment.
 
     Args:
         app (Dict): Application details with recommendations.
+        assessment_arn (str, optional): Assessment ARN, the key of the cached summaries.
+        summarize (bool): Whether to summarize chunks without cached summaries. Summarizing
+            takes several model calls, so the synchronous path hands the report off instead.
 
     Returns:
-        str: Prompt string.
+        str: Assessment data for the persona prompt, or None if a summary could not be generated.
+
+    Raises:
+        ReportHandOff: If summaries are needed, not cached, and summarize is False.
+    """
+    if not MAP_REDUCE_ENABLED:
+        return build_prompts(app)
+
+    chunks = partition_recommendations(
+        app["recommendations"],
+        component_label=lambda app_component: app_component_to_friendly_string(app_component, app),
+        chunk_tokens=MAP_CHUNK_TOKENS,
+    )
+    if len(chunks) <= 1:
+        return build_prompts(app)
+
+    summary_key = None
+    if assessment_arn is not None:
+        summary_key = "summary#" + hashlib.sha256(f"{assessment_arn}:{PIPELINE_HASH}:{MODEL_ID}".encode("utf-8")).hexdigest()
+        cached = REPORT_CACHE.backend.get(summary_key)
+        if cached is not None:
+            return build_prompts(app, recommendations_text=cached["summaries"])
+
+    if not summarize:
+        raise ReportHandOff(f"{len(chunks)} recommendation chunks to summarize")
+    summaries = summarize_chunks(app, chunks)
+    if summaries is None:
+        return None
+    if summary_key is not None:
+        REPORT_CACHE.backend.put(summary_key, {"summaries": summaries}, ttl_seconds=REPORT_CACHE.ttl_seconds)
+    return build_prompts(app, recommendations_text=summaries)
+
+
+@metrics.timed("Map")
+def summarize_chunks(app: Dict, chunks: List[str]) -> Optional[str]:
+    """
+    Summarizes recommendation chunks concurrently, MAP_CONCURRENCY at a time.
+
+    While the joined summaries still exceed the prompt budget, they are chunked and
+    summarized again, so the result fits the final persona prompt.
+
+    Args:
+        app (Dict): Application details, repeated in every chunk for context.
+        chunks (List[str]): Recommendation chunks from partition_recommendations.
+
+    Returns:
+        str: The joined summaries, or None if a model call failed.
+    """
+    header = app_details(app)
+    client = get_client("bedrock-runtime")
+
+    def summarize(chunk: str) -> str:
+        prompt = SUMMARY_TEMPLATE.render(f"{header}RECOMMENDATIONS:\n{chunk}```")
+        return invoke_jamba_message(client, MODEL_ID, prompt, max_tokens=MAP_MAX_TOKENS, temperature=INFERENCE_PARAMS["temperature"])
+
+    while True:
+        metrics.count("MapChunks", len(chunks))
+        with ThreadPoolExecutor(max_workers=max(MAP_CONCURRENCY, 1)) as executor:
+            summaries = list(executor.map(summarize, chunks))
+        if any(summary in (MODEL_INVOCATION_ERROR, OUTPUT_PARSING_ERROR) for summary in summaries):
+            return None
+
+        parts = [f"PART {number} OF {len(summaries)}:\n{summary.strip()}\n" for number, summary in enumerate(summaries, 1)]
+        joined = "".join(parts)
+        next_chunks = partition_texts(parts, MAP_CHUNK_TOKENS)
+        # Stop when the summaries fit, or when summarizing again would not reduce the number of chunks.
+        if estimate_tokens(joined) <= PROMPT_TOKEN_BUDGET or len(next_chunks) >= len(chunks):
+            return joined
+        chunks = next_chunks
+
+
+def app_details(app: Dict) -> str:
+    """
+    Returns the application details section opening the prompt.
     """
     prompt_strings = []
     prompt_strings.append("```application_details\n")
@@ -218,19 +1038,49 @@ def build_prompts(app: Dict) -> str:
     )
     prompt_strings.append(f"RESILIENCY SCORE: int({app['resiliencyScore'] * 100})\n")
     prompt_strings.append("##\n")
+    return "".join(prompt_strings)
+
+
+@metrics.timed("BuildPrompts")
+def build_prompts(app: Dict, token_budget: Optional[int] = None, recommendations_text: Optional[str] = None) -> str:
+    """
+    Builds a prompt string based on the application details and recommendations.
+
+    Recommendations are deduplicated, grouped by suggested changes and truncated to
+    the token budget, breached and unassessed components first.
+
+    Args:
+        app (Dict): Application details with recommendations.
+        token_budget (int, optional): Estimated token budget of the recommendations.
+            Defaults to PROMPT_TOKEN_BUDGET.
+        recommendations_text (str, optional): Recommendations section to use as is,
+            e.g. the summaries of map-reduce generation.
+
+    Returns:
+        str: Prompt string.
+    """
+    if token_budget is None:
+        token_budget = PROMPT_TOKEN_BUDGET
+
+    prompt_strings = [app_details(app)]
     prompt_strings.append("RECOMMENDATIONS:\n")
-    for recommendation in app["recommendations"]:
-        prompt_strings.append(
-            f"{app_component_to_friendly_string(recommendation['appComponentName'], app)}\n"
-        )
-        prompt_strings.append(
-            f"The following recommendation status is {recommendation['recommendationStatus']}\n"
-        )
-        for configRecommendation in recommendation['configRecommendations']:
-            for suggestedChange in configRecommendation['suggestedChanges']:
-                prompt_strings.append(
-                    f"The following change is suggested {suggestedChange}\n"
-                )
+    if recommendations_text is not None:
+        prompt_strings.append(recommendations_text)
+        prompt_strings.append("```")
+        return "".join(prompt_strings)
+
+    compacted = compact_recommendations(
+        app["recommendations"],
+        component_label=lambda app_component: app_component_to_friendly_string(app_component, app),
+        token_budget=token_budget,
+    )
+    prompt_strings.append(compacted.text)
+    metrics.count("RecommendationTokens", compacted.estimated_tokens)
+    metrics.set_property("promptCompaction", {
+        "estimatedTokens": compacted.estimated_tokens,
+        "groupsIncluded": compacted.groups_included,
+        "groupsOmitted": compacted.groups_omitted,
+    })
     prompt_strings.append("```")
     prompt = "".join(prompt_strings)
     return prompt
@@ -248,20 +1098,7 @@ def get_results(boto3_method, response_key: str, **kwargs) -> List:
     Returns:
         List: List of results.
     """
-    next_token = None
-    processing = True
-    results = []
-    while processing:
-        request = {}
-        if next_token is not None:
-            request["nextToken"] = next_token
-        response = boto3_method(**kwargs)
-        results.extend(response[response_key])
-        if "nextToken" in response:
-            next_token = response["nextToken"]
-        else:
-            processing = False
-    return results
+    return list(paginate(boto3_method, response_key, **kwargs))
 
 
 def date_to_string(date: datetime) -> str:
@@ -286,29 +1123,50 @@ def app_component_to_friendly_string(app_component: str, app: Dict) -> str:
         app (Dict): Application details.
 
     Returns:
-        str: Friendly string representation of the application component.
+        str: The component ID followed by its resources, e.g. "web (i-0abc a AWS::EC2::Instance)".
+    """
+    if "resourcesByComponent" not in app:
+        app["resourcesByComponent"] = build_resource_index(app["resources"])
+
+    resources = [
+        f"{resource['physicalResourceId']['identifier']} a {resource['resourceType']}"
+        for resource in app["resourcesByComponent"].get(app_component, [])
+    ]
+    if not resources:
+        return app_component
+    return f"{app_component} ({', '.join(resources)})"
+
+
+
+def get_prompt_registry() -> PromptRegistry:
+    """
+    Returns the persona prompt registry, compiling it on first use.
+
+    Custom personas come from the personas key of the stack configuration, a mapping
+    of persona names to templates, and may replace built-in ones.
+
+    Returns:
+        PromptRegistry: Registry of every persona.
     """
-    friendly_string = []
-    for resource in app["resources"]:
-        if resource["appComponents"][0]["id"] == app_component:
-            friendly_string.append("Recommendations for ")
-            friendly_string.append(resource["physicalResourceId"]["identifier"])
-            friendly_string.append(" a ")
-            friendly_string.append(resource["resourceType"])
-            friendly_string.append(":")
-    return "".join(friendly_string)
+    global _prompt_registry
+    if _prompt_registry is None:
+        _prompt_registry = PromptRegistry({**BUILT_IN_PERSONAS, **get_config().get("personas", {})})
+    return _prompt_registry
 
 
+def prompt_hash(persona: str) -> str:
+    """
+    Returns the hash of everything shaping the prompt of a persona, for the report cache key.
+
+    Raises:
+        UnknownPersonaError: If the persona has no template.
+    """
+    template = get_prompt_registry().get(persona)
+    return hashlib.sha256(f"{PIPELINE_HASH}:{template.digest}".encode("utf-8")).hexdigest()
+
 
 def set_prompt(persona: str, report: str) -> str:
-    prompt = ''
-    if persona == "executive":
-        prompt = prompts.executive(report)
-    elif persona == 'manager':
-        prompt = prompts.manager(report)
-    elif persona == 'engineer':
-        prompt = prompts.engineer(report)
-    return prompt
+    return get_prompt_registry().render(persona, report)
 
 
 def invoke_jamba_message(client, model_id: str, prompt: str, max_tokens: int = 4000, temperature: float = 0, top_k: int = 1) -> str:
@@ -331,18 +1189,136 @@ def invoke_jamba_message(client, model_id: str, prompt: str, max_tokens: int = 4
             modelId=model_id,
             body=body
         )
-
-    except Exception as exc:
-        result = "Model invocation error"
+    except ThrottledError:
+        # Still throttled after backing off, which the caller reports as a retryable failure.
+        raise
+    except CallError as exc:
+        print(f"Model invocation failed: {exc}")
+        return MODEL_INVOCATION_ERROR
     try:
         result = json.loads(response.get('body').read())
         text = result['choices'][0]['message']['content']
+        usage = result.get('usage') or {}
+        metrics.count("ModelInputTokens", usage.get('prompt_tokens', estimate_tokens(prompt)))
+        metrics.count("ModelOutputTokens", usage.get('completion_tokens', estimate_tokens(text)))
         return text
     except Exception as exc:
-        result = "Output parsing error"
+        result = OUTPUT_PARSING_ERROR
     return result
 
 
+def stream_jamba_message(client, model_id: str, prompt: str, max_tokens: int = 4000, temperature: float = 0, top_k: int = 1) -> Iterator[str]:
+    """
+    Invokes the model with a response stream and yields the text as it is generated.
+
+    Args:
+        client: Bedrock runtime client.
+        model_id (str): Bedrock model ID.
+        prompt (str): Prompt sent to the model.
+        max_tokens (int): Maximum number of tokens to generate.
+        temperature (float): Sampling temperature.
+        top_k (int): Unused by Jamba, kept for parity with invoke_jamba_message.
+
+    Yields:
+        str: Text deltas in generation order.
+
+    Raises:
+        CallError: If the stream fails, e.g. ThrottledError on a throttlingException event.
+    """
+    body = json.dumps({
+        "max_tokens": max_tokens,
+        "temperature": temperature,
+        "n": 1,
+        "messages": [
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+    })
+
+    response = client.invoke_model_with_response_stream(
+        modelId=model_id,
+        body=body
+    )
+    generated = []
+    invocation_metrics = None
+    try:
+        for stream_event in response["body"]:
+            chunk = stream_event.get("chunk")
+            if chunk is None:
+                continue
+            payload = json.loads(chunk["bytes"])
+            invocation_metrics = payload.get("amazon-bedrock-invocationMetrics", invocation_metrics)
+            for choice in payload.get("choices", []):
+                text = choice.get("delta", {}).get("content")
+                if text:
+                    generated.append(text)
+                    yield text
+    except Exception as exc:
+        raise stream_error("bedrock-runtime", "invoke_model_with_response_stream", exc) from exc
+    finally:
+        # The last chunk carries the token counts. They are estimated when the stream is cut short.
+        invocation_metrics = invocation_metrics or {}
+        metrics.count("ModelInputTokens", invocation_metrics.get("inputTokenCount", estimate_tokens(prompt)))
+        metrics.count("ModelOutputTokens", invocation_metrics.get("outputTokenCount", estimate_tokens("".join(generated))))
+
+
+def collect_stream(chunks: Iterator[str], deadline: Optional[float] = None, on_chunk: Optional[Callable[[str], None]] = None) -> Tuple[str, bool]:
+    """
+    Joins streamed text, stopping early once the deadline has passed.
+
+    Args:
+        chunks (Iterator[str]): Text deltas from stream_jamba_message.
+        deadline (float, optional): time.monotonic() value after which to stop reading.
+        on_chunk (Callable, optional): Called with every chunk as it arrives.
+
+    Returns:
+        Tuple[str, bool]: Collected text, and whether the stream was read to the end.
+    """
+    collected = []
+    for chunk in chunks:
+        collected.append(chunk)
+        if on_chunk is not None:
+            on_chunk(chunk)
+        if deadline is not None and time.monotonic() >= deadline:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+            return "".join(collected), False
+    return "".join(collected), True
+
+
+@metrics.timed("Model")
+def generate_text(prompt: str, deadline: Optional[float] = None, on_chunk: Optional[Callable[[str], None]] = None) -> Tuple[str, bool]:
+    """
+    Generates the report text, streaming it when streaming is enabled.
+
+    When streaming, the text generated so far is returned once the deadline passes,
+    so the caller can still respond before the API Gateway integration timeout.
+
+    Args:
+        prompt (str): Prompt sent to the model.
+        deadline (float, optional): time.monotonic() value after which to stop generating.
+        on_chunk (Callable, optional): Called with every streamed chunk.
+
+    Returns:
+        Tuple[str, bool]: Generated text, and whether the generation completed.
+    """
+    if not STREAMING_ENABLED:
+        return invoke_jamba_message(get_client("bedrock-runtime"), MODEL_ID, prompt, **INFERENCE_PARAMS), True
+
+    try:
+        chunks = stream_jamba_message(get_client("bedrock-runtime"), MODEL_ID, prompt, **INFERENCE_PARAMS)
+        return collect_stream(chunks, deadline=deadline, on_chunk=on_chunk)
+    except ThrottledError:
+        raise
+    except Exception as exc:
+        print(f"Streaming model invocation failed: {exc}")
+        return MODEL_INVOCATION_ERROR, True
+
+
+@metrics.timed("GetAssessmentRecommendations")
 def get_assessment_recommendations(assessment_arn: str) -> List[Dict]:
     """
     Retrieves the component recommendations for a given assessment.
@@ -353,12 +1329,29 @@ def get_assessment_recommendations(assessment_arn: str) -> List[Dict]:
     Returns:
         List[Dict]: List of component recommendations.
     """
-    recommendations = RH_CLIENT.list_app_component_recommendations(
-        assessmentArn=assessment_arn
+    return get_results(
+        get_client("resiliencehub").list_app_component_recommendations,
+        "componentRecommendations",
+        assessmentArn=assessment_arn,
     )
-    return recommendations["componentRecommendations"]
 
 
+@metrics.timed("DescribeAppAssessment")
+def describe_app_assessment(assessment_arn: str) -> Dict:
+    """
+    Retrieves the details of an assessment.
+
+    Args:
+        assessment_arn (str): Assessment ARN.
+
+    Returns:
+        Dict: Assessment details.
+    """
+    response = get_client("resiliencehub").describe_app_assessment(assessmentArn=assessment_arn)
+    return response["assessment"]
+
+
+@metrics.timed("DescribeApp")
 def describe_app(app_arn: str) -> Dict:
     """
     Retrieves the details of an application.
@@ -369,8 +1362,7 @@ def describe_app(app_arn: str) -> Dict:
     Returns:
         Dict: Application details.
     """
-    response = RH_CLIENT.describe_app(appArn=app_arn)
+    response = get_client("resiliencehub").describe_app(appArn=app_arn)
     app = response["app"]
     return app
 
-
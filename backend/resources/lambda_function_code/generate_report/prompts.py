@@ -1,52 +1,53 @@
-from string import Template
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+This module provides the persona prompt templates and the registry rendering them.
+"""
 
+import hashlib
+from dataclasses import dataclass
+from string import Template
+from typing import Dict, List, Optional
 
 
-def executive(report: str) -> str:
-    prompt_template = Template("""
+EXECUTIVE = """
     # AWS Resilience Hub resiliency assessments
     {{$report}}
-                               
-    # Instructions                           
+
+    # Instructions
     Report for a CIO.
     The CIO is interested in a high-level overview of the organization's overall resilience posture, including:
     - Executive summary of the assessment results
     - Identification of critical risks and vulnerabilities
     - Cost implications and potential return on investment (ROI) for recommended resilience improvements
-    
+
     # Output
     Return the report as HTML <HTML></HTML>
-    """)
-    prompt = prompt_template.substitute(report=report)
-    return trim(prompt)
-
+    """
 
-def manager(report: str) -> str:
-    prompt_template = Template("""
+MANAGER = """
     # AWS Resilience Hub resiliency assessments
     {{$report}}
-                               
-    # Instructions                           
+
+    # Instructions
     Report for a Director of Infrastructure.
-    The Director of Infrastructure is interested in the technical details and operational aspects of the assessment, such as:    
+    The Director of Infrastructure is interested in the technical details and operational aspects of the assessment, such as:
     - Detailed assessment of the infrastructure components (e.g., networks, servers, storage, databases)
     - Identification of single points of failure and potential bottlenecks
     - Evaluation of disaster recovery and business continuity plans
     - Recommendations for improving infrastructure resilience (e.g., redundancy, failover mechanisms, capacity planning)
     - Impact analysis of potential disruptions and outages on infrastructure components
-    
+
     # Output
     Return the report as HTML <HTML></HTML>
-    """)
-    prompt = prompt_template.substitute(report=report)
-    return trim(prompt)
-
+    """
 
-def engineer(report: str) -> str:
-    prompt_template = Template("""
+ENGINEER = """
     # AWS Resilience Hub resiliency assessments
     {{$report}}
-                               
+
     # Instructions
     Report for SRE or Developer.
     SREs and developers are interested in the aspects related to application resilience and operational practices, including:
@@ -54,10 +55,158 @@ def engineer(report: str) -> str:
 
     # Output
     Return the report as HTML <HTML></HTML>
-    """)
-    prompt = prompt_template.substitute(report=report)
-    return trim(prompt)
+    """
+
+# Map step of map-reduce generation, summarizing one chunk of recommendations.
+SUMMARY = """
+    # AWS Resilience Hub resiliency assessment extract
+    {{$report}}
+
+    # Instructions
+    This is one part of the recommendations of a large application. A report will be written from the summaries of all parts.
+    Summarize this part as concisely as possible:
+    - Keep every recommendation status and the names of the components it applies to
+    - Group components sharing the same suggested changes
+    - Never drop a breached component
+
+    # Output
+    Return plain text, without HTML
+    """
+
+BUILT_IN_PERSONAS = {
+    "executive": EXECUTIVE,
+    "manager": MANAGER,
+    "engineer": ENGINEER,
+}
+
+
+class InvalidTemplateError(ValueError):
+    """
+    Raised when a persona template is not a string containing exactly one $report placeholder.
+    """
+
+
+class UnknownPersonaError(KeyError):
+    """
+    Raised when a report is requested for a persona without a template.
+    """
+
+    def __init__(self, persona: str, known: List[str]):
+        self.persona = persona
+        self.known = known
+        super().__init__(persona)
+
+    def __str__(self) -> str:
+        return f"Unknown persona '{self.persona}', expected one of: {', '.join(self.known)}"
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """
+    A persona template split around its report placeholder, so rendering is a single concatenation.
+    """
+
+    persona: str
+    prefix: str
+    suffix: str
+    digest: str
+
+    def render(self, report: str) -> str:
+        return self.prefix + report + self.suffix
 
 
 def trim(text: str) -> str:
     return text.replace('\n    ','\n')
+
+
+def compile_template(persona: str, text: str) -> PromptTemplate:
+    """
+    Validates and precompiles a persona template.
+
+    Templates use string.Template syntax: $report, or ${report}, marks where the
+    assessment goes, and $$ is a literal dollar sign. The four space indentation of
+    the template lines is removed once here, rather than from every prompt.
+
+    Args:
+        persona (str): Persona name.
+        text (str): Template text.
+
+    Returns:
+        PromptTemplate: The compiled template.
+
+    Raises:
+        InvalidTemplateError: If the template is not a string, or has no, several or unknown placeholders.
+    """
+    if not isinstance(text, str):
+        raise InvalidTemplateError(f"Template of persona '{persona}' must be a string, got {type(text).__name__}")
+    text = trim(text)
+    pieces = []
+    position = 0
+    placeholders = 0
+    for match in Template.pattern.finditer(text):
+        pieces.append(text[position:match.start()])
+        position = match.end()
+        name = match.group("named") or match.group("braced")
+        if match.group("escaped") is not None:
+            pieces.append("$")
+        elif name == "report":
+            placeholders += 1
+            pieces.append(None)
+        else:
+            raise InvalidTemplateError(f"Template of persona '{persona}' has an invalid placeholder: {match.group(0)!r}")
+    pieces.append(text[position:])
+
+    if placeholders != 1:
+        raise InvalidTemplateError(f"Template of persona '{persona}' must contain $report exactly once, found {placeholders}")
+
+    split = pieces.index(None)
+    return PromptTemplate(
+        persona=persona,
+        prefix="".join(pieces[:split]),
+        suffix="".join(pieces[split + 1:]),
+        digest=hashlib.sha256(text.encode("utf-8")).hexdigest(),
+    )
+
+
+class PromptRegistry:
+    """
+    Compiled persona templates, keyed by persona name.
+    """
+
+    def __init__(self, templates: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            templates (Dict[str, str], optional): Template texts keyed by persona.
+        """
+        self._templates = {}
+        for persona, text in (templates or {}).items():
+            self.register(persona, text)
+
+    def register(self, persona: str, text: str) -> PromptTemplate:
+        """
+        Compiles a template and adds it, replacing any template of the same persona.
+        """
+        template = compile_template(persona, text)
+        self._templates[persona] = template
+        return template
+
+    def get(self, persona: str) -> PromptTemplate:
+        """
+        Returns the template of a persona.
+
+        Raises:
+            UnknownPersonaError: If the persona has no template.
+        """
+        template = self._templates.get(persona)
+        if template is None:
+            raise UnknownPersonaError(persona, self.personas())
+        return template
+
+    def personas(self) -> List[str]:
+        return sorted(self._templates)
+
+    def render(self, persona: str, report: str) -> str:
+        return self.get(persona).render(report)
+
+
+SUMMARY_TEMPLATE = compile_template("summary", SUMMARY)
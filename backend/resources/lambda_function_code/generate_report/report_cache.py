@@ -0,0 +1,130 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+This module memoizes generated reports so repeated requests skip Resilience Hub and Bedrock.
+"""
+
+import hashlib
+import json
+import threading
+from typing import Dict, Optional
+
+
+class ReportCache:
+    """
+    Content-addressed cache of generated reports.
+
+    Reports are keyed on everything that influences the model output, and every
+    application keeps an index of its cached reports so they can be dropped once
+    a newer assessment is reported. The index is a tagged set of the backend,
+    tagged with the assessment ARN and ranked by the assessment end time, so
+    concurrent writers neither lose keys nor let an older assessment evict the
+    reports of a newer one.
+    """
+
+    def __init__(self, backend, ttl_seconds: Optional[int] = None):
+        """
+        Args:
+            backend: Cache backend exposing get, put, delete, add_member and members.
+            ttl_seconds (int, optional): Seconds a report stays cached.
+        """
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def report_key(assessment_arn: str, persona: str, prompt_hash: str, model_id: str, inference_params: Dict) -> str:
+        """
+        Builds the content address of a report.
+
+        Args:
+            assessment_arn (str): Assessment ARN.
+            persona (str): Report persona.
+            prompt_hash (str): Hash of the prompt template.
+            model_id (str): Bedrock model ID.
+            inference_params (Dict): Inference parameters sent to the model.
+
+        Returns:
+            str: Cache key for the report.
+        """
+        material = json.dumps(
+            [assessment_arn, persona, prompt_hash, model_id, inference_params],
+            sort_keys=True,
+        )
+        return "report#" + hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Returns the cached report for key, or None on a miss.
+        """
+        entry = self.backend.get(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return entry["report"]
+
+    def put(self, key: str, app_arn: str, assessment_arn: str, report: str, assessment_end_time: Optional[float] = None) -> None:
+        """
+        Stores a report and invalidates the application's reports for older assessments.
+
+        A report of an assessment older than the one the application's reports are
+        indexed for is not kept.
+
+        Args:
+            key (str): Cache key built by report_key.
+            app_arn (str): Application ARN.
+            assessment_arn (str): Assessment ARN the report was generated from.
+            report (str): Generated report.
+            assessment_end_time (float, optional): End time of the assessment, in seconds
+                since the epoch. Reports without one never replace another assessment's.
+        """
+        self.backend.put(key, {"report": report}, ttl_seconds=self.ttl_seconds)
+        added, replaced_keys = self.backend.add_member(
+            self._index_key(app_arn),
+            key,
+            tag=assessment_arn,
+            rank=assessment_end_time if assessment_end_time is not None else 0,
+            ttl_seconds=self.ttl_seconds,
+        )
+        if replaced_keys:
+            self._delete_keys(replaced_keys)
+        if not added:
+            self._delete_keys([key])
+
+    def invalidate_app(self, app_arn: str) -> None:
+        """
+        Drops every cached report of an application.
+
+        Args:
+            app_arn (str): Application ARN.
+        """
+        self._delete_keys(self.backend.members(self._index_key(app_arn)))
+        self.backend.delete(self._index_key(app_arn))
+
+    def stats(self) -> Dict:
+        """
+        Returns the hit, miss and invalidation counters of this container.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+
+    def _delete_keys(self, keys) -> None:
+        for key in keys:
+            self.backend.delete(key)
+        with self._lock:
+            self.invalidations += len(keys)
+
+    @staticmethod
+    def _index_key(app_arn: str) -> str:
+        return f"report-app#{app_arn}"
@@ -0,0 +1,167 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+This module provides the job store and queue behind asynchronous report generation.
+"""
+
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from typing import Callable, Dict, Optional
+
+from config import get_client
+
+
+class JobStatus(str, Enum):
+    """
+    Lifecycle states of a report job.
+    """
+
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+
+
+class JobStore:
+    """
+    Persists report jobs in a cache backend.
+
+    The in-memory backend suits local testing, the DynamoDB backend shares jobs
+    between the invocation that submits a job and the one that runs it.
+    """
+
+    def __init__(self, backend, ttl_seconds: Optional[int] = None):
+        """
+        Args:
+            backend: Cache backend exposing get, put and delete.
+            ttl_seconds (int, optional): Seconds a job is kept after its last update.
+        """
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+    def create(self, request: Dict, status: JobStatus = JobStatus.PENDING, **fields) -> Dict:
+        """
+        Creates a job for a report request.
+
+        Args:
+            request (Dict): Report request with persona, app_arn and assessment_arn.
+            status (JobStatus): Initial status of the job.
+            **fields: Additional fields stored with the job.
+
+        Returns:
+            Dict: The stored job.
+        """
+        now = time.time()
+        job = {
+            "jobId": str(uuid.uuid4()),
+            "status": status.value,
+            "request": request,
+            "createdAt": now,
+            "updatedAt": now,
+            **fields,
+        }
+        self.backend.put(self._key(job["jobId"]), job, ttl_seconds=self.ttl_seconds)
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """
+        Returns the job with the given ID, or None if it does not exist.
+        """
+        return self.backend.get(self._key(job_id))
+
+    def update(self, job_id: str, **fields) -> Dict:
+        """
+        Updates fields of an existing job.
+
+        Args:
+            job_id (str): Job ID.
+            **fields: Fields to set. JobStatus values are stored as strings.
+
+        Returns:
+            Dict: The updated job.
+        """
+        with self._lock:
+            stored_job = self.backend.get(self._key(job_id))
+            if stored_job is None:
+                raise KeyError(job_id)
+            # Copy, so jobs handed out earlier are not changed in place.
+            job = dict(stored_job)
+            for name, value in fields.items():
+                job[name] = value.value if isinstance(value, JobStatus) else value
+            job["updatedAt"] = time.time()
+            self.backend.put(self._key(job_id), job, ttl_seconds=self.ttl_seconds)
+        return job
+
+    @staticmethod
+    def _key(job_id: str) -> str:
+        return f"job#{job_id}"
+
+
+class InMemoryJobQueue:
+    """
+    Runs submitted jobs on a thread pool of the current process.
+    """
+
+    def __init__(self, worker: Callable[[str], None], max_workers: int = 2):
+        """
+        Args:
+            worker: Function running a job given its ID.
+            max_workers (int): Number of jobs run concurrently.
+        """
+        self.worker = worker
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def submit(self, job_id: str) -> None:
+        self.executor.submit(self.worker, job_id)
+
+
+class LambdaJobQueue:
+    """
+    Runs submitted jobs by asynchronously invoking a Lambda function.
+
+    The function receives an event of the form {"reportJob": {"jobId": ...}}.
+    """
+
+    def __init__(self, function_name: str, client=None):
+        """
+        Args:
+            function_name (str): Name of the Lambda function running the jobs.
+            client: Lambda client. The shared one is used when omitted.
+        """
+        self.function_name = function_name
+        self.client = client
+
+    def submit(self, job_id: str) -> None:
+        client = self.client or get_client("lambda")
+        client.invoke(
+            FunctionName=self.function_name,
+            InvocationType="Event",
+            Payload=json.dumps({"reportJob": {"jobId": job_id}}),
+        )
+
+
+class ProgressWriter:
+    """
+    Saves the partially generated text of a job, at most once per interval.
+    """
+
+    def __init__(self, store: JobStore, job_id: str, interval_seconds: float = 1.0):
+        self.store = store
+        self.job_id = job_id
+        self.interval_seconds = interval_seconds
+        self.chunks = []
+        self._last_write = time.monotonic()
+
+    def __call__(self, chunk: str) -> None:
+        self.chunks.append(chunk)
+        now = time.monotonic()
+        if now - self._last_write >= self.interval_seconds:
+            self._last_write = now
+            self.store.update(self.job_id, partialText="".join(self.chunks))
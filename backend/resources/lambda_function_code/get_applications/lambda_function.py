@@ -1,23 +1,38 @@
-import json
+from __future__ import annotations
+
 from dataclasses import dataclass
 from enum import Enum
 from typing import Dict, List, Optional
 
-import boto3
 import os
-import json
+import uuid
+from cache import StaleWhileRevalidateCache, default_backend
+import metrics
+from config import get_client
+from cors import allowed_origin, cors_headers
+from discovery import list_active_apps, list_apps_with_latest_assessment, list_release_versions
+from encoding import encode_response, header, to_json
+from options_index import InvalidQueryError, OptionsIndex, parse_query
+
+OPTIONS_CACHE_KEY = 'assessment-options'
+OPTIONS_CACHE = StaleWhileRevalidateCache(
+    backend=default_backend(),
+    ttl_seconds=int(os.environ.get('options_cache_ttl', '300')),
+    stale_seconds=int(os.environ.get('options_cache_stale_ttl', '3600')),
+    retain_seconds=int(os.environ.get('options_cache_retain', '604800')),
+)
+OPTIONS_PAGE_SIZE = int(os.environ.get('options_page_size', '50'))
+OPTIONS_MAX_PAGE_SIZE = int(os.environ.get('options_max_page_size', '1000'))
+OPTIONS_RESPONSE_MAX_AGE = int(os.environ.get('options_response_max_age', '60'))
 
-RESILIENCEHUB_CLIENT = boto3.client("resiliencehub")
+# Request header forcing a refresh of the options. It is part of the API Gateway cache
+# key, so a new value also misses the gateway cache.
+CACHE_BYPASS_HEADER = 'x-cache-bypass'
 
-PARAMETERS = os.environ['parameters']
+# Index of the options snapshot it was built from, rebuilt when the snapshot is refreshed.
+_options_index = None
+_options_index_version = None
 
-ssm = boto3.client('ssm')
-response = ssm.get_parameter(
-    Name=PARAMETERS
-)
-values = json.loads(response['Parameter']['Value'])
-
-ALLOWED_ORIGINS = values['allowed_origins']
 
 class HttpMethods(str, Enum):
     """
@@ -57,6 +72,7 @@ class Response:
         }
 
 
+@metrics.metric_scope("GetApplications")
 def lambda_handler(event, context) -> Response:
     """
     Lambda function handler.
@@ -66,23 +82,19 @@ def lambda_handler(event, context) -> Response:
         context: Context object received from AWS Lambda.
 
     Returns:
-        Response object containing the response for the API Gateway.
+        Response object containing the response for the API Gateway, compressed
+        when the client accepts it.
     """
     http_method = HttpMethods(event["httpMethod"])
     path = Paths(event["path"])
-    headers = event.get('headers')
-    origin = headers.get('origin')
+    origin = allowed_origin(event)
         
 
     if http_method == HttpMethods.OPTIONS:
-        if origin in ALLOWED_ORIGINS:
+        if origin:
             response = Response(
                 status_code=200,
-                headers={
-                    "Access-Control-Allow-Origin": origin,
-                    "Access-Control-Allow-Methods": "GET, POST",
-                    "Access-Control-Allow-Headers": "authorization, Content-Type",
-                },
+                headers=cors_headers(origin),
             )
         else:
             response = Response(
@@ -91,20 +103,43 @@ def lambda_handler(event, context) -> Response:
             )
         
     elif http_method == HttpMethods.GET and path == Paths.GET_APPLICATIONS_OPTIONS:
-        assessment_options = get_assessment_options()
-        response_body = json.dumps(assessment_options)
-        if origin in ALLOWED_ORIGINS:
-            response = Response(
-                status_code=200,
-                headers={
-                    "Access-Control-Allow-Origin": origin,
-                    "Content-Type": "application/json",
-                },
-                body=response_body,
-            )
+        if origin:
+            response_headers = {
+                **cors_headers(origin),
+                "Content-Type": "application/json",
+                # Options are only served to authorized callers, so only their browser may reuse them.
+                "Cache-Control": f"private, max-age={OPTIONS_RESPONSE_MAX_AGE}",
+                "Vary": f"Origin, Authorization, {CACHE_BYPASS_HEADER}",
+            }
+            try:
+                query = parse_query(
+                    event.get("queryStringParameters"),
+                    default_limit=OPTIONS_PAGE_SIZE,
+                    max_limit=OPTIONS_MAX_PAGE_SIZE,
+                )
+            except InvalidQueryError as exc:
+                response = Response(
+                    status_code=400,
+                    headers={**response_headers, "Cache-Control": "no-store"},
+                    body=to_json({"error": str(exc)}),
+                )
+            else:
+                force_refresh = header(event.get("headers"), CACHE_BYPASS_HEADER) is not None
+                if force_refresh:
+                    metrics.count("OptionsCacheBypass")
+                options_index = get_options_index(force_refresh=force_refresh)
+                with metrics.stage("OptionsQuery"):
+                    page = options_index.query(query)
+                metrics.count("OptionsReturned", len(page["options"]))
+                response = Response(
+                    status_code=200,
+                    headers=response_headers,
+                    body=to_json(page),
+                )
         else:
             response = Response(
-                status_code=403
+                status_code=403,
+                headers={}
             )
         
     else:
@@ -112,147 +147,145 @@ def lambda_handler(event, context) -> Response:
         status_code=403,
         body="Invalid Request",
     )
-    return response.to_dict()
+    return encode_response(event, response.to_dict())
 
 
-def get_assessment_options() -> List[Dict]:
+def get_options_snapshot(force_refresh: bool = False) -> Dict:
     """
-    Build and return the list of assessments for the Web UI.
+    Return the assessment options snapshot, served from the options cache.
+
+    Args:
+        force_refresh: Refresh the snapshot whatever its age.
 
     Returns:
-        List of dictionaries containing the application name, application ARN, and assessment ARN.
+        Dictionary with the options list, the per-application entries it was built from and its version.
     """
-    active_apps = list_active_apps(client=RESILIENCEHUB_CLIENT)
+    with metrics.stage("OptionsCache"):
+        snapshot = OPTIONS_CACHE.get_or_refresh(OPTIONS_CACHE_KEY, refresh_assessment_options, force=force_refresh)
+    metrics.count("AssessmentOptions", len(snapshot["options"]))
+    return snapshot
 
-    release_apps = list_release_versions(client=RESILIENCEHUB_CLIENT, apps=active_apps)
 
-    app_assessments = list_latest_app_assessments(
-        client=RESILIENCEHUB_CLIENT, apps=release_apps
-    )
+def get_assessment_options() -> List[Dict]:
+    """
+    Return the list of assessments for the Web UI, served from the options cache.
 
-    options = build_app_assessment_list(
-        client=RESILIENCEHUB_CLIENT,
-        assessments=app_assessments,
-        apps=release_apps,
-    )
-    return options
+    Returns:
+        List of dictionaries containing the application name, application ARN, and assessment ARN.
+    """
+    return get_options_snapshot()["options"]
 
 
-def list_active_apps(client: boto3.Session) -> List[Dict]:
+def get_options_index(force_refresh: bool = False) -> OptionsIndex:
     """
-    List your Resilience Hub applications and filter out the inactive ones.
+    Return the index of the current options snapshot, building it once per snapshot version.
 
     Args:
-        client: Boto3 client for Resilience Hub.
+        force_refresh: Refresh the snapshot whatever its age.
 
     Returns:
-        List of dictionaries representing active Resilience Hub applications.
+        OptionsIndex answering the filtered and paginated options queries.
     """
-    app_summaries = []
-    response = client.list_apps()
-    app_summaries += response["appSummaries"]
-
-    while "nextToken" in response:
-        next_token = response["nextToken"]
-        response = client.list_apps(nextToken=next_token)
-        app_summaries += response["appSummaries"]
-
-    active_apps = [app for app in app_summaries if app["status"] == "Active"]
-    return active_apps
-
-
-def list_release_versions(client: boto3.Session, apps: List[Dict]) -> List[Dict]:
+    global _options_index, _options_index_version
+    snapshot = get_options_snapshot(force_refresh=force_refresh)
+    version = snapshot.get("version")
+    if _options_index is None or version is None or version != _options_index_version:
+        with metrics.stage("OptionsIndex"):
+            _options_index = OptionsIndex(snapshot["options"])
+        _options_index_version = version
+    return _options_index
+
+
+@metrics.timed("RefreshAssessmentOptions")
+def refresh_assessment_options(previous: Optional[Dict] = None) -> Dict:
     """
-    List the release versions for the given Resilience Hub applications.
+    Build the assessment options snapshot, reusing unchanged applications from the previous one.
+
+    Only applications that are new, or whose status, compliance status, resiliency score or
+    last compliance evaluation time changed since the previous snapshot, are queried for release versions
+    and assessments.
 
     Args:
-        client: Boto3 client for Resilience Hub.
-        apps: List of dictionaries representing Resilience Hub applications.
+        previous: Previously cached snapshot, or None to query every application.
 
     Returns:
-        List of dictionaries representing Resilience Hub applications with a release version.
+        Dictionary with the options list, the per-application entries it was built from and a
+        version identifying the snapshot.
     """
-    release_apps = []
-    for app in apps:
-        app_versions = []
-        app_arn = app["appArn"]
-        response = client.list_app_versions(appArn=app_arn)
-        app_versions += response["appVersions"]
-
-        while "nextToken" in response:
-            next_token = response["nextToken"]
-            response = client.list_app_versions(appArn=app_arn, nextToken=next_token)
-            app_versions += response["appVersions"]
-
-        if any(version["appVersion"] == "release" for version in app_versions):
-            release_apps.append(app)
+    previous_apps = previous["apps"] if previous else {}
+    client = get_client("resiliencehub")
+
+    active_apps = list_active_apps(client=client)
+    fingerprints = {app["appArn"]: app_fingerprint(app) for app in active_apps}
+    changed_apps = [
+        app
+        for app in active_apps
+        if previous_apps.get(app["appArn"], {}).get("fingerprint") != fingerprints[app["appArn"]]
+    ]
+
+    metrics.count("ActiveApps", len(active_apps))
+    metrics.count("ChangedApps", len(changed_apps))
+    release_apps = list_release_versions(client=client, apps=changed_apps)
+
+    # Each assessment stays paired with its application, so no join is needed.
+    app_assessments = list_apps_with_latest_assessment(
+        client=client, apps=release_apps
+    )
+    options_by_arn = {
+        app["appArn"]: app_assessment_option(app, assessment)
+        for app, assessment in app_assessments
+    }
+
+    apps = {}
+    for app in changed_apps:
+        apps[app["appArn"]] = {
+            "fingerprint": fingerprints[app["appArn"]],
+            "option": options_by_arn.get(app["appArn"]),
+        }
+    for app in active_apps:
+        if app["appArn"] not in apps:
+            apps[app["appArn"]] = previous_apps[app["appArn"]]
 
-    return release_apps
+    options = [
+        apps[app["appArn"]]["option"]
+        for app in active_apps
+        if apps[app["appArn"]]["option"] is not None
+    ]
+    return {"apps": apps, "options": options, "version": uuid.uuid4().hex}
 
 
-def list_latest_app_assessments(client: boto3.Session, apps: List[Dict]) -> List[Dict]:
+def app_fingerprint(app: Dict) -> str:
     """
-    List the latest successful assessment for the given Resilience Hub applications.
+    Summarize the application fields that change when a new assessment completes.
 
     Args:
-        client: Boto3 client for Resilience Hub.
-        apps: List of dictionaries representing Resilience Hub applications.
+        app: Dictionary representing a Resilience Hub application summary.
 
     Returns:
-        List of dictionaries representing the latest successful assessment for each application.
+        String that differs whenever the application needs to be queried again.
     """
-    latest_app_assessments = []
-    for app in apps:
-        assessment_summaries = []
-        app_arn = app["appArn"]
-        response = client.list_app_assessments(appArn=app_arn)
-        assessment_summaries += response["assessmentSummaries"]
-
-        while "nextToken" in response:
-            next_token = response["nextToken"]
-            response = client.list_app_assessments(appArn=app_arn, nextToken=next_token)
-            assessment_summaries += response["assessmentSummaries"]
-
-        successful_assessment_summaries = [
-            assesment
-            for assesment in assessment_summaries
-            if assesment["assessmentStatus"] == "Success"
-        ]
-        sorted_assessment_summaries = sorted(
-            successful_assessment_summaries, key=lambda x: x["endTime"], reverse=True
-        )
-
-        if sorted_assessment_summaries:
-            latest_app_assessments.append(sorted_assessment_summaries[0])
-
-    return latest_app_assessments
-
-
-def build_app_assessment_list(
-    client: boto3.Session, assessments: List[Dict], apps: List[Dict]
-) -> List[Dict]:
+    return "|".join(
+        str(app.get(field))
+        for field in ("status", "complianceStatus", "resiliencyScore", "lastAppComplianceEvaluationTime")
+    )
+
+
+def app_assessment_option(app: Dict, assessment: Dict) -> Dict:
     """
-    Build a list of application name, application ARN, and assessment ARN pairs.
+    Build the option of the Web UI for an application and its assessment.
 
     Args:
-        client: Boto3 client for Resilience Hub.
-        assessments: List of dictionaries representing assessments.
-        apps: List of dictionaries representing applications.
+        app: Dictionary representing a Resilience Hub application.
+        assessment: Dictionary representing an assessment of the application.
 
     Returns:
-        List of dictionaries containing the application name, application ARN, and assessment ARN.
+        Dictionary containing the application name, application ARN, assessment ARN,
+        compliance status and resiliency score.
     """
-    app_assessment_list = []
-    for assessment in assessments:
-        app_arn = assessment["appArn"]
-        for app in apps:
-            if app_arn == app["appArn"]:
-                app_assessment_list.append(
-                    {
-                        "app_name": app["name"],
-                        "app_arn": app["appArn"],
-                        "assessment_arn": assessment["assessmentArn"],
-                    }
-                )
-
-    return app_assessment_list
+    return {
+        "app_name": app["name"],
+        "app_arn": app["appArn"],
+        "assessment_arn": assessment["assessmentArn"],
+        "compliance_status": app.get("complianceStatus"),
+        "resiliency_score": app.get("resiliencyScore"),
+    }
@@ -0,0 +1,188 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+In-memory index of the assessment options, answering filtered and paginated queries.
+
+Options are sorted by application name, and a page cursor is the sort key of the
+last option returned, so pages stay consistent when the options are refreshed
+between two requests. Name prefixes, compliance statuses and score ranges are
+looked up in sorted lists, and only the candidates of the most selective filter
+are checked against the others.
+"""
+
+import base64
+import binascii
+import json
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+class InvalidQueryError(ValueError):
+    """
+    Raised when the query parameters of an options request are invalid.
+    """
+
+
+@dataclass
+class OptionsQuery:
+    """
+    Filters and page of an options request. Every filter is optional.
+    """
+
+    search: Optional[str] = None
+    prefix: Optional[str] = None
+    compliance_statuses: Optional[List[str]] = None
+    min_score: Optional[float] = None
+    max_score: Optional[float] = None
+    cursor: Optional[Tuple[str, str]] = None
+    limit: int = 50
+
+
+def sort_key(option: Dict) -> Tuple[str, str]:
+    return (option["app_name"].lower(), option["app_arn"])
+
+
+def encode_cursor(key: Tuple[str, str]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        name, app_arn = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return (str(name), str(app_arn))
+    except (ValueError, TypeError, binascii.Error) as exc:
+        raise InvalidQueryError("cursor is invalid") from exc
+
+
+def parse_query(params: Optional[Dict], default_limit: int, max_limit: int) -> OptionsQuery:
+    """
+    Builds a query from API Gateway query string parameters.
+
+    Args:
+        params (Dict, optional): q (name substring), prefix (name prefix), compliance_status
+            (comma-separated), min_score, max_score, cursor and limit.
+        default_limit (int): Page size when limit is not given.
+        max_limit (int): Largest page size accepted.
+
+    Returns:
+        OptionsQuery: The parsed query.
+
+    Raises:
+        InvalidQueryError: If a parameter cannot be parsed or is out of range.
+    """
+    params = params or {}
+
+    def number(name: str, cast):
+        value = params.get(name)
+        if value in (None, ""):
+            return None
+        try:
+            return cast(value)
+        except ValueError as exc:
+            raise InvalidQueryError(f"{name} must be a number") from exc
+
+    limit = number("limit", int)
+    if limit is None:
+        limit = default_limit
+    if not 0 < limit <= max_limit:
+        raise InvalidQueryError(f"limit must be between 1 and {max_limit}")
+
+    statuses = [status.strip() for status in (params.get("compliance_status") or "").split(",") if status.strip()]
+    cursor = params.get("cursor")
+    return OptionsQuery(
+        search=(params.get("q") or "").strip().lower() or None,
+        prefix=(params.get("prefix") or "").lower() or None,
+        compliance_statuses=statuses or None,
+        min_score=number("min_score", float),
+        max_score=number("max_score", float),
+        cursor=decode_cursor(cursor) if cursor else None,
+        limit=limit,
+    )
+
+
+class OptionsIndex:
+    """
+    Assessment options sorted by name, with lookups by name prefix, compliance status and score.
+    """
+
+    def __init__(self, options: List[Dict]):
+        """
+        Args:
+            options (List[Dict]): Options with app_name, app_arn, compliance_status and resiliency_score.
+        """
+        self.options = sorted(options, key=sort_key)
+        self.keys = [sort_key(option) for option in self.options]
+        self.names = [key[0] for key in self.keys]
+
+        self.positions_by_status = {}
+        scored = []
+        for position, option in enumerate(self.options):
+            status = (option.get("compliance_status") or "").lower()
+            self.positions_by_status.setdefault(status, []).append(position)
+            if option.get("resiliency_score") is not None:
+                scored.append((option["resiliency_score"], position))
+        scored.sort()
+        self.scores = [score for score, _ in scored]
+        self.score_positions = [position for _, position in scored]
+
+    def __len__(self) -> int:
+        return len(self.options)
+
+    def _candidates(self, query: OptionsQuery) -> Sequence[int]:
+        """
+        Returns the positions matching the indexed filters, smallest set first.
+        """
+        candidate_sets = []
+        if query.prefix:
+            low = bisect_left(self.names, query.prefix)
+            high = bisect_left(self.names, query.prefix + "\uffff")
+            candidate_sets.append(range(low, max(low, high)))
+        if query.compliance_statuses:
+            positions = []
+            for status in query.compliance_statuses:
+                positions.extend(self.positions_by_status.get(status.lower(), []))
+            candidate_sets.append(sorted(positions))
+        if query.min_score is not None or query.max_score is not None:
+            low = 0 if query.min_score is None else bisect_left(self.scores, query.min_score)
+            high = len(self.scores) if query.max_score is None else bisect_right(self.scores, query.max_score)
+            candidate_sets.append(sorted(self.score_positions[low:high]))
+        if not candidate_sets:
+            return range(len(self.options))
+
+        candidate_sets.sort(key=len)
+        others = [set(candidates) for candidates in candidate_sets[1:]]
+        return [position for position in candidate_sets[0] if all(position in other for other in others)]
+
+    def matches(self, query: OptionsQuery) -> Sequence[int]:
+        """
+        Returns the sorted positions of the options matching every filter of a query.
+        """
+        candidates = self._candidates(query)
+        if query.search:
+            return [position for position in candidates if query.search in self.names[position]]
+        return candidates
+
+    def query(self, query: OptionsQuery) -> Dict:
+        """
+        Returns one page of the options matching a query.
+
+        Args:
+            query (OptionsQuery): Filters and page.
+
+        Returns:
+            Dict: The options of the page, the cursor of the next page, or None on the
+                last page, and the total number of options matching the filters.
+        """
+        matches = self.matches(query)
+        # First match after the option the cursor points to.
+        start = bisect_left(matches, bisect_right(self.keys, query.cursor)) if query.cursor else 0
+        page = matches[start:start + query.limit]
+        next_cursor = encode_cursor(self.keys[page[-1]]) if start + query.limit < len(matches) else None
+        return {
+            "options": [self.options[position] for position in page],
+            "next_cursor": next_cursor,
+            "total": len(matches),
+        }
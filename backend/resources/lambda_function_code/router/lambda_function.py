@@ -0,0 +1,104 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+"""
+Single backend function routing API and internal events to the get_applications
+and generate_report handlers, deployed when DEPLOYMENT_MODE is 'unified'.
+
+Both handlers then share one pool of warm containers, one configuration load and
+one set of Boto3 clients. The function package holds the router next to the two
+function directories. A handler module is imported on the first request routed to
+it, so a container serving only the applications list never imports the report code.
+"""
+
+import importlib.util
+import os
+import sys
+import threading
+from types import ModuleType
+from typing import Dict
+
+from cors import allowed_origin, cors_headers
+
+
+FUNCTIONS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (HTTP method, resource path) -> function directory.
+ROUTES = {
+    ("GET", "/get-applications-options"): "get_applications",
+    ("POST", "/generate-report"): "generate_report",
+    ("POST", "/generate-report-jobs"): "generate_report",
+    ("GET", "/generate-report-jobs"): "generate_report",
+    ("POST", "/generate-report-batch"): "generate_report",
+}
+
+# Top-level key of an internal event -> function directory.
+EVENT_ROUTES = {
+    "reportJob": "generate_report",
+    "reportWarmUp": "generate_report",
+}
+
+_functions = {}
+_lock = threading.Lock()
+
+
+def load_function(name: str) -> ModuleType:
+    """
+    Returns the lambda_function module of a function directory, importing it on first use.
+
+    Args:
+        name (str): Function directory name, e.g. "generate_report".
+
+    Returns:
+        ModuleType: The imported module.
+    """
+    module = _functions.get(name)
+    if module is None:
+        with _lock:
+            module = _functions.get(name)
+            if module is None:
+                function_dir = os.path.join(FUNCTIONS_DIR, name)
+                # The handlers import their sibling modules, e.g. prompts, by top-level name.
+                if function_dir not in sys.path:
+                    sys.path.append(function_dir)
+                spec = importlib.util.spec_from_file_location(
+                    f"{name}_lambda_function", os.path.join(function_dir, "lambda_function.py")
+                )
+                module = importlib.util.module_from_spec(spec)
+                sys.modules[spec.name] = module
+                spec.loader.exec_module(module)
+                _functions[name] = module
+    return module
+
+
+def lambda_handler(event: Dict, context) -> Dict:
+    """
+    Lambda function handler.
+
+    Internal events are dispatched on their top-level key. API requests are checked
+    for an allowed origin and answered here when they are preflights or unknown
+    routes, then dispatched on their method and path.
+
+    Args:
+        event (Dict): Lambda event payload.
+        context: Lambda context object.
+
+    Returns:
+        Dict: Response payload of the handler the event was routed to.
+    """
+    for key, name in EVENT_ROUTES.items():
+        if key in event:
+            return load_function(name).lambda_handler(event, context)
+
+    origin = allowed_origin(event)
+    if not origin:
+        return {"statusCode": 403}
+
+    if event.get("httpMethod") == "OPTIONS":
+        return {"statusCode": 200, "headers": cors_headers(origin)}
+
+    name = ROUTES.get((event.get("httpMethod"), event.get("path")))
+    if name is None:
+        return {"statusCode": 404, "headers": cors_headers(origin)}
+    return load_function(name).lambda_handler(event, context)
@@ -3,15 +3,121 @@
 
 
 
+import json
+from typing import Dict, List, Optional
 from aws_cdk import Stack
 from aws_cdk import Duration
+from aws_cdk import Size
 from aws_cdk import aws_iam
 from aws_cdk import aws_lambda
 from constructs import Construct
+
 import constants
 
 
 
+# Settings a performance profile leaves out.
+DEFAULT_PERFORMANCE = {
+    'memory_size': 512,
+    'timeout_seconds': 60,
+    'ephemeral_storage_mib': 512,
+    'reserved_concurrency': None,
+    'provisioned_concurrency': 0,
+}
+
+
+def performance_profile(scope: Construct, function_name: str) -> Dict:
+    """
+    Returns the performance settings of a function in the selected profile.
+
+    The profile is named by the performance_profile context value, or by
+    constants.PERFORMANCE_PROFILE.
+    """
+    profile_name = scope.node.try_get_context('performance_profile') or constants.PERFORMANCE_PROFILE
+    if profile_name not in constants.PERFORMANCE_PROFILES:
+        raise ValueError(
+            f"Unknown performance profile '{profile_name}', expected one of: {', '.join(constants.PERFORMANCE_PROFILES)}"
+        )
+    return {**DEFAULT_PERFORMANCE, **constants.PERFORMANCE_PROFILES[profile_name].get(function_name, {})}
+
+
+def performance_options(profile: Dict) -> Dict:
+    """
+    Returns the aws_lambda.Function arguments of a performance profile.
+    """
+    return {
+        'memory_size': profile['memory_size'],
+        'timeout': Duration.seconds(profile['timeout_seconds']),
+        'ephemeral_storage_size': Size.mebibytes(profile['ephemeral_storage_mib']),
+        'reserved_concurrent_executions': profile['reserved_concurrency'],
+    }
+
+
+def invocation_target(function: aws_lambda.Function, profile: Dict) -> aws_lambda.IFunction:
+    """
+    Returns what API Gateway invokes: a live alias holding the provisioned concurrency
+    of the profile, or the function itself when there is none.
+    """
+    if profile['provisioned_concurrency']:
+        return function.add_alias(
+            'live',
+            provisioned_concurrent_executions=profile['provisioned_concurrency']
+        )
+    return function
+
+
+def get_applications_environment() -> Dict[str, str]:
+    """
+    Environment variables of the get_applications handler.
+    """
+    return {
+        'max_concurrency': str(constants.GET_APPLICATIONS_MAX_CONCURRENCY),
+        'options_cache_ttl': str(constants.OPTIONS_CACHE_TTL_SECONDS),
+        'options_cache_stale_ttl': str(constants.OPTIONS_CACHE_STALE_SECONDS),
+        'options_cache_retain': str(constants.OPTIONS_CACHE_RETAIN_SECONDS),
+        'options_page_size': str(constants.OPTIONS_PAGE_SIZE),
+        'options_max_page_size': str(constants.OPTIONS_MAX_PAGE_SIZE),
+        'options_response_max_age': str(constants.OPTIONS_RESPONSE_MAX_AGE_SECONDS),
+        'rate_limits': json.dumps(constants.API_RATE_LIMITS),
+        'max_retries': str(constants.API_MAX_RETRIES),
+        'compression_min_bytes': str(constants.COMPRESSION_MIN_BYTES),
+        'metrics_namespace': constants.METRICS_NAMESPACE
+    }
+
+
+def generate_report_environment(profile: Dict) -> Dict[str, str]:
+    """
+    Environment variables of the generate_report handler, given the performance
+    settings of the function running it.
+    """
+    return {
+        'function_timeout_seconds': str(profile['timeout_seconds']),
+        'report_cache_ttl': str(constants.REPORT_CACHE_TTL_SECONDS),
+        'report_cache_max_entries': str(constants.REPORT_CACHE_MAX_ENTRIES),
+        'streaming_enabled': str(constants.STREAMING_ENABLED).lower(),
+        'response_deadline_seconds': str(constants.RESPONSE_DEADLINE_SECONDS),
+        'sync_max_prompt_tokens': str(constants.SYNC_MAX_PROMPT_TOKENS),
+        'fetch_timeout_seconds': str(constants.FETCH_TIMEOUT_SECONDS),
+        'prompt_token_budget': str(constants.PROMPT_TOKEN_BUDGET),
+        'map_reduce_enabled': str(constants.MAP_REDUCE_ENABLED).lower(),
+        'map_concurrency': str(constants.MAP_CONCURRENCY),
+        'map_max_tokens': str(constants.MAP_MAX_TOKENS),
+        'jobs_ttl': str(constants.REPORT_JOBS_TTL_SECONDS),
+        'jobs_pending_timeout': str(constants.REPORT_JOBS_PENDING_TIMEOUT_SECONDS),
+        'batch_max_reports': str(constants.BATCH_MAX_REPORTS),
+        'batch_concurrency': str(constants.BATCH_CONCURRENCY),
+        'max_concurrency': str(constants.GET_APPLICATIONS_MAX_CONCURRENCY),
+        'warm_up_personas': ','.join(constants.WARM_UP_PERSONAS),
+        'warm_up_apps': ','.join(constants.WARM_UP_APPS),
+        'warm_up_max_reports': str(constants.WARM_UP_MAX_REPORTS),
+        'warm_up_retry_seconds': str(constants.WARM_UP_RETRY_SECONDS),
+        'rate_limits': json.dumps(constants.API_RATE_LIMITS),
+        'max_retries': str(constants.API_MAX_RETRIES),
+        'compression_min_bytes': str(constants.COMPRESSION_MIN_BYTES),
+        'metrics_namespace': constants.METRICS_NAMESPACE
+    }
+
+
 class GetApplicationsRole(Construct):
     def __init__(self, scope: Construct, construct_id: str, **kwargs) -> None:
         super().__init__(scope, construct_id, **kwargs)
@@ -63,10 +169,11 @@ class GetApplicationsRole(Construct):
 
 
 class GetApplicationsLambda(Construct):
-    def __init__(self, scope: Construct, construct_id: str, role: aws_iam.Role, **kwargs) -> None:
+    def __init__(self, scope: Construct, construct_id: str, role: aws_iam.Role, layers: List[aws_lambda.ILayerVersion], params_and_secrets: Optional[aws_lambda.ParamsAndSecretsLayerVersion] = None, **kwargs) -> None:
         super().__init__(scope, construct_id, **kwargs)
 
 
+        profile = performance_profile(self, 'GetApplications')
         resilience_hub_get_applications_lambda = aws_lambda.Function(
             self,
             id='GetApplications',
@@ -76,12 +183,15 @@ class GetApplicationsLambda(Construct):
             runtime=aws_lambda.Runtime.PYTHON_3_12,
             architecture=aws_lambda.Architecture.ARM_64,
             handler='lambda_function.lambda_handler',
-            timeout=Duration.seconds(60),
-            memory_size=512,
+            **performance_options(profile),
             role=role,
+            layers=layers,
+            params_and_secrets=params_and_secrets,
+            environment=get_applications_environment(),
         )
 
         self.function = resilience_hub_get_applications_lambda
+        self.handler = invocation_target(resilience_hub_get_applications_lambda, profile)
 
 
 class GenerateReportRole(Construct):
@@ -99,7 +209,7 @@ class GenerateReportRole(Construct):
             ],
         )
         bedrock_statement = aws_iam.PolicyStatement(
-            actions=["bedrock:InvokeModel"],
+            actions=["bedrock:InvokeModel", "bedrock:InvokeModelWithResponseStream"],
             resources=["*"]
         )
         resilience_hub_statement = aws_iam.PolicyStatement(
@@ -109,7 +219,8 @@ class GenerateReportRole(Construct):
                 'resiliencehub:ListAppVersionResources',
                 'resiliencehub:ListAppAssessments',
                 'resiliencehub:ListAppComponentRecommendations',
-                'resiliencehub:DescribeApp'
+                'resiliencehub:DescribeApp',
+                'resiliencehub:DescribeAppAssessment'
             ],
             resources=["*"]
         )
@@ -117,6 +228,10 @@ class GenerateReportRole(Construct):
             actions=['ssm:GetParameter'],
             resources=[f'arn:aws:ssm:{Stack.of(self).region}:{Stack.of(self).account}:parameter/{constants.SSM_PARAMETER}']
         )
+        report_jobs_statement = aws_iam.PolicyStatement(
+            actions=['lambda:InvokeFunction'],
+            resources=[f'arn:aws:lambda:{Stack.of(self).region}:{Stack.of(self).account}:function:GenerateReport']
+        )
 
         resilience_hub_generate_report_policy = aws_iam.ManagedPolicy(
             self,
@@ -127,7 +242,8 @@ class GenerateReportRole(Construct):
                 lambda_execution_createstream_statement,
                 bedrock_statement,
                 resilience_hub_statement,
-                ssm_statement
+                ssm_statement,
+                report_jobs_statement
             ]
         )
         resilience_hub_generate_report_role = aws_iam.Role(
@@ -142,10 +258,11 @@ class GenerateReportRole(Construct):
 
 
 class GenerateReportLambda(Construct):
-    def __init__(self, scope: Construct, construct_id: str, role: aws_iam.Role, **kwargs) -> None:
+    def __init__(self, scope: Construct, construct_id: str, role: aws_iam.Role, layers: List[aws_lambda.ILayerVersion], params_and_secrets: Optional[aws_lambda.ParamsAndSecretsLayerVersion] = None, **kwargs) -> None:
         super().__init__(scope, construct_id, **kwargs)
 
 
+        profile = performance_profile(self, 'GenerateReport')
         resilience_hub_generate_report_lambda = aws_lambda.Function(
             self,
             id='GenerateReport',
@@ -155,9 +272,112 @@ class GenerateReportLambda(Construct):
             runtime=aws_lambda.Runtime.PYTHON_3_12,
             architecture=aws_lambda.Architecture.ARM_64,
             handler='lambda_function.lambda_handler',
-            timeout=Duration.seconds(90),
-            memory_size=512,
+            **performance_options(profile),
             role=role,
+            layers=layers,
+            params_and_secrets=params_and_secrets,
+            environment=generate_report_environment(profile),
         )
 
         self.function = resilience_hub_generate_report_lambda
+        self.handler = invocation_target(resilience_hub_generate_report_lambda, profile)
+
+
+class BackendRole(Construct):
+    def __init__(self, scope: Construct, construct_id: str, **kwargs) -> None:
+        super().__init__(scope, construct_id, **kwargs)
+
+        lambda_execution_createlog_statement = aws_iam.PolicyStatement(
+                actions=["logs:CreateLogGroup"],
+                resources=[f"arn:aws:logs:{Stack.of(self).region}:{Stack.of(self).account}:*"],
+        )
+        lambda_execution_createstream_statement = aws_iam.PolicyStatement(
+            actions=["logs:CreateLogStream", "logs:PutLogEvents"],
+            resources=[
+                f"arn:aws:logs:{Stack.of(self).region}:{Stack.of(self).account}:log-group:/aws/lambda/Backend:*"
+            ],
+        )
+        bedrock_statement = aws_iam.PolicyStatement(
+            actions=["bedrock:InvokeModel", "bedrock:InvokeModelWithResponseStream"],
+            resources=["*"]
+        )
+        resilience_hub_statement = aws_iam.PolicyStatement(
+            actions=[
+                'resiliencehub:ListApps',
+                'resiliencehub:ListAppVersions',
+                'resiliencehub:ListAppVersionResources',
+                'resiliencehub:ListAppAssessments',
+                'resiliencehub:ListAppComponentRecommendations',
+                'resiliencehub:DescribeApp',
+                'resiliencehub:DescribeAppAssessment'
+            ],
+            resources=["*"]
+        )
+        ssm_statement = aws_iam.PolicyStatement(
+            actions=['ssm:GetParameter'],
+            resources=[f'arn:aws:ssm:{Stack.of(self).region}:{Stack.of(self).account}:parameter/{constants.SSM_PARAMETER}']
+        )
+        report_jobs_statement = aws_iam.PolicyStatement(
+            actions=['lambda:InvokeFunction'],
+            resources=[f'arn:aws:lambda:{Stack.of(self).region}:{Stack.of(self).account}:function:Backend']
+        )
+
+        backend_policy = aws_iam.ManagedPolicy(
+            self,
+            id='BackendPolicy',
+            managed_policy_name='BackendPolicy',
+            statements=[
+                lambda_execution_createlog_statement,
+                lambda_execution_createstream_statement,
+                bedrock_statement,
+                resilience_hub_statement,
+                ssm_statement,
+                report_jobs_statement
+            ]
+        )
+        backend_role = aws_iam.Role(
+            self,
+            id='BackendRole',
+            role_name='BackendRole',
+            assumed_by=aws_iam.ServicePrincipal('lambda.amazonaws.com')
+        )
+        backend_policy.attach_to_role(backend_role)
+
+        self.role = backend_role
+
+
+class BackendLambda(Construct):
+    """
+    Single function serving both the applications list and the reports, behind the router handler.
+    """
+
+    def __init__(self, scope: Construct, construct_id: str, role: aws_iam.Role, layers: List[aws_lambda.ILayerVersion], params_and_secrets: Optional[aws_lambda.ParamsAndSecretsLayerVersion] = None, **kwargs) -> None:
+        super().__init__(scope, construct_id, **kwargs)
+
+
+        profile = performance_profile(self, 'Backend')
+        backend_lambda = aws_lambda.Function(
+            self,
+            id='Backend',
+            function_name='Backend',
+            description='Return Resilience Hub applications and generate personalized reports using Amazon Bedrock.',
+            # The router imports the get_applications and generate_report handlers from their directories.
+            code=aws_lambda.Code.from_asset(
+                'resources/lambda_function_code/',
+                exclude=['common', 'create_user', '**/__pycache__']
+            ),
+            runtime=aws_lambda.Runtime.PYTHON_3_12,
+            architecture=aws_lambda.Architecture.ARM_64,
+            handler='router.lambda_function.lambda_handler',
+            **performance_options(profile),
+            role=role,
+            layers=layers,
+            params_and_secrets=params_and_secrets,
+            environment={
+                **get_applications_environment(),
+                **generate_report_environment(profile),
+            },
+        )
+
+        self.function = backend_lambda
+        self.handler = invocation_target(backend_lambda, profile)
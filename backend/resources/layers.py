@@ -0,0 +1,24 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+
+
+from aws_cdk import aws_lambda
+from constructs import Construct
+
+
+
+class CommonLayer(Construct):
+    def __init__(self, scope: Construct, construct_id: str, **kwargs) -> None:
+        super().__init__(scope, construct_id, **kwargs)
+
+        common_layer = aws_lambda.LayerVersion(
+            self,
+            id='CommonLayer',
+            description='Modules shared by the Resilience Hub report Lambda functions.',
+            code=aws_lambda.Code.from_asset('resources/lambda_function_code/common/'),
+            compatible_runtimes=[aws_lambda.Runtime.PYTHON_3_12],
+            compatible_architectures=[aws_lambda.Architecture.ARM_64],
+        )
+
+        self.layer = common_layer
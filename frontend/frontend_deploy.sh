@@ -28,10 +28,16 @@ else
 fi
 
 # Sync the dist folder with the S3 bucket
+# The fingerprinted bundles under assets/ never change, so they are cached for a year
+# (STATIC_ASSETS_MAX_AGE_SECONDS in backend/constants.py). The HTML entry points are
+# revalidated on every request. The bundles are uploaded before the HTML referencing
+# them, and the bundles of prior builds are deleted last.
 echo "Syncing the dist folder with the S3 bucket ..."
 S3_BUCKET=$(aws cloudformation describe-stacks --stack-name AWSResilienceHubGenAI --query 'Stacks[0].Outputs[?OutputKey==`S3ASSETBUCKET`].OutputValue' --output text)
 if [ $? -eq 0 ]; then
-    aws s3 sync dist/ s3://"$S3_BUCKET" --delete
+    aws s3 sync dist/assets/ s3://"$S3_BUCKET"/assets/ --cache-control "public, max-age=31536000, immutable" \
+        && aws s3 sync dist/ s3://"$S3_BUCKET" --exclude "assets/*" --cache-control "no-cache" --delete \
+        && aws s3 sync dist/assets/ s3://"$S3_BUCKET"/assets/ --delete
     if [ $? -eq 0 ]; then
         echo "✅ - Dist folder synced with S3 bucket successfully."
     else
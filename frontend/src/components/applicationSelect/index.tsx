@@ -1,5 +1,5 @@
 import * as React from "react";
-import Select from "@cloudscape-design/components/select";
+import Select, { SelectProps } from "@cloudscape-design/components/select";
 import Config from '../../config/cdk-output.json'
 import { fetchAuthSession } from 'aws-amplify/auth'
 
@@ -13,42 +13,82 @@ interface ApplicationSelectProps {
   onApplicationSelect: (value: string) => void;
 }
 
+interface OptionsPage {
+  options: { app_name: string; app_arn: string; assessment_arn: string }[];
+  next_cursor: string | null;
+}
+
 const apiGatewayUrl = Config.AWSResilienceHubGenAI.APIGATEWAYURL
 const getApplicationOptionsEndpoint = apiGatewayUrl + Config.AWSResilienceHubGenAI.APIGATEWAYGETAPPLICATIONSOPTIONSPATH
+const pageSize = 50
 
 const ApplicationSelect: React.FC<ApplicationSelectProps> = ({ onApplicationSelect: onApplicationSelect }) => {
   const [selectedOption, setSelectedOption] = React.useState<Option>({ label: "Choose an Application", value: "0" });
   const [options, setOptions] = React.useState<Option[]>([]);
-  
+  const [status, setStatus] = React.useState<SelectProps.StatusType>("pending");
+  // Search text and cursor of the next page. Responses to an older search are dropped.
+  const request = React.useRef<{ filteringText: string; cursor: string | null }>({ filteringText: "", cursor: null });
 
-  React.useEffect(() => {
-    const fetchData = async () => {
+  // refresh bypasses the browser, API Gateway and function caches of the options.
+  const loadItems = async (filteringText: string, firstPage: boolean, refresh: boolean = false) => {
+    if (firstPage) {
+      request.current = { filteringText: filteringText, cursor: null };
+      setOptions([]);
+    } else if (request.current.cursor === null) {
+      return;
+    }
+    const cursor = request.current.cursor;
+    setStatus("loading");
 
-      const { tokens } = await fetchAuthSession()
-      const idToken = tokens?.idToken?.toString()
-      const bearerToken = `Bearer ${idToken}`
+    const { tokens } = await fetchAuthSession()
+    const idToken = tokens?.idToken?.toString()
+    const bearerToken = `Bearer ${idToken}`
 
-      try {
-        const response = await fetch(getApplicationOptionsEndpoint, {
-          method: 'GET',
-          headers: {
-            'Authorization': bearerToken,
-            'Content-Type': 'application/json'
-          }
-        });
+    const params = new URLSearchParams({ limit: String(pageSize) });
+    if (filteringText) {
+      params.set("q", filteringText);
+    }
+    if (cursor) {
+      params.set("cursor", cursor);
+    }
 
-        const data = await response.json();
-        const options = data.map((item: { app_name: string; app_arn: string, assessment_arn: string }) => ({
-          label: item.app_name,
-          value: `${item.app_arn}|${item.assessment_arn}`
-        }));
-        setOptions(options);
-      } catch (error) {
-        console.error("Error fetching data:", error);
-      }
+    const headers: Record<string, string> = {
+      'Authorization': bearerToken,
+      'Content-Type': 'application/json'
     };
+    if (refresh) {
+      // A new value is a new cache key, in the browser and in API Gateway.
+      headers['x-cache-bypass'] = String(Date.now());
+    }
 
-    fetchData();
+    try {
+      const response = await fetch(`${getApplicationOptionsEndpoint}?${params.toString()}`, {
+        method: 'GET',
+        headers: headers
+      });
+      if (!response.ok) {
+        throw new Error(`Unexpected status ${response.status}`);
+      }
+
+      const data: OptionsPage = await response.json();
+      if (request.current.filteringText !== filteringText || request.current.cursor !== cursor) {
+        return;
+      }
+      const pageOptions = data.options.map((item) => ({
+        label: item.app_name,
+        value: `${item.app_arn}|${item.assessment_arn}`
+      }));
+      request.current = { filteringText: filteringText, cursor: data.next_cursor };
+      setOptions((previous) => (cursor ? [...previous, ...pageOptions] : pageOptions));
+      setStatus(data.next_cursor ? "pending" : "finished");
+    } catch (error) {
+      console.error("Error fetching data:", error);
+      setStatus("error");
+    }
+  };
+
+  React.useEffect(() => {
+    loadItems("", true);
   }, []);
 
   return (
@@ -60,9 +100,17 @@ const ApplicationSelect: React.FC<ApplicationSelectProps> = ({ onApplicationSele
         onApplicationSelect(option.value);
       }}
       options={options}
+      filteringType="manual"
+      // The recovery button reloads the list from the first page, refreshed from Resilience Hub.
+      onLoadItems={({ detail }) => loadItems(detail.filteringText, detail.firstPage || detail.samePage, detail.samePage)}
+      statusType={status}
+      loadingText="Loading applications"
+      errorText="Error fetching applications"
+      recoveryText="Refresh"
+      finishedText={request.current.filteringText ? "End of search results" : "End of applications"}
       placeholder="Choose an Application"
     />
   );
 };
 
-export default ApplicationSelect;
\ No newline at end of file
+export default ApplicationSelect;
@@ -14,6 +14,7 @@ import SidebarNav from '../../components/sidebar';
 import LoadingIndicator from '../../components/loadingIndicator';
 
 import Button from "@cloudscape-design/components/button";
+import Alert from "@cloudscape-design/components/alert";
 
 import PersonaSelect from '../../components/personaSelect';
 import ApplicationSelect from '../../components/applicationSelect';
@@ -35,11 +36,17 @@ Amplify.configure(authConfig);
 export default function App() {
 
   const apiGatewayUrl = Config.AWSResilienceHubGenAI.APIGATEWAYURL
-  const generateReportEndpoint = apiGatewayUrl + Config.AWSResilienceHubGenAI.APIGATEWAYGENERATEREPORTPATH
+  const generateReportJobsEndpoint = apiGatewayUrl + Config.AWSResilienceHubGenAI.APIGATEWAYGENERATEREPORTJOBSPATH
+  const jobPollIntervalMs = 2000
+  // Polling stops after this long. The backend fails jobs lost for longer than the function timeout.
+  const jobPollMaxMs = 5 * 60 * 1000
   const [showReport, setShowReport] = useState(false);
   const [selectedApplication, setSelectedApplication] = useState('');
   const [selectedPersona, setSelectedPersona] = useState('');
   const [generatedReport, setGeneratedReport] = useState('');
+  const [partialReport, setPartialReport] = useState('');
+  const [reportTruncated, setReportTruncated] = useState(false);
+  const [errorMessage, setErrorMessage] = useState('');
   const [canGenerateReport, setCanGenerateReport] = useState(false);
   const [isLoading, setIsLoading] = useState(false);
   const isFormComplete = () => {
@@ -57,6 +64,8 @@ export default function App() {
       if (!showReport) {
 
         setIsLoading(true);
+        setErrorMessage('');
+        setPartialReport('');
         const values = selectedApplication;
         const [app_arn, assessment_arn] = values.split('|');
         const { tokens } = await fetchAuthSession()
@@ -64,7 +73,7 @@ export default function App() {
         const bearerToken = `Bearer ${idToken}`  
 
 
-        const response = await fetch(generateReportEndpoint, {
+        const response = await fetch(generateReportJobsEndpoint, {
           method: 'POST',
           headers: {
             'Authorization': bearerToken,
@@ -76,23 +85,65 @@ export default function App() {
             assessment_arn: assessment_arn }),
         });
 
-        if (response.ok) {
+        if (!response.ok) {
+          console.error('Error generating report:', response.status);
+          setErrorMessage(`The report could not be generated (HTTP ${response.status}). Please try again.`);
+          setIsLoading(false);
+          return;
+        }
+
+        let job = await response.json();
+        const pollDeadline = Date.now() + jobPollMaxMs;
+        while (job.status === 'PENDING' || job.status === 'RUNNING') {
+          if (Date.now() >= pollDeadline) {
+            console.error('Report job still not complete:', job.job_id);
+            setErrorMessage('The report is taking too long to generate. Please try again later.');
+            setPartialReport('');
+            setIsLoading(false);
+            return;
+          }
+          await new Promise((resolve) => setTimeout(resolve, jobPollIntervalMs));
+          const pollResponse = await fetch(`${generateReportJobsEndpoint}?job_id=${encodeURIComponent(job.job_id)}`, {
+            method: 'GET',
+            headers: {
+              'Authorization': bearerToken,
+            },
+          });
+          if (!pollResponse.ok) {
+            console.error('Error polling report job:', pollResponse.status);
+            setErrorMessage(`The report status could not be retrieved (HTTP ${pollResponse.status}). Please try again.`);
+            setPartialReport('');
+            setIsLoading(false);
+            return;
+          }
+          job = await pollResponse.json();
+          if (job["partial-text"]) {
+            setPartialReport(job["partial-text"]);
+          }
+        }
+
+        setPartialReport('');
+        if (job.status === 'SUCCEEDED') {
           setShowReport(true);
-          const responseData = await response.json();
-          setGeneratedReport(responseData["generated-text"].replace(/\\n/g, "").slice(1, -1))
+          setGeneratedReport(job["generated-text"])
+          setReportTruncated(Boolean(job.truncated));
         } else {
-          console.error('Error generating report:', response.status);
+          console.error('Error generating report:', job.error);
+          setErrorMessage(job.error ? `The report could not be generated: ${job.error}` : 'The report could not be generated.');
         }
         setIsLoading(false); 
       } else {
         setShowReport(false);
         setGeneratedReport('')
+        setReportTruncated(false);
         setCanGenerateReport(false);
         setSelectedPersona('');
         setSelectedApplication(''); 
       }
     } catch (error) {
       console.error('Error generating report:', error);
+      setErrorMessage('The report could not be generated. Please try again.');
+      setPartialReport('');
       setIsLoading(false); 
     }
   };
@@ -137,6 +188,8 @@ export default function App() {
                   <ApplicationSelect onApplicationSelect={(value) => setSelectedApplication(value)} />
                   <hr className="horizontal-line" />
                   {isLoading && <LoadingIndicator />}
+                  {errorMessage && <Alert type="error">{errorMessage}</Alert>}
+                  {isLoading && partialReport && <div dangerouslySetInnerHTML={{ __html: partialReport }} />}
                 </div>
               </Container>
             ) : (
@@ -158,6 +211,11 @@ export default function App() {
                 </Header>
               }
             >
+              {reportTruncated && (
+                <Alert type="warning" header="Incomplete report">
+                  Generation stopped before the report was complete, so its end is missing. Start over to generate it again.
+                </Alert>
+              )}
               <div dangerouslySetInnerHTML={{ __html: generatedReport }} />
             </Container>
 